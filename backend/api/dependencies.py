@@ -33,12 +33,10 @@ async def validate_pdf_upload(
     if not pdf.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
-    # Check size
-    content = await pdf.read()
-    await pdf.seek(0)  # Reset for later reading
-
-    size_mb = len(content) / (1024 * 1024)
-    if size_mb > settings.MAX_FILE_SIZE_MB:
+    # The request body is capped by UploadSizeLimitMiddleware before it is
+    # parsed; this checks the file's own size, which save_pdf enforces again
+    # while copying it
+    if pdf.size is not None and pdf.size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
         raise HTTPException(
             status_code=400,
             detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB",
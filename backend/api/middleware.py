@@ -0,0 +1,80 @@
+# backend/api/middleware.py
+"""ASGI middleware."""
+
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Cap the request body of upload endpoints before it is parsed.
+
+    Starlette spools a whole multipart body to a temp file before the route
+    runs, so limits checked in the route only apply once everything was
+    received. This rejects a declared Content-Length over the limit at once,
+    and stops reading a body (e.g. chunked) as soon as it grows past it.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits  # path -> max body bytes
+
+    def _limit(self, scope: Scope) -> Optional[int]:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return None
+        return self.limits.get(scope["path"].rstrip("/") or "/")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self._limit(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        too_large = JSONResponse(
+            {"detail": f"Request too large. Max size: {limit // (1024 * 1024)}MB"},
+            status_code=413,
+        )
+        headers = dict(scope["headers"])
+        try:
+            declared = int(headers.get(b"content-length", b""))
+        except ValueError:
+            declared = None
+        if declared is not None and declared > limit:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracked_send(message: Message) -> None:
+            nonlocal started
+            if exceeded and not started:
+                return  # e.g. the 400 FastAPI makes of the parse error
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge:
+            if started:
+                raise
+        if exceeded and not started:
+            await too_large(scope, receive, send)
@@ -30,3 +30,24 @@ async def readiness_check():
         return {"status": "ready", "checks": checks}
     else:
         return {"status": "not ready", "checks": checks}
+
+
+@router.get("/stats")
+async def runtime_stats():
+    """Runtime counters for caches and workers."""
+    from backend.core.processors.page_cache import get_page_cache_stats
+    from backend.core.processors.rasterizer import get_raster_engine
+    from backend.services.concurrency import get_concurrency_limiter
+    from backend.services.job_runner import get_job_runner
+    from backend.services.llm_client import get_hedge_stats
+    from backend.services.response_cache import get_response_cache
+
+    response_cache = get_response_cache()
+    return {
+        "page_cache": get_page_cache_stats(),
+        "renderer": get_raster_engine().stats(),
+        "llm_cache": response_cache.stats() if response_cache else None,
+        "llm_concurrency": get_concurrency_limiter().stats(),
+        "llm_hedging": get_hedge_stats(),
+        "jobs": get_job_runner().stats(),
+    }
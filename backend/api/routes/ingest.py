@@ -0,0 +1,193 @@
+# backend/api/routes/ingest.py
+# Bulk ingestion: many PDFs (or zip archives of PDFs) queued in one request
+
+import asyncio
+import zipfile
+from pathlib import PurePosixPath
+from typing import Annotated, BinaryIO, Iterator, List, Tuple, Union
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from backend.api.dependencies import get_config, get_storage
+from backend.api.schemas import BulkIngestResponse, IngestedJob, SkippedFile
+from backend.config import Settings
+from backend.services.duplicates import reuse_duplicate
+from backend.services.job_queue import PRIORITY_BULK
+from backend.services.job_runner import enqueue_phase
+from backend.services.phase_store import PIPELINE
+from backend.services.storage import StoredPdf, StorageService, UploadRejected
+from backend.database import get_db, Restaurant
+
+router = APIRouter(prefix="/api/ingest", tags=["ingest"])
+
+
+def _restaurant_name(filename: str) -> str:
+    # "Carlos-Cantina_Menu.pdf" -> "Carlos Cantina Menu"
+    stem = PurePosixPath(filename).stem
+    return " ".join(stem.replace("_", " ").replace("-", " ").split()) or stem
+
+
+def _zip_pdfs(
+    filename: str, file: BinaryIO, max_bytes: int
+) -> Iterator[Tuple[str, bytes, str]]:
+    # Yield (name, content, skip reason) for each PDF in a zip archive. The
+    # archive is read from the spooled upload, one member at a time.
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        yield filename, b"", "Not a valid zip archive"
+        return
+
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/"):
+                continue
+            if not name.lower().endswith(".pdf"):
+                yield name, b"", "Not a PDF"
+                continue
+            # Declared size is checked before inflating anything
+            if info.file_size > max_bytes:
+                yield name, b"", "File too large"
+                continue
+            yield name, archive.read(info), ""
+
+
+def _create_job(
+    db: Session,
+    storage: StorageService,
+    job_id: str,
+    filename: str,
+    stored: StoredPdf,
+    phase: int,
+    priority: int,
+    use_cache: bool,
+    reuse_duplicates: bool,
+) -> IngestedJob:
+    # Record a stored PDF as a job, then reuse an identical upload or queue it.
+    # Blocking (DB writes, copying results), so it runs in a worker thread.
+    restaurant_name = _restaurant_name(filename)
+    db.add(
+        Restaurant(
+            job_id=job_id,
+            name=restaurant_name,
+            pdf_sha256=stored.sha256,
+            page_count=stored.page_count,
+            phase=0,
+            status="created",
+        )
+    )
+    db.commit()
+
+    # Same PDF already extracted for this restaurant
+    reused_from = None
+    if reuse_duplicates and use_cache:
+        reused_from = reuse_duplicate(db, storage, job_id, phase)
+    if reused_from:
+        status = db.query(Restaurant.status).filter(
+            Restaurant.job_id == job_id
+        ).scalar()
+    else:
+        status = enqueue_phase(
+            db,
+            job_id,
+            phase,
+            restaurant_name=restaurant_name,
+            use_cache=use_cache,
+            priority=priority,
+        )
+    return IngestedJob(
+        job_id=job_id,
+        filename=filename,
+        restaurant_name=restaurant_name,
+        status=status,
+        reused_from=reused_from,
+    )
+
+
+@router.post("", response_model=BulkIngestResponse, status_code=202)
+async def ingest_pdfs(
+    files: List[UploadFile] = File(...),
+    phase: int = Form(PIPELINE),
+    priority: int = Form(PRIORITY_BULK),
+    use_cache: bool = Form(True),
+    reuse_duplicates: bool = Form(True),
+    settings: Annotated[Settings, Depends(get_config)] = None,
+    storage: Annotated[StorageService, Depends(get_storage)] = None,
+    db: Session = Depends(get_db),
+):
+    # Create one job per PDF and queue it (phase 0 = full pipeline, 1 = phase 1
+    # only). The restaurant name is taken from the file name.
+    if phase not in (PIPELINE, 1):
+        raise HTTPException(status_code=400, detail="phase must be 0 (pipeline) or 1")
+
+    max_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    jobs: List[IngestedJob] = []
+    skipped: List[SkippedFile] = []
+
+    for upload in files:
+        # PDFs are streamed to disk; zip members are read one by one
+        entries: Iterator[Tuple[str, Union[bytes, UploadFile], str]]
+        if upload.filename.lower().endswith(".zip"):
+            entries = _zip_pdfs(upload.filename, upload.file, max_bytes)
+        elif upload.filename.lower().endswith(".pdf"):
+            entries = iter([(upload.filename, upload, "")])
+        else:
+            reason = "Only PDF or zip files are allowed"
+            entries = iter([(upload.filename, b"", reason)])
+
+        while True:
+            # Zip members are inflated off the event loop
+            try:
+                entry = await asyncio.to_thread(next, entries, None)
+            except Exception as e:
+                # A damaged archive ends here; members read before it stay queued
+                skipped.append(
+                    SkippedFile(filename=upload.filename, reason=f"Reading failed: {e}")
+                )
+                break
+            if entry is None:
+                break
+
+            filename, source, reason = entry
+            if not reason and len(jobs) >= settings.INGEST_MAX_FILES:
+                reason = f"Over the limit of {settings.INGEST_MAX_FILES} PDFs"
+            if reason:
+                skipped.append(SkippedFile(filename=filename, reason=reason))
+                continue
+
+            # One file failing must not lose the jobs already created
+            job_id = storage.new_job_id()
+            try:
+                if isinstance(source, bytes):
+                    stored = await asyncio.to_thread(
+                        storage.save_pdf_bytes, job_id, source
+                    )
+                else:
+                    stored = await storage.save_pdf(job_id, source)
+
+                job = await asyncio.to_thread(
+                    _create_job,
+                    db,
+                    storage,
+                    job_id,
+                    filename,
+                    stored,
+                    phase,
+                    priority,
+                    use_cache,
+                    reuse_duplicates,
+                )
+            except UploadRejected as e:
+                skipped.append(SkippedFile(filename=filename, reason=str(e)))
+                continue
+            except Exception as e:
+                await asyncio.to_thread(db.rollback)
+                skipped.append(
+                    SkippedFile(filename=filename, reason=f"Ingestion failed: {e}")
+                )
+                continue
+            jobs.append(job)
+
+    return BulkIngestResponse(phase=phase, jobs=jobs, skipped=skipped)
@@ -1,13 +1,18 @@
 # backend/api/routes/jobs.py
 # Endpoints for managing extraction jobs
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from backend.database import get_db, Restaurant, PhaseData
+from backend.database import get_db, Restaurant, PhaseData, ExtractionHistory, CategorySizes
+from backend.services import job_queue, menu_store
+from backend.services.progress import get_channel
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
@@ -21,6 +26,9 @@ class JobListResponse(BaseModel):
     status: str
     current_phase: int
     restaurant_name: Optional[str]
+    page_count: int
+    category_count: int
+    item_count: int
     created_at: datetime
     updated_at: datetime
 
@@ -35,6 +43,7 @@ class JobDetailResponse(BaseModel):
     current_phase: int
     pdf_filename: Optional[str]
     restaurant_name: Optional[str]
+    page_count: int
     category_count: int
     item_count: int
     created_at: datetime
@@ -42,30 +51,23 @@ class JobDetailResponse(BaseModel):
     completed_at: Optional[datetime]
 
 
-class UpdateJobStatusRequest(BaseModel):
+class PhaseStatus(BaseModel):
     status: str
-    current_phase: Optional[int] = None
-
-
-class CategorySummary(BaseModel):
-    id: int
-    name_raw: str
-    description_raw: Optional[str]
-    subcategory_count: int
-    item_count: int
+    updated_at: datetime
+    error: Optional[str] = None
 
 
-class SubcategorySummary(BaseModel):
-    id: int
-    name_raw: str
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    current_phase: int
+    updated_at: datetime
+    phases: Dict[int, PhaseStatus]
 
 
-class CategoryDetailResponse(BaseModel):
-    id: int
-    name_raw: str
-    description_raw: Optional[str]
-    subcategories: List[SubcategorySummary]
-    item_count: int
+class UpdateJobStatusRequest(BaseModel):
+    status: str
+    current_phase: Optional[int] = None
 
 
 # API endpoints
@@ -78,7 +80,8 @@ def list_jobs(
     status: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    # Get all jobs with pagination
+    # Get all jobs with pagination; Restaurant.json is deferred, so only the
+    # metadata columns are read
     query = db.query(Restaurant)
 
     if status:
@@ -93,6 +96,9 @@ def list_jobs(
             "status": r.status,
             "current_phase": r.phase,
             "restaurant_name": r.name,
+            "page_count": r.page_count,
+            "category_count": r.category_count,
+            "item_count": r.item_count,
             "created_at": r.created_at,
             "updated_at": r.updated_at,
         }
@@ -102,7 +108,8 @@ def list_jobs(
 
 @router.get("/{job_id}", response_model=JobDetailResponse)
 def get_job(job_id: str, db: Session = Depends(get_db)):
-    # Get details for a specific job
+    # Get details for a specific job; counts are kept on the row when phases
+    # are saved
     restaurant = db.query(Restaurant).filter(Restaurant.job_id == job_id).first()
 
     if not restaurant:
@@ -110,23 +117,6 @@ def get_job(job_id: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found"
         )
 
-    # Count categories and items from JSON
-    category_count = 0
-    item_count = 0
-    
-    if restaurant.json:
-        pages = restaurant.json.get("pages", [])
-        for page in pages:
-            categories = page.get("categories", [])
-            category_count += len(categories)
-            for cat in categories:
-                # Count items in category_items
-                for cat_items in cat.get("category_items", []):
-                    item_count += len(cat_items.get("items", []))
-                # Count items in subcategory_items
-                for subcat in cat.get("subcategory_items", []):
-                    item_count += len(subcat.get("items", []))
-
     return JobDetailResponse(
         id=restaurant.id,
         job_id=restaurant.job_id,
@@ -134,14 +124,91 @@ def get_job(job_id: str, db: Session = Depends(get_db)):
         current_phase=restaurant.phase,
         pdf_filename=None,
         restaurant_name=restaurant.name,
-        category_count=category_count,
-        item_count=item_count,
+        page_count=restaurant.page_count,
+        category_count=restaurant.category_count,
+        item_count=restaurant.item_count,
         created_at=restaurant.created_at,
         updated_at=restaurant.updated_at,
         completed_at=restaurant.updated_at if restaurant.phase == 4 else None,
     )
 
 
+@router.get("/{job_id}/status", response_model=JobStatusResponse)
+def get_job_status(job_id: str, db: Session = Depends(get_db)):
+    # Cheap status for polling queued extractions - never loads the JSON columns
+    job = (
+        db.query(Restaurant.status, Restaurant.phase, Restaurant.updated_at)
+        .filter(Restaurant.job_id == job_id)
+        .first()
+    )
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found"
+        )
+
+    phases = {
+        row.phase: {"status": row.status, "updated_at": row.datetime}
+        for row in db.query(PhaseData.phase, PhaseData.status, PhaseData.datetime)
+        .filter(PhaseData.job_id == job_id)
+        .all()
+    }
+
+    # Latest error of each failed phase, or the failed categories of a
+    # partially successful one
+    for phase, info in phases.items():
+        if info["status"] in ("failed", "partial"):
+            info["error"] = (
+                db.query(ExtractionHistory.error_message)
+                .filter(
+                    ExtractionHistory.job_id == job_id,
+                    ExtractionHistory.phase == phase,
+                    ExtractionHistory.status == info["status"],
+                )
+                .order_by(ExtractionHistory.id.desc())
+                .limit(1)
+                .scalar()
+            )
+
+    return {
+        "job_id": job_id,
+        "status": job.status,
+        "current_phase": job.phase,
+        "updated_at": job.updated_at,
+        "phases": phases,
+    }
+
+
+@router.get("/{job_id}/phases/{phase}/events")
+async def stream_phase_events(
+    job_id: str,
+    phase: int,
+    last_event_id: Optional[int] = Header(None),
+):
+    # Server-sent events of a running phase: each page/category result as it
+    # completes plus progress counters. Reconnects resume after Last-Event-ID.
+    channel = get_channel(job_id, phase)
+    if channel is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No recent phase {phase} run for job {job_id}",
+        )
+
+    async def _events():
+        async for message in channel.subscribe(after=last_event_id or 0):
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            data = json.dumps(message["data"], ensure_ascii=False, default=str)
+            yield f"id: {message['id']}\nevent: {message['event']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put("/{job_id}/status")
 def update_job_status(
     job_id: str, request: UpdateJobStatusRequest, db: Session = Depends(get_db)
@@ -180,6 +247,22 @@ def delete_job(job_id: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found"
         )
 
+    # Lock the job row so no run is queued while it is deleted
+    db.query(Restaurant).filter(Restaurant.job_id == job_id).update(
+        {Restaurant.updated_at: datetime.utcnow()}, synchronize_session=False
+    )
+    if job_queue.has_active(db, job_id):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} has a queued or running phase",
+        )
+
+    job_queue.delete_entries(db, job_id)
+    db.query(CategorySizes).filter(CategorySizes.job_id == job_id).delete(
+        synchronize_session=False
+    )
+    menu_store.delete_menu(db, job_id)
     db.delete(restaurant)
     db.commit()
 
@@ -190,4 +273,5 @@ def delete_job(job_id: str, db: Session = Depends(get_db)):
     }
 
 
-# To get categories and items, use the phase endpoints instead (GET /api/phase1/{job_id}, etc.)
+# To get categories and items, use the menu endpoints (GET /api/menu/{job_id}/categories, etc.)
+# or the phase endpoints for whole documents (GET /api/phase1/{job_id}, etc.)
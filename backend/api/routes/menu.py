@@ -0,0 +1,403 @@
+# backend/api/routes/menu.py
+# Endpoints for reading and editing single categories and items of a job's
+# menu from the normalized menu tables, without loading the phase documents.
+# Categories and items are addressed by their position in the phase 2
+# document (page, category index, item index), which stays the same when the
+# tables are rewritten by a later save of the phase.
+
+from typing import Annotated, Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, field_validator
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.api.dependencies import get_storage
+from backend.services import job_queue, phase_store
+from backend.services.menu_store import ItemNotFound
+from backend.services.storage import StorageService
+from backend.database import (
+    get_db,
+    MenuAddon,
+    MenuCategory,
+    MenuItem,
+    MenuOption,
+    MenuSubcategory,
+    MenuVariation,
+    Restaurant,
+)
+
+router = APIRouter(prefix="/api/menu", tags=["menu"])
+
+
+# Request and response models
+
+
+class CategorySummary(BaseModel):
+    page_number: int
+    category_index: int
+    name_raw: str
+    description_raw: Optional[str]
+    subcategory_count: int
+    item_count: int
+
+
+class SubcategorySummary(BaseModel):
+    subcategory_index: int
+    name_raw: str
+    description_raw: Optional[str] = None
+
+
+class OptionResponse(BaseModel):
+    scope: str
+    position: int
+    name_raw: str
+    price: Optional[float]
+    default: bool
+    price_by_variation: Optional[List[Any]]
+
+    class Config:
+        from_attributes = True
+
+
+class CategoryDetailResponse(BaseModel):
+    page_number: int
+    category_index: int
+    name_raw: str
+    description_raw: Optional[str]
+    note: Optional[str]
+    subcategories: List[SubcategorySummary]
+    options: List[OptionResponse]
+    item_count: int
+
+
+class ItemSummary(BaseModel):
+    page_number: int
+    category_index: int
+    item_index: int
+    subcategory_index: Optional[int]
+    subcategory_name_raw: Optional[str]
+    name_raw: str
+    description_raw: Optional[str]
+    base_price: Optional[float]
+    size: Optional[str]
+
+
+class VariationResponse(BaseModel):
+    name_raw: str
+    price: Optional[float]
+    size: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+
+class AddonResponse(BaseModel):
+    position: int
+    name_raw: str
+    price: Optional[float]
+    default: bool
+    price_by_variation: Optional[List[Any]]
+
+    class Config:
+        from_attributes = True
+
+
+class ItemDetailResponse(ItemSummary):
+    variations: List[VariationResponse]
+    addons: List[AddonResponse]
+
+
+class UpdateItemRequest(BaseModel):
+    # Only the fields that are set are changed; null clears one, except the
+    # name, which every item must have
+    name_raw: Optional[str] = None
+    description_raw: Optional[str] = None
+    base_price: Optional[float] = None
+    size: Optional[str] = None
+
+    @field_validator("name_raw")
+    @classmethod
+    def _name_not_null(cls, value: Optional[str]) -> str:
+        if value is None:
+            raise ValueError("name_raw cannot be null")
+        return value
+
+
+# Helpers
+
+
+def _check_job(db: Session, job_id: str) -> None:
+    if not db.query(Restaurant.id).filter(Restaurant.job_id == job_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found"
+        )
+
+
+def _get_category(
+    db: Session, job_id: str, page_number: int, category_index: int
+) -> MenuCategory:
+    category = db.query(MenuCategory).filter(
+        MenuCategory.job_id == job_id,
+        MenuCategory.page_number == page_number,
+        MenuCategory.category_index == category_index,
+    ).first()
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
+
+
+def _of_category(table, category):
+    # Filter for the rows of a table that belong to a category
+    return (
+        table.job_id == category.job_id,
+        table.page_number == category.page_number,
+        table.category_index == category.category_index,
+    )
+
+
+def _of_item(table, item: MenuItem):
+    # Filter for the rows of a table that belong to an item
+    return _of_category(table, item) + (table.item_index == item.item_index,)
+
+
+def _item_summaries(db: Session, job_id: str, items: List[MenuItem]) -> List[ItemSummary]:
+    # One query for the subcategories of the items
+    pages = {item.page_number for item in items}
+    subcategories = {
+        (s.page_number, s.category_index, s.subcategory_index): s.name_raw
+        for s in db.query(
+            MenuSubcategory.page_number,
+            MenuSubcategory.category_index,
+            MenuSubcategory.subcategory_index,
+            MenuSubcategory.name_raw,
+        ).filter(MenuSubcategory.job_id == job_id, MenuSubcategory.page_number.in_(pages))
+    }
+    return [
+        ItemSummary(
+            page_number=item.page_number,
+            category_index=item.category_index,
+            item_index=item.item_index,
+            subcategory_index=item.subcategory_index,
+            subcategory_name_raw=subcategories.get(
+                (item.page_number, item.category_index, item.subcategory_index)
+            ),
+            name_raw=item.name_raw,
+            description_raw=item.description_raw,
+            base_price=item.base_price,
+            size=item.size,
+        )
+        for item in items
+    ]
+
+
+def _item_detail(db: Session, item: MenuItem) -> ItemDetailResponse:
+    variations = (
+        db.query(MenuVariation)
+        .filter(*_of_item(MenuVariation, item))
+        .order_by(MenuVariation.position)
+        .all()
+    )
+    addons = (
+        db.query(MenuAddon)
+        .filter(*_of_item(MenuAddon, item))
+        .order_by(MenuAddon.position)
+        .all()
+    )
+    (summary,) = _item_summaries(db, item.job_id, [item])
+    return ItemDetailResponse(
+        **summary.model_dump(),
+        variations=[VariationResponse.model_validate(v) for v in variations],
+        addons=[AddonResponse.model_validate(a) for a in addons],
+    )
+
+
+def _get_item(
+    db: Session, job_id: str, page_number: int, category_index: int, item_index: int
+) -> MenuItem:
+    item = db.query(MenuItem).filter(
+        MenuItem.job_id == job_id,
+        MenuItem.page_number == page_number,
+        MenuItem.category_index == category_index,
+        MenuItem.item_index == item_index,
+    ).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+
+# API endpoints
+
+
+@router.get("/{job_id}/categories", response_model=List[CategorySummary])
+def list_categories(job_id: str, db: Session = Depends(get_db)):
+    # Categories in menu order with their subcategory and item counts
+    _check_job(db, job_id)
+
+    def _counts(table):
+        return {
+            (row.page_number, row.category_index): row.count
+            for row in db.query(
+                table.page_number, table.category_index, func.count().label("count")
+            )
+            .filter(table.job_id == job_id)
+            .group_by(table.page_number, table.category_index)
+        }
+
+    subcategory_counts = _counts(MenuSubcategory)
+    item_counts = _counts(MenuItem)
+    categories = (
+        db.query(MenuCategory)
+        .filter(MenuCategory.job_id == job_id)
+        .order_by(MenuCategory.page_number, MenuCategory.category_index)
+        .all()
+    )
+    return [
+        CategorySummary(
+            page_number=c.page_number,
+            category_index=c.category_index,
+            name_raw=c.name_raw,
+            description_raw=c.description_raw,
+            subcategory_count=subcategory_counts.get((c.page_number, c.category_index), 0),
+            item_count=item_counts.get((c.page_number, c.category_index), 0),
+        )
+        for c in categories
+    ]
+
+
+@router.get(
+    "/{job_id}/categories/{page_number}/{category_index}",
+    response_model=CategoryDetailResponse,
+)
+def get_category(
+    job_id: str, page_number: int, category_index: int, db: Session = Depends(get_db)
+):
+    # One category with its subcategories and base options
+    category = _get_category(db, job_id, page_number, category_index)
+
+    subcategories = (
+        db.query(MenuSubcategory)
+        .filter(*_of_category(MenuSubcategory, category))
+        .order_by(MenuSubcategory.subcategory_index)
+        .all()
+    )
+    options = (
+        db.query(MenuOption)
+        .filter(*_of_category(MenuOption, category))
+        .order_by(MenuOption.scope, MenuOption.position)
+        .all()
+    )
+    item_count = (
+        db.query(func.count(MenuItem.id))
+        .filter(*_of_category(MenuItem, category))
+        .scalar()
+    )
+    return CategoryDetailResponse(
+        page_number=category.page_number,
+        category_index=category.category_index,
+        name_raw=category.name_raw,
+        description_raw=category.description_raw,
+        note=category.note,
+        subcategories=[
+            SubcategorySummary(
+                subcategory_index=s.subcategory_index,
+                name_raw=s.name_raw,
+                description_raw=s.description_raw,
+            )
+            for s in subcategories
+        ],
+        options=[OptionResponse.model_validate(o) for o in options],
+        item_count=item_count,
+    )
+
+
+@router.get("/{job_id}/items", response_model=List[ItemSummary])
+def list_items(
+    job_id: str,
+    page_number: Optional[int] = None,
+    category_index: Optional[int] = None,
+    name: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    # Items in menu order, optionally of one page or category or with a given name
+    _check_job(db, job_id)
+
+    query = db.query(MenuItem).filter(MenuItem.job_id == job_id)
+    if page_number is not None:
+        query = query.filter(MenuItem.page_number == page_number)
+    if category_index is not None:
+        if page_number is None:
+            raise HTTPException(
+                status_code=400, detail="category_index needs a page_number"
+            )
+        query = query.filter(MenuItem.category_index == category_index)
+    if name:
+        query = query.filter(MenuItem.name_raw == name)
+
+    items = (
+        query.order_by(MenuItem.page_number, MenuItem.category_index, MenuItem.item_index)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return _item_summaries(db, job_id, items)
+
+
+@router.get(
+    "/{job_id}/items/{page_number}/{category_index}/{item_index}",
+    response_model=ItemDetailResponse,
+)
+def get_item(
+    job_id: str,
+    page_number: int,
+    category_index: int,
+    item_index: int,
+    db: Session = Depends(get_db),
+):
+    # One item with its variations and addons
+    return _item_detail(db, _get_item(db, job_id, page_number, category_index, item_index))
+
+
+@router.patch(
+    "/{job_id}/items/{page_number}/{category_index}/{item_index}",
+    response_model=ItemDetailResponse,
+)
+def update_item(
+    job_id: str,
+    page_number: int,
+    category_index: int,
+    item_index: int,
+    request: UpdateItemRequest,
+    storage: Annotated[StorageService, Depends(get_storage)] = None,
+    db: Session = Depends(get_db),
+):
+    # Edit one item; the edit is written to the phase 2 document as well, so
+    # later phases and saves keep it
+    try:
+        _get_item(db, job_id, page_number, category_index, item_index)
+        if job_queue.active_entry(db, job_id, 2):
+            raise HTTPException(
+                status_code=409, detail="Phase 2 is still running for this job"
+            )
+
+        phase_store.edit_item(
+            db,
+            storage,
+            job_id,
+            page_number,
+            category_index,
+            item_index,
+            request.model_dump(exclude_unset=True),
+        )
+        return _item_detail(db, _get_item(db, job_id, page_number, category_index, item_index))
+
+    except HTTPException:
+        raise
+    except (FileNotFoundError, ItemNotFound) as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
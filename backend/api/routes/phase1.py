@@ -1,6 +1,7 @@
 # backend/api/routes/phase1.py
 # Endpoints for extracting categories from menu PDFs
 
+import asyncio
 from typing import Annotated
 from datetime import datetime
 
@@ -10,102 +11,83 @@ from sqlalchemy.orm import Session
 from backend.api.dependencies import get_storage, validate_pdf_upload
 from backend.api.schemas import (
     GetDataResponse,
-    Phase1Response,
+    JobAcceptedResponse,
     UpdateDataRequest,
     UpdateDataResponse,
 )
-from backend.core.extraction.phase1 import run_phase1
-from backend.services.storage import StorageService
+from backend.services import menu_store
+from backend.services.duplicates import reuse_duplicate
+from backend.services.job_runner import enqueue_phase
+from backend.services.storage import StorageService, UploadRejected
 from backend.database import get_db, Restaurant, PhaseData, ExtractionHistory
 
 router = APIRouter(prefix="/api/phase1", tags=["phase1"])
 
 
-@router.post("/extract", response_model=Phase1Response)
+@router.post("/extract", response_model=JobAcceptedResponse, status_code=202)
 async def extract_categories(
     restaurant_name: str = Form(...),
     pdf: UploadFile = File(...),
+    use_cache: bool = Form(True),
+    reuse_duplicates: bool = Form(True),
     storage: Annotated[StorageService, Depends(get_storage)] = None,
     validated_pdf: Annotated[UploadFile, Depends(validate_pdf_upload)] = None,
     db: Session = Depends(get_db),
 ):
-    # Upload PDF and extract categories
+    # Upload PDF and queue category extraction
     try:
         # Create job
         job_id = storage.new_job_id()
 
-        # Set context for dynamic headers
-        from backend.services.llm_client import set_restaurant_context
-        set_restaurant_context(restaurant_name)
-
         # Save PDF
-        pdf_path = await storage.save_pdf(job_id, pdf)
-
-        # Run extraction
-        result = await run_phase1(restaurant_name, str(pdf_path))
-
-        # Save raw output
-        storage.save_json(storage.phase1_raw_path(job_id), result)
+        stored = await storage.save_pdf(job_id, pdf)
 
-        # Also save as reviewed (user can edit later)
-        storage.save_json(storage.phase1_reviewed_path(job_id), result)
-
-        # Sync to database - create or update Restaurant
-        restaurant = db.query(Restaurant).filter(
-            Restaurant.job_id == job_id
-        ).first()
-        
-        if restaurant:
-            # Job exists, update it
-            restaurant.name = restaurant_name
-            restaurant.phase = 1
-            restaurant.json = result
-            restaurant.status = "phase1_complete"
-        else:
-            # New job, create it
-            restaurant = Restaurant(
-                job_id=job_id,
-                name=restaurant_name,
-                phase=1,
-                json=result,
-                status="phase1_complete",
-            )
-            db.add(restaurant)
+        # Create the job so its status can be polled right away
+        restaurant = Restaurant(
+            job_id=job_id,
+            name=restaurant_name,
+            pdf_sha256=stored.sha256,
+            page_count=stored.page_count,
+            phase=0,
+            status="created",
+        )
+        db.add(restaurant)
+        db.commit()
 
-        # UPSERT PhaseData - replace if exists, insert if not
-        phase_data = db.query(PhaseData).filter(
-            PhaseData.job_id == job_id,
-            PhaseData.phase == 1
-        ).first()
-        
-        if phase_data:
-            # Update existing snapshot
-            phase_data.json = result
-            phase_data.status = "success"
-            phase_data.datetime = datetime.utcnow()
-        else:
-            # Create new snapshot
-            phase_data = PhaseData(
-                job_id=job_id,
-                phase=1,
-                json=result,
-                status="success",
+        # Same PDF already extracted for this restaurant: reuse its results
+        # unless a fresh run was asked for
+        if reuse_duplicates and use_cache:
+            reused_from = await asyncio.to_thread(
+                reuse_duplicate, db, storage, job_id, 1
             )
-            db.add(phase_data)
+            if reused_from:
+                return JobAcceptedResponse(
+                    job_id=job_id,
+                    phase=1,
+                    status=restaurant.status,
+                    status_url=f"/api/jobs/{job_id}/status",
+                    message="Reused results of an identical upload",
+                    reused_from=reused_from,
+                )
+
+        # Run extraction in the background
+        status = enqueue_phase(
+            db,
+            job_id,
+            1,
+            restaurant_name=restaurant_name,
+            use_cache=use_cache,
+        )
 
-        # Always log extraction attempt
-        history = ExtractionHistory(
+        return JobAcceptedResponse(
             job_id=job_id,
             phase=1,
-            action="extract",
-            status="success",
+            status=status,
+            status_url=f"/api/jobs/{job_id}/status",
         )
-        db.add(history)
-
-        db.commit()
-
-        return Phase1Response(job_id=job_id, data=result)
 
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Phase 1 failed: {str(e)}")
@@ -119,9 +101,9 @@ async def get_categories(
     try:
         # Try reviewed first, fallback to raw
         try:
-            data = storage.load_json(storage.phase1_reviewed_path(job_id))
+            data = await storage.load_json_async(storage.phase1_reviewed_path(job_id))
         except FileNotFoundError:
-            data = storage.load_json(storage.phase1_raw_path(job_id))
+            data = await storage.load_json_async(storage.phase1_raw_path(job_id))
 
         return GetDataResponse(job_id=job_id, data=data)
 
@@ -149,7 +131,7 @@ async def update_categories(
             Categories.model_validate(page["data"])
 
         # Save reviewed data to file
-        storage.save_json(storage.phase1_reviewed_path(job_id), request.data)
+        await storage.save_json_async(storage.phase1_reviewed_path(job_id), request.data)
 
         # Update database
         restaurant = db.query(Restaurant).filter(
@@ -169,6 +151,7 @@ async def update_categories(
             if phase_data:
                 phase_data.json = request.data
                 phase_data.datetime = datetime.utcnow()
+            menu_store.save_phase(db, job_id, 1, request.data)
             
             # Log manual edit
             history = ExtractionHistory(
@@ -1,7 +1,7 @@
 # backend/api/routes/phase2.py
 # Endpoints for extracting menu items
 
-from typing import Annotated
+from typing import Annotated, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -10,90 +10,119 @@ from sqlalchemy.orm import Session
 from backend.api.dependencies import get_storage
 from backend.api.schemas import (
     GetDataResponse,
-    Phase2Response,
+    JobAcceptedResponse,
+    ReextractRequest,
+    ReextractResponse,
     UpdateDataRequest,
     UpdateDataResponse,
 )
-from backend.core.extraction.phase2 import run_phase2
+from backend.core.extraction.reextract import CategoryNotFound, EarlierPhaseFailed
+from backend.services import job_queue, menu_store
+from backend.services.job_runner import enqueue_phase, reextract_phase_category
 from backend.services.storage import StorageService
 from backend.database import get_db, Restaurant, PhaseData, ExtractionHistory, CategorySizes
 
 router = APIRouter(prefix="/api/phase2", tags=["phase2"])
 
 
-@router.post("/extract", response_model=Phase2Response)
+@router.post("/extract", response_model=JobAcceptedResponse, status_code=202)
 async def extract_items(
     job_id: str,
+    use_cache: bool = True,
+    partial: Optional[bool] = None,
     storage: Annotated[StorageService, Depends(get_storage)] = None,
     db: Session = Depends(get_db),
 ):
-    # Extract items from the categories
+    # Queue item extraction from the categories
     try:
-        # Load inputs
-        reviewed_data = storage.load_json(storage.phase1_reviewed_path(job_id))
+        # Check inputs; the worker loads them when the run starts
+        input_path = storage.phase1_reviewed_path(job_id)
+        if not storage.exists(input_path):
+            raise FileNotFoundError(f"File not found: {input_path}")
         pdf_path = storage.pdf_path(job_id)
 
         if not storage.exists(pdf_path):
             raise HTTPException(status_code=404, detail="PDF not found")
 
-        # Run extraction
-        result = await run_phase2(
-            reviewed_data["restaurant_name"], reviewed_data, str(pdf_path)
-        )
-
-        # Save output
-        storage.save_json(storage.phase2_path(job_id), result)
-
-        # Update database - find existing job
         restaurant = db.query(Restaurant).filter(
             Restaurant.job_id == job_id
         ).first()
-        
-        if restaurant:
-            restaurant.phase = 2
-            restaurant.json = result
-            restaurant.status = "phase2_complete"
-        else:
+        if not restaurant:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        # UPSERT PhaseData - replace if exists
-        phase_data = db.query(PhaseData).filter(
-            PhaseData.job_id == job_id,
-            PhaseData.phase == 2
-        ).first()
-        
-        if phase_data:
-            phase_data.json = result
-            phase_data.status = "success"
-            phase_data.datetime = datetime.utcnow()
-        else:
-            phase_data = PhaseData(
-                job_id=job_id,
-                phase=2,
-                json=result,
-                status="success",
-            )
-            db.add(phase_data)
+        # Run extraction in the background
+        status = enqueue_phase(
+            db,
+            job_id,
+            2,
+            restaurant_name=restaurant.name,
+            use_cache=use_cache,
+            partial=partial,
+        )
 
-        # Log extraction
-        history = ExtractionHistory(
+        return JobAcceptedResponse(
             job_id=job_id,
             phase=2,
-            action="extract",
-            status="success",
+            status=status,
+            status_url=f"/api/jobs/{job_id}/status",
         )
-        db.add(history)
 
-        db.commit()
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Phase 2 failed: {str(e)}")
+
+
+@router.post("/reextract", response_model=ReextractResponse)
+async def reextract_category(
+    request: ReextractRequest,
+    use_cache: bool = False,
+    db: Session = Depends(get_db),
+):
+    # Re-run phase 2 for one category and splice it into the stored result
+    try:
+        restaurant = db.query(Restaurant).filter(
+            Restaurant.job_id == request.job_id
+        ).first()
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job_queue.active_entry(db, request.job_id, 2):
+            raise HTTPException(
+                status_code=409, detail="Phase 2 is still running for this job"
+            )
 
-        return Phase2Response(job_id=job_id, data=result)
+        category = await reextract_phase_category(
+            db,
+            request.job_id,
+            2,
+            request.page_number,
+            request.category_name,
+            use_cache=use_cache,
+        )
+
+        return ReextractResponse(
+            job_id=request.job_id,
+            page_number=request.page_number,
+            category_name=request.category_name,
+            data=category,
+        )
 
+    except HTTPException:
+        raise
+    except CategoryNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except EarlierPhaseFailed as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except FileNotFoundError as e:
         db.rollback()
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Phase 2 failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Re-extraction failed: {str(e)}")
 
 
 @router.get("/{job_id}", response_model=GetDataResponse)
@@ -102,7 +131,7 @@ async def get_items(
 ):
     # Get the extracted items
     try:
-        data = storage.load_json(storage.phase2_path(job_id))
+        data = await storage.load_json_async(storage.phase2_path(job_id))
         return GetDataResponse(job_id=job_id, data=data)
 
     except FileNotFoundError:
@@ -130,7 +159,7 @@ async def update_items(
                 CategoryWithItems.model_validate(cat)
 
         # Save data to file
-        storage.save_json(storage.phase2_path(job_id), request.data)
+        await storage.save_json_async(storage.phase2_path(job_id), request.data)
 
         # Update database
         restaurant = db.query(Restaurant).filter(
@@ -150,6 +179,7 @@ async def update_items(
             if phase_data:
                 phase_data.json = request.data
                 phase_data.datetime = datetime.utcnow()
+            menu_store.save_phase(db, job_id, 2, request.data)
             
             # Log manual edit
             history = ExtractionHistory(
@@ -1,7 +1,7 @@
 # backend/api/routes/phase3.py
 # Endpoints for extracting item variations
 
-from typing import Annotated
+from typing import Annotated, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -10,87 +10,119 @@ from sqlalchemy.orm import Session
 from backend.api.dependencies import get_storage
 from backend.api.schemas import (
     GetDataResponse,
-    Phase3Response,
+    JobAcceptedResponse,
+    ReextractRequest,
+    ReextractResponse,
     UpdateDataRequest,
     UpdateDataResponse,
 )
-from backend.core.extraction.phase3 import run_phase3
+from backend.core.extraction.reextract import CategoryNotFound, EarlierPhaseFailed
+from backend.services import job_queue, menu_store
+from backend.services.job_runner import enqueue_phase, reextract_phase_category
 from backend.services.storage import StorageService
 from backend.database import get_db, Restaurant, PhaseData, ExtractionHistory
 
 router = APIRouter(prefix="/api/phase3", tags=["phase3"])
 
 
-@router.post("/extract", response_model=Phase3Response)
+@router.post("/extract", response_model=JobAcceptedResponse, status_code=202)
 async def extract_bases(
     job_id: str,
+    use_cache: bool = True,
+    partial: Optional[bool] = None,
     storage: Annotated[StorageService, Depends(get_storage)] = None,
     db: Session = Depends(get_db),
 ):
-    # Extract item variations (sizes, etc.)
+    # Queue extraction of item variations (sizes, etc.)
     try:
-        items_data = storage.load_json(storage.phase2_path(job_id))
+        # Check inputs; the worker loads them when the run starts
+        input_path = storage.phase2_path(job_id)
+        if not storage.exists(input_path):
+            raise FileNotFoundError(f"File not found: {input_path}")
         pdf_path = storage.pdf_path(job_id)
 
         if not storage.exists(pdf_path):
             raise HTTPException(status_code=404, detail="PDF not found")
 
-        result = await run_phase3(
-            items_data["restaurant_name"], items_data, str(pdf_path)
-        )
-
-        storage.save_json(storage.phase3_path(job_id), result)
-
-        # Update database
         restaurant = db.query(Restaurant).filter(
             Restaurant.job_id == job_id
         ).first()
-        
-        if restaurant:
-            restaurant.phase = 3
-            restaurant.json = result
-            restaurant.status = "phase3_complete"
-        else:
+        if not restaurant:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        # UPSERT PhaseData
-        phase_data = db.query(PhaseData).filter(
-            PhaseData.job_id == job_id,
-            PhaseData.phase == 3
-        ).first()
-        
-        if phase_data:
-            phase_data.json = result
-            phase_data.status = "success"
-            phase_data.datetime = datetime.utcnow()
-        else:
-            phase_data = PhaseData(
-                job_id=job_id,
-                phase=3,
-                json=result,
-                status="success",
-            )
-            db.add(phase_data)
+        # Run extraction in the background
+        status = enqueue_phase(
+            db,
+            job_id,
+            3,
+            restaurant_name=restaurant.name,
+            use_cache=use_cache,
+            partial=partial,
+        )
 
-        # Log extraction
-        history = ExtractionHistory(
+        return JobAcceptedResponse(
             job_id=job_id,
             phase=3,
-            action="extract",
-            status="success",
+            status=status,
+            status_url=f"/api/jobs/{job_id}/status",
         )
-        db.add(history)
 
-        db.commit()
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Phase 3 failed: {str(e)}")
+
+
+@router.post("/reextract", response_model=ReextractResponse)
+async def reextract_category(
+    request: ReextractRequest,
+    use_cache: bool = False,
+    db: Session = Depends(get_db),
+):
+    # Re-run phase 3 for one category and splice it into the stored result
+    try:
+        restaurant = db.query(Restaurant).filter(
+            Restaurant.job_id == request.job_id
+        ).first()
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job_queue.active_entry(db, request.job_id, 3):
+            raise HTTPException(
+                status_code=409, detail="Phase 3 is still running for this job"
+            )
+
+        category = await reextract_phase_category(
+            db,
+            request.job_id,
+            3,
+            request.page_number,
+            request.category_name,
+            use_cache=use_cache,
+        )
 
-        return Phase3Response(job_id=job_id, data=result)
+        return ReextractResponse(
+            job_id=request.job_id,
+            page_number=request.page_number,
+            category_name=request.category_name,
+            data=category,
+        )
 
+    except HTTPException:
+        raise
+    except CategoryNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except EarlierPhaseFailed as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except FileNotFoundError as e:
         db.rollback()
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Phase 3 failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Re-extraction failed: {str(e)}")
 
 
 @router.get("/{job_id}", response_model=GetDataResponse)
@@ -99,7 +131,7 @@ async def get_bases(
 ):
     """Get Phase 3 bases for editing."""
     try:
-        data = storage.load_json(storage.phase3_path(job_id))
+        data = await storage.load_json_async(storage.phase3_path(job_id))
         return GetDataResponse(job_id=job_id, data=data)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Phase 3 data not found")
@@ -125,7 +157,7 @@ async def update_bases(
                 CategoryWithItems.model_validate(cat)
 
         # Save to file
-        storage.save_json(storage.phase3_path(job_id), request.data)
+        await storage.save_json_async(storage.phase3_path(job_id), request.data)
 
         # Update database
         restaurant = db.query(Restaurant).filter(
@@ -145,6 +177,7 @@ async def update_bases(
             if phase_data:
                 phase_data.json = request.data
                 phase_data.datetime = datetime.utcnow()
+            menu_store.save_phase(db, job_id, 3, request.data)
             
             # Log manual edit
             history = ExtractionHistory(
@@ -1,7 +1,7 @@
 # backend/api/routes/phase4.py
 # Endpoints for extracting add-ons and final menu data
 
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
@@ -9,11 +9,15 @@ from sqlalchemy.orm import Session
 from backend.api.dependencies import get_storage
 from backend.api.schemas import (
     GetDataResponse,
-    Phase4Response,
+    JobAcceptedResponse,
+    ReextractRequest,
+    ReextractResponse,
     UpdateDataRequest,
     UpdateDataResponse,
 )
-from backend.core.extraction.phase4 import run_phase4
+from backend.core.extraction.reextract import CategoryNotFound, EarlierPhaseFailed
+from backend.services import job_queue, menu_store
+from backend.services.job_runner import enqueue_phase, reextract_phase_category
 from backend.services.storage import StorageService
 from backend.database import get_db, Restaurant, PhaseData, ExtractionHistory
 from datetime import datetime
@@ -21,77 +25,104 @@ from datetime import datetime
 router = APIRouter(prefix="/api/phase4", tags=["phase4"])
 
 
-@router.post("/extract", response_model=Phase4Response)
+@router.post("/extract", response_model=JobAcceptedResponse, status_code=202)
 async def extract_addons(
     job_id: str,
+    use_cache: bool = True,
+    partial: Optional[bool] = None,
     storage: Annotated[StorageService, Depends(get_storage)] = None,
     db: Session = Depends(get_db),
 ):
-    # Extract add-ons and create final complete menu
+    # Queue extraction of add-ons for the final complete menu
     try:
-        items_data = storage.load_json(storage.phase2_path(job_id))
-        bases_data = storage.load_json(storage.phase3_path(job_id))
+        # Check inputs; the worker loads them when the run starts
+        for path in (storage.phase2_path(job_id), storage.phase3_path(job_id)):
+            if not storage.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
         pdf_path = storage.pdf_path(job_id)
 
         if not storage.exists(pdf_path):
             raise HTTPException(status_code=404, detail="PDF not found")
 
-        result = await run_phase4(
-            items_data["restaurant_name"], items_data, bases_data, str(pdf_path)
-        )
-
-        storage.save_json(storage.phase4_path(job_id), result)
-
-        # Update database
         restaurant = db.query(Restaurant).filter(
             Restaurant.job_id == job_id
         ).first()
-        
-        if restaurant:
-            restaurant.phase = 4
-            restaurant.json = result
-            restaurant.status = "phase4_complete"
-        else:
+        if not restaurant:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        # UPSERT PhaseData
-        phase_data = db.query(PhaseData).filter(
-            PhaseData.job_id == job_id,
-            PhaseData.phase == 4
-        ).first()
-        
-        if phase_data:
-            phase_data.json = result
-            phase_data.status = "success"
-            phase_data.datetime = datetime.utcnow()
-        else:
-            phase_data = PhaseData(
-                job_id=job_id,
-                phase=4,
-                json=result,
-                status="success",
-            )
-            db.add(phase_data)
+        # Run extraction in the background
+        status = enqueue_phase(
+            db,
+            job_id,
+            4,
+            restaurant_name=restaurant.name,
+            use_cache=use_cache,
+            partial=partial,
+        )
 
-        # Log extraction
-        history = ExtractionHistory(
+        return JobAcceptedResponse(
             job_id=job_id,
             phase=4,
-            action="extract",
-            status="success",
+            status=status,
+            status_url=f"/api/jobs/{job_id}/status",
         )
-        db.add(history)
 
-        db.commit()
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Phase 4 failed: {str(e)}")
+
+
+@router.post("/reextract", response_model=ReextractResponse)
+async def reextract_category(
+    request: ReextractRequest,
+    use_cache: bool = False,
+    db: Session = Depends(get_db),
+):
+    # Re-run phase 4 for one category and splice it into the stored result
+    try:
+        restaurant = db.query(Restaurant).filter(
+            Restaurant.job_id == request.job_id
+        ).first()
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job_queue.active_entry(db, request.job_id, 4):
+            raise HTTPException(
+                status_code=409, detail="Phase 4 is still running for this job"
+            )
+
+        category = await reextract_phase_category(
+            db,
+            request.job_id,
+            4,
+            request.page_number,
+            request.category_name,
+            use_cache=use_cache,
+        )
 
-        return Phase4Response(job_id=job_id, data=result)
+        return ReextractResponse(
+            job_id=request.job_id,
+            page_number=request.page_number,
+            category_name=request.category_name,
+            data=category,
+        )
 
+    except HTTPException:
+        raise
+    except CategoryNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except EarlierPhaseFailed as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except FileNotFoundError as e:
         db.rollback()
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Phase 4 failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Re-extraction failed: {str(e)}")
 
 
 @router.get("/{job_id}", response_model=GetDataResponse)
@@ -100,7 +131,7 @@ async def get_final_result(
 ):
     """Get Phase 4 final result."""
     try:
-        data = storage.load_json(storage.phase4_path(job_id))
+        data = await storage.load_json_async(storage.phase4_path(job_id))
         return GetDataResponse(job_id=job_id, data=data)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Phase 4 data not found")
@@ -125,7 +156,7 @@ async def update_final_result(
                 CategoryItemAddons.model_validate(category)
 
         # Save updated data to file
-        storage.save_json(storage.phase4_path(job_id), request.data)
+        await storage.save_json_async(storage.phase4_path(job_id), request.data)
 
         # Update database
         restaurant = db.query(Restaurant).filter(
@@ -145,6 +176,7 @@ async def update_final_result(
             if phase_data:
                 phase_data.json = request.data
                 phase_data.datetime = datetime.utcnow()
+            menu_store.save_phase(db, job_id, 4, request.data)
             
             # Log manual edit
             history = ExtractionHistory(
@@ -0,0 +1,89 @@
+# backend/api/routes/pipeline.py
+# Endpoint for running all phases end to end without review
+
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from backend.api.dependencies import get_storage, validate_pdf_upload
+from backend.api.schemas import JobAcceptedResponse
+from backend.services.duplicates import reuse_duplicate
+from backend.services.job_runner import enqueue_phase
+from backend.services.phase_store import PIPELINE
+from backend.services.storage import StorageService, UploadRejected
+from backend.database import get_db, Restaurant
+
+router = APIRouter(prefix="/api/pipeline", tags=["pipeline"])
+
+
+@router.post("/extract", response_model=JobAcceptedResponse, status_code=202)
+async def extract_menu(
+    restaurant_name: str = Form(...),
+    pdf: UploadFile = File(...),
+    use_cache: bool = Form(True),
+    reuse_duplicates: bool = Form(True),
+    storage: Annotated[StorageService, Depends(get_storage)] = None,
+    validated_pdf: Annotated[UploadFile, Depends(validate_pdf_upload)] = None,
+    db: Session = Depends(get_db),
+):
+    # Upload PDF and queue phases 1-4 chained per page and category.
+    # Every phase's result is saved as if it had been run on its own.
+    try:
+        # Create job
+        job_id = storage.new_job_id()
+
+        # Save PDF
+        stored = await storage.save_pdf(job_id, pdf)
+
+        # Create the job so its status can be polled right away
+        restaurant = Restaurant(
+            job_id=job_id,
+            name=restaurant_name,
+            pdf_sha256=stored.sha256,
+            page_count=stored.page_count,
+            phase=0,
+            status="created",
+        )
+        db.add(restaurant)
+        db.commit()
+
+        # Same PDF already extracted for this restaurant: reuse its results
+        # unless a fresh run was asked for
+        if reuse_duplicates and use_cache:
+            reused_from = await asyncio.to_thread(
+                reuse_duplicate, db, storage, job_id, PIPELINE
+            )
+            if reused_from:
+                return JobAcceptedResponse(
+                    job_id=job_id,
+                    phase=PIPELINE,
+                    status=restaurant.status,
+                    status_url=f"/api/jobs/{job_id}/status",
+                    message="Reused results of an identical upload",
+                    reused_from=reused_from,
+                )
+
+        # Run extraction in the background
+        status = enqueue_phase(
+            db,
+            job_id,
+            PIPELINE,
+            restaurant_name=restaurant_name,
+            use_cache=use_cache,
+        )
+
+        return JobAcceptedResponse(
+            job_id=job_id,
+            phase=PIPELINE,
+            status=status,
+            status_url=f"/api/jobs/{job_id}/status",
+            message="Pipeline queued",
+        )
+
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Pipeline failed: {str(e)}")
@@ -1,7 +1,7 @@
 # backend/api/schemas.py
 """API request/response schemas."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -40,6 +40,37 @@ class Phase4Response(BaseModel):
     message: str = "Phase 4 extraction complete"
 
 
+class JobAcceptedResponse(BaseModel):
+    success: bool = True
+    job_id: str
+    phase: int
+    status: str
+    status_url: str
+    message: str = "Extraction queued"
+    reused_from: Optional[str] = None  # job whose results an identical upload reused
+
+
+class IngestedJob(BaseModel):
+    job_id: str
+    filename: str
+    restaurant_name: str
+    status: str
+    reused_from: Optional[str] = None
+
+
+class SkippedFile(BaseModel):
+    filename: str
+    reason: str
+
+
+class BulkIngestResponse(BaseModel):
+    success: bool = True
+    phase: int
+    jobs: List[IngestedJob]
+    skipped: List[SkippedFile]
+    message: str = "PDFs queued"
+
+
 class GetDataResponse(BaseModel):
     success: bool = True
     job_id: str
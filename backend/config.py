@@ -30,6 +30,7 @@ class Settings(BaseSettings):
     UPLOADS_DIR: Path = STORAGE_DIR / "uploads"
     OUTPUTS_DIR: Path = STORAGE_DIR / "outputs"
     PROMPTS_DIR: Path = BASE_DIR / "core" / "prompts" / "templates"
+    STORAGE_PRETTY_JSON: bool = False  # indent saved phase files (slower, larger)
 
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL") or ""
@@ -37,8 +38,63 @@ class Settings(BaseSettings):
         raise RuntimeError("DATABASE_URL is not set. Expected a MySQL connection string.")
 
     # Processing
-    MAX_CONCURRENCY: int = 4
+    MAX_CONCURRENCY: int = 4  # initial process-wide limit on LLM calls
+    JOB_WORKERS: int = 2  # phase extractions run in the background at once
+    JOB_POLL_INTERVAL_S: float = 2.0  # idle workers check the job queue this often
+    EXTRACTION_PARTIAL_SUCCESS: bool = False  # save good categories when others fail
+    JOB_RUN_IN_API: bool = True  # False: only `python -m backend.worker` runs jobs
+    JOB_LEASE_S: float = 120.0  # claimed runs reappear after this without a heartbeat
+    JOB_HEARTBEAT_S: float = 30.0  # workers extend the lease of their runs this often
+    JOB_MAX_ATTEMPTS: int = 2
+    JOB_RETRY_DELAY_S: float = 30.0  # doubled on every further attempt
+    JOB_MAX_STARTS_PER_MINUTE: int = 0  # 0 = no limit
+    INGEST_MAX_FILES: int = 500  # PDFs accepted per bulk ingestion request
+    INGEST_MAX_REQUEST_MB: int = 2048  # whole bulk ingestion request body
+    PIPELINE_MAX_PAGES: int = 4  # pages in progress at once in pipeline runs
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 16
     MAX_FILE_SIZE_MB: int = 50
+    MAX_PDF_PAGES: int = 0  # 0 = no limit
+
+    # LLM HTTP connection pool
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_TIMEOUT_S: float = 180.0
+    LLM_CONNECT_TIMEOUT_S: float = 10.0
+    LLM_HTTP2: bool = False  # needs the h2 package: pip install 'httpx[http2]'
+    LLM_STREAM: bool = False  # stream completions and check the JSON as it arrives
+
+    # LLM retries (budgets are retries per error class)
+    LLM_RETRY_BASE_DELAY_S: float = 0.5
+    LLM_RETRY_MAX_DELAY_S: float = 30.0
+    LLM_RETRY_BUDGET_RATE_LIMIT: int = 5
+    LLM_RETRY_BUDGET_TIMEOUT: int = 2
+    LLM_RETRY_BUDGET_SERVER_ERROR: int = 3
+    LLM_RETRY_BUDGET_SCHEMA: int = 2
+
+    # LLM hedging: duplicate calls slower than a latency percentile
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_MAX_EXTRA_RATIO: float = 0.1  # cap on extra calls vs. total calls
+
+    # Categories of one page extracted per call in phases 2-4 (1 disables batching)
+    LLM_BATCH_CATEGORIES: int = 1
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: Path = STORAGE_DIR / "llm_cache.sqlite3"
+    LLM_CACHE_TTL_HOURS: int = 24 * 7
+    LLM_CACHE_MAX_MB: int = 1024
+
+    # Rendered page cache
+    PAGE_RENDER_ZOOM: float = 2.0
+    PAGE_CACHE_MAX_MB: int = 512
+
+    # Rasterization pool
+    RENDER_WORKERS: int = 2
+    RENDER_PAGE_TIMEOUT_S: float = 60.0
+    PAGE_QUEUE_SIZE: int = 4  # rendered pages buffered ahead of LLM calls
 
     CORS_ORIGINS: list = [
         "http://localhost:3000",
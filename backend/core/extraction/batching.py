@@ -0,0 +1,146 @@
+"""
+Multi-category batching.
+Extracts several categories of one page in a single structured call, and
+splits a batch in halves down to single-category calls when it fails.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, TypeVar
+
+from backend.core.extraction.runner import WorkUnit, unit_cost
+from backend.services.retry import ErrorClass, classify
+
+T = TypeVar("T")
+
+# Failures a smaller batch may not hit: invalid output and overlong calls
+_SPLITTABLE = {ErrorClass.SCHEMA, ErrorClass.TIMEOUT}
+
+
+def _name_key(value: Any) -> str:
+    # Category name of an entry or result; phase 4 entries are (category, base)
+    if isinstance(value, tuple):
+        value = value[0]
+    if isinstance(value, dict):
+        value = value.get("name_raw", value.get("name", ""))
+    return " ".join(str(value or "").split()).casefold()
+
+
+def _match_results(entries: Sequence[Any], results: List[Any]) -> List[Any]:
+    """
+    Line batched results up with their entries by category name.
+
+    A reply that reorders categories is put back in entry order; one that
+    drops, adds or renames a category raises ValueError (a SCHEMA failure),
+    so the batch is split instead of saving results under the wrong category.
+    """
+    if len(results) != len(entries):
+        raise ValueError(f"expected {len(entries)} categories, got {len(results)}")
+
+    wanted = [_name_key(entry) for entry in entries]
+    got = [_name_key(result) for result in results]
+    if got == wanted:
+        return results
+
+    by_name: Dict[str, Any] = dict(zip(got, results))
+    if len(by_name) != len(results) or sorted(got) != sorted(wanted):
+        raise ValueError(
+            f"batched categories {got} don't match the requested {wanted}"
+        )
+    return [by_name[name] for name in wanted]
+
+
+async def run_batch(
+    entries: Sequence[T],
+    run_many: Callable[[Sequence[T]], Awaitable[List[Any]]],
+    run_one: Callable[[T], Awaitable[Any]],
+    label: str = "Batch",
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Extract entries with one call, falling back to halves on failure.
+
+    Args:
+        entries: Per-category inputs
+        run_many: Batched call, returning one result per entry; results are
+            matched to entries by category name
+        run_one: Single-category call, used once a batch is down to one entry
+        label: Description of the batch for logs
+        return_exceptions: Put the exception of a half that failed in the
+            slots of its entries instead of failing the other half too
+
+    Returns:
+        One result (or exception) per entry, in order
+    """
+    if len(entries) == 1:
+        return [await run_one(entries[0])]
+
+    try:
+        return _match_results(entries, await run_many(entries))
+    except Exception as e:
+        if classify(e) not in _SPLITTABLE:
+            raise
+        print(f"{label} - Batch of {len(entries)} failed ({e}), splitting")
+
+    mid = len(entries) // 2
+    halves = [entries[:mid], entries[mid:]]
+    results = await asyncio.gather(
+        *(
+            run_batch(half, run_many, run_one, label, return_exceptions)
+            for half in halves
+        ),
+        return_exceptions=return_exceptions,
+    )
+    return [
+        item
+        for half, result in zip(halves, results)
+        for item in (
+            [result] * len(half) if isinstance(result, Exception) else result
+        )
+    ]
+
+
+def batch_units(
+    page_number: int,
+    entries: Sequence[T],
+    batch_size: int,
+    run_many: Callable[[str, Sequence[T]], Awaitable[List[Any]]],
+    run_one: Callable[[str, T], Awaitable[Any]],
+    label: str = "Batch",
+    return_exceptions: bool = False,
+) -> List[WorkUnit]:
+    """
+    Work units for the categories of one page, batch_size categories each.
+
+    A batch_size of 1 gives one single-category unit per entry. With
+    return_exceptions (partial mode) a batch unit returns the exception of
+    each category that failed in its slot.
+    """
+    units = []
+    for start in range(0, len(entries), max(1, batch_size)):
+        chunk = list(entries[start : start + max(1, batch_size)])
+        if len(chunk) == 1:
+            units.append(
+                WorkUnit(
+                    page_number=page_number,
+                    index=start,
+                    run=lambda img, entry=chunk[0]: run_one(img, entry),
+                    cost=unit_cost(chunk[0]),
+                )
+            )
+            continue
+        units.append(
+            WorkUnit(
+                page_number=page_number,
+                index=start,
+                run=lambda img, chunk=chunk: run_batch(
+                    chunk,
+                    lambda part: run_many(img, part),
+                    lambda entry: run_one(img, entry),
+                    label=f"{label} - Page {page_number}",
+                    return_exceptions=return_exceptions,
+                ),
+                cost=unit_cost(*chunk),
+                span=len(chunk),
+            )
+        )
+    return units
@@ -0,0 +1,58 @@
+"""
+Partial results.
+In partial mode a category that fails doesn't abort its phase: its slot gets
+an empty result carrying the error, the other categories are saved, and
+later phases pass the failure on instead of extracting from it. Only the
+failed categories then need re-extracting.
+"""
+
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel
+
+
+def failed_result(
+    model_cls: Type[BaseModel], category: Dict[str, Any], error: Any
+) -> Dict[str, Any]:
+    """Empty result of a phase's model standing in for a failed category."""
+    result = model_cls(name_raw=category.get("name_raw", "unknown")).model_dump()
+    result["error"] = str(error) or type(error).__name__
+    return result
+
+
+def is_failed(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+def settle(
+    results: List[Any], categories: List[Dict[str, Any]], model_cls: Type[BaseModel]
+) -> List[Any]:
+    """Replace the exceptions of failed units with failed results."""
+    return [
+        failed_result(model_cls, category, result)
+        if isinstance(result, Exception)
+        else result
+        for result, category in zip(results, categories)
+    ]
+
+
+def failures(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Failed categories of a phase 2-4 payload."""
+    return [
+        {
+            "page_number": page["page_number"],
+            "index": index,
+            "name_raw": category.get("name_raw"),
+            "error": category["error"],
+        }
+        for page in payload.get("pages", [])
+        for index, category in enumerate(page.get("categories", []))
+        if is_failed(category)
+    ]
+
+
+def describe_failures(failed: List[Dict[str, Any]]) -> str:
+    """One-line summary of failed categories, e.g. for the history log."""
+    return "; ".join(
+        f"Page {f['page_number']} '{f['name_raw']}': {f['error']}" for f in failed
+    )
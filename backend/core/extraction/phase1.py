@@ -3,14 +3,15 @@ Phase 1: Category Discovery
 Extracts category headers and descriptions from menu PDF pages.
 """
 
-import asyncio
-import json
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 from backend.config import get_settings
+from backend.core.extraction.reuse import input_hash
+from backend.core.extraction.runner import PhaseRunner, WorkUnit
 from backend.core.processors.pdf import PDFProcessor, get_pdf_processor
 from backend.core.prompts.builder import get_prompt_builder
 from backend.models.domain import Categories
+from backend.services.checkpoint import get_checkpoint
 from backend.services.llm_client import LLMClient, get_llm_client
 
 
@@ -26,7 +27,10 @@ class Phase1Extractor:
         self.llm = llm_client
         self.pdf_processor = pdf_processor
         self.prompt_builder = get_prompt_builder()
-        self.max_concurrency = max_concurrency or get_settings().MAX_CONCURRENCY
+        # Calls are throttled by the process-wide limiter; the runner only
+        # needs enough workers to use the largest limit it may grant
+        self.max_concurrency = max_concurrency or get_settings().LLM_CONCURRENCY_MAX
+        self.runner = PhaseRunner(self.max_concurrency)
 
     async def extract_page(
         self, restaurant_name: str, page_number: int, page_image: str
@@ -42,58 +46,27 @@ class Phase1Extractor:
         Returns:
             Dict with page_number and extracted data
         """
-        max_retries = 2
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                # Build prompt
-                prompt = self.prompt_builder.phase1_prompt(restaurant_name, page_number)
-
-                # Prepare message
-                message_content = [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{page_image}"},
-                    },
-                ]
-
-                # Call LLM
-                response = await self.llm.generate(
-                    messages=[{"role": "user", "content": message_content}],
-                    response_format=self.llm.json_schema_format(Categories),
-                )
-
-                # Parse and validate
-                raw = response.choices[0].message.content
-                try:
-                    data = json.loads(raw)
-                except json.JSONDecodeError as e:
-                    error_msg = f"JSON decode error at position {e.pos}: {e.msg}"
-                    print(f"Phase 1, Attempt {attempt + 1}/{max_retries} - Failed to parse LLM response: {error_msg}")
-                    print(f"Raw response (first 500 chars): {raw[:500]}")
-                    print(f"Raw response (around error): {raw[max(0, e.pos-100):e.pos+100]}")
-                    
-                    if attempt < max_retries - 1:
-                        print(f"Retrying page {page_number}...")
-                        await asyncio.sleep(1)
-                        continue
-                    
-                    raise ValueError(f"LLM returned invalid JSON for page {page_number}: {error_msg}")
-                
-                validated = Categories.model_validate(data)
-                return {"page_number": page_number, "data": validated.model_dump()}
-                
-            except Exception as e:
-                last_error = e
-                if attempt < max_retries - 1:
-                    print(f"Phase 1, Attempt {attempt + 1}/{max_retries} failed: {str(e)}")
-                    await asyncio.sleep(1)
-                    continue
-                raise
-        
-        raise last_error if last_error else ValueError("All retry attempts failed")
+        # Build prompt
+        prompt = self.prompt_builder.phase1_prompt(restaurant_name, page_number)
+
+        # Prepare message
+        message_content = [
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/png;base64,{page_image}"},
+            },
+        ]
+
+        # Call LLM (retried per the client's policy, served from the
+        # response cache if unchanged)
+        result = await self.llm.generate_structured(
+            messages=[{"role": "user", "content": message_content}],
+            model_cls=Categories,
+            phase="phase1",
+            label=f"Phase 1 - Page {page_number}",
+        )
+        return {"page_number": page_number, "data": result.data}
 
     async def extract_all_pages(
         self, restaurant_name: str, pdf_path: str
@@ -108,29 +81,41 @@ class Phase1Extractor:
         Returns:
             Complete phase 1 output with all pages
         """
-        # Convert PDF to images
-        images = await self.pdf_processor.convert_to_images(pdf_path)
-
-        # Create coroutines for all pages
-        coros = [
-            self.extract_page(restaurant_name, page_idx, img)
-            for page_idx, img in enumerate(images, start=1)
+        page_count = await self.pdf_processor.page_count(pdf_path)
+
+        # Pages finished by an earlier attempt of this run are kept
+        checkpoint = get_checkpoint()
+        done = checkpoint.load() if checkpoint else {}
+        keys = {
+            n: input_hash(restaurant_name, n) for n in range(1, page_count + 1)
+        }
+        resumed = {n: done[(n, key)] for n, key in keys.items() if (n, key) in done}
+
+        # One unit per page; LLM calls start as soon as each page is rendered
+        units = [
+            WorkUnit(
+                page_number=page_number,
+                index=0,
+                run=lambda img, n=page_number: self.extract_page(
+                    restaurant_name, n, img
+                ),
+            )
+            for page_number in keys
+            if page_number not in resumed
         ]
 
-        # Run with concurrency limit
-        pages = await self._bounded_gather(coros)
+        def _record(page_number: int, _: int, page: Dict[str, Any]) -> None:
+            checkpoint.append(page_number, keys[page_number], page)
 
-        return {"restaurant_name": restaurant_name, "pages": pages}
+        results = await self.runner.run(
+            self.pdf_processor.iter_pages(pdf_path, [u.page_number for u in units]),
+            units,
+            on_result=_record if checkpoint else None,
+        )
+        results.update({n: [page] for n, page in resumed.items()})
 
-    async def _bounded_gather(self, coros: List) -> List:
-        """Run coroutines with concurrency limit"""
-        sem = asyncio.Semaphore(self.max_concurrency)
-
-        async def _run(coro):
-            async with sem:
-                return await coro
-
-        return await asyncio.gather(*(_run(c) for c in coros))
+        pages = [results[n][0] for n in sorted(results)]
+        return {"restaurant_name": restaurant_name, "pages": pages}
 
 
 # Convenience function for backward compatibility
@@ -3,15 +3,20 @@ Phase 2: Item Extraction
 Extracts menu items under each category discovered in Phase 1.
 """
 
-import asyncio
-import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from backend.config import get_settings
+from backend.core.extraction.batching import batch_units
+from backend.core.extraction.partial import settle
+from backend.core.extraction.reuse import ReusePlan, input_hash
+from backend.core.extraction.runner import PhaseRunner, WorkUnit, single_page
 from backend.core.processors.pdf import PDFProcessor, get_pdf_processor
 from backend.core.prompts.builder import get_prompt_builder
-from backend.models.domain import Categories, CategoryWithItems
+from backend.models.domain import Categories, CategoryWithItems, CategoryWithItemsBatch
+from backend.services.checkpoint import get_checkpoint
 from backend.services.llm_client import LLMClient, get_llm_client
+from backend.services.progress import report_units
+from backend.services.retry import ErrorClass
 
 
 class Phase2Extractor:
@@ -22,11 +27,21 @@ class Phase2Extractor:
         llm_client: LLMClient,
         pdf_processor: PDFProcessor,
         max_concurrency: int = None,
+        batch_size: int = None,
+        partial: bool = None,
     ):
         self.llm = llm_client
         self.pdf_processor = pdf_processor
         self.prompt_builder = get_prompt_builder()
-        self.max_concurrency = max_concurrency or get_settings().MAX_CONCURRENCY
+        # Calls are throttled by the process-wide limiter; the runner only
+        # needs enough workers to use the largest limit it may grant
+        self.max_concurrency = max_concurrency or get_settings().LLM_CONCURRENCY_MAX
+        self.runner = PhaseRunner(self.max_concurrency)
+        self.batch_size = batch_size or get_settings().LLM_BATCH_CATEGORIES
+        # Save the categories that succeeded when others fail
+        self.partial = (
+            get_settings().EXTRACTION_PARTIAL_SUCCESS if partial is None else partial
+        )
 
     async def extract_category(
         self,
@@ -47,70 +62,66 @@ class Phase2Extractor:
         Returns:
             CategoryWithItems with extracted items
         """
-        max_retries = 3
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                # Build prompt
-                prompt = self.prompt_builder.phase2_prompt(
-                    restaurant_name, page_number, category
-                )
-
-                # Prepare message
-                message_content = [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{page_image}"},
-                    },
-                ]
-
-                # Call LLM
-                response = await self.llm.generate(
-                    messages=[{"role": "user", "content": message_content}],
-                    response_format=self.llm.json_schema_format(CategoryWithItems),
-                )
-
-                # Parse and validate
-                raw = response.choices[0].message.content
-                try:
-                    obj = json.loads(raw)
-                except json.JSONDecodeError as e:
-                    # Log the problematic JSON for debugging
-                    category_name = category.get('name_raw', category.get('name', 'unknown'))
-                    error_msg = f"JSON decode error at position {e.pos}: {e.msg}"
-                    print(f"\n=== Phase 2 JSON Parse Error ===")
-                    print(f"Category: {category_name}")
-                    print(f"Page: {page_number}")
-                    print(f"Attempt: {attempt + 1}/{max_retries}")
-                    print(f"Error: {error_msg}")
-                    print(f"Raw response (first 500 chars): {raw[:500]}")
-                    print(f"Raw response (around error): {raw[max(0, e.pos-100):e.pos+100]}")
-                    print(f"================================\n")
-                    
-                    if attempt < max_retries - 1:
-                        print(f"Retrying category '{category_name}'...")
-                        await asyncio.sleep(1)  # Brief delay before retry
-                        continue
-                    
-                    raise ValueError(f"LLM returned invalid JSON for category '{category_name}' on page {page_number}: {error_msg}")
-                
-                validated = CategoryWithItems.model_validate(obj)
-                return validated.model_dump()
-                
-            except Exception as e:
-                last_error = e
-                category_name = category.get('name_raw', category.get('name', 'unknown'))
-                if attempt < max_retries - 1:
-                    print(f"Phase 2 - Category '{category_name}' - Attempt {attempt + 1}/{max_retries} failed: {str(e)}")
-                    await asyncio.sleep(1)
-                    continue
-                print(f"Phase 2 - Category '{category_name}' - All {max_retries} attempts failed")
-                raise
-        
-        # If all retries failed
-        raise last_error if last_error else ValueError("All retry attempts failed")
+        # Build prompt
+        prompt = self.prompt_builder.phase2_prompt(
+            restaurant_name, page_number, category
+        )
+
+        # Prepare message
+        message_content = [
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/png;base64,{page_image}"},
+            },
+        ]
+
+        category_name = category.get('name_raw', category.get('name', 'unknown'))
+
+        # Call LLM (retried per the client's policy, served from the
+        # response cache if unchanged)
+        result = await self.llm.generate_structured(
+            messages=[{"role": "user", "content": message_content}],
+            model_cls=CategoryWithItems,
+            phase="phase2",
+            label=f"Phase 2 - Category '{category_name}'",
+        )
+        return result.data
+
+    async def extract_categories(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        page_image: str,
+        categories: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract items for several categories of a page in one call.
+
+        Returns:
+            CategoryWithItems per category, in the order given
+        """
+        prompt = self.prompt_builder.phase2_batch_prompt(
+            restaurant_name, page_number, categories
+        )
+
+        message_content = [
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/png;base64,{page_image}"},
+            },
+        ]
+
+        # Invalid output is split into smaller batches rather than retried
+        result = await self.llm.generate_structured(
+            messages=[{"role": "user", "content": message_content}],
+            model_cls=CategoryWithItemsBatch,
+            phase="phase2_batch",
+            label=f"Phase 2 - {len(categories)} categories on page {page_number}",
+            retry_policy=self.llm.retry_policy.with_budget(ErrorClass.SCHEMA, 0),
+        )
+        return result.data["categories"]
 
     async def extract_page(
         self,
@@ -131,19 +142,38 @@ class Phase2Extractor:
         Returns:
             Page data with all category items
         """
-        # Create coroutines for each category
-        coros = [
-            self.extract_category(restaurant_name, page_number, page_image, cat)
-            for cat in page_categories
-        ]
+        units = self._page_units(restaurant_name, page_number, page_categories)
+        results = await self.runner.run(single_page(page_number, page_image), units)
 
-        # Run with concurrency limit
-        category_results = await self._bounded_gather(coros)
+        return {"page_number": page_number, "categories": results.get(page_number, [])}
 
-        return {"page_number": page_number, "categories": category_results}
+    def _page_units(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        page_categories: List[Dict[str, Any]],
+    ) -> List[WorkUnit]:
+        """Work units for the categories on a page, batch_size per call"""
+        return batch_units(
+            page_number,
+            page_categories,
+            self.batch_size,
+            run_many=lambda img, cats: self.extract_categories(
+                restaurant_name, page_number, img, cats
+            ),
+            run_one=lambda img, cat: self.extract_category(
+                restaurant_name, page_number, img, cat
+            ),
+            label="Phase 2",
+            return_exceptions=self.partial,
+        )
 
     async def extract_all_pages(
-        self, restaurant_name: str, categories_payload: Dict[str, Any], pdf_path: str
+        self,
+        restaurant_name: str,
+        categories_payload: Dict[str, Any],
+        pdf_path: str,
+        previous: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Extract items from all pages based on Phase 1 categories.
@@ -152,54 +182,79 @@ class Phase2Extractor:
             restaurant_name: Name of restaurant
             categories_payload: Phase 1 output
             pdf_path: Path to PDF
+            previous: Earlier Phase 2 output; categories whose Phase 1 input
+                is unchanged keep their result from it
 
         Returns:
             Complete Phase 2 output
         """
-        # Convert PDF to images
-        images = await self.pdf_processor.convert_to_images(pdf_path)
-
-        # Extract for each page
-        all_pages = []
+        # Validate categories structure up front
+        categories_by_page = {}
         for page in categories_payload["pages"]:
-            page_number = page["page_number"]
-            img_b64 = images[page_number - 1]
-
-            # Validate categories structure
             page_categories_obj = Categories.model_validate(page["data"])
-            page_categories = [
+            categories_by_page[page["page_number"]] = [
                 cat.model_dump() for cat in page_categories_obj.categories
             ]
 
-            # Extract items for this page
-            page_result = await self.extract_page(
-                restaurant_name, page_number, img_b64, page_categories
+        # Flatten (page, category) units of all pages into one scheduler,
+        # leaving out categories whose previous result can be kept
+        plan = ReusePlan(previous, get_checkpoint())
+        units = []
+        for page_number, page_categories in categories_by_page.items():
+            pending = plan.add_page(
+                page_number,
+                [input_hash(restaurant_name, page_number, cat) for cat in page_categories],
             )
-            all_pages.append(page_result)
-
-        return {"restaurant_name": restaurant_name, "pages": all_pages}
-
-    async def _bounded_gather(self, coros: List) -> List:
-        """Run coroutines with concurrency limit"""
-        sem = asyncio.Semaphore(self.max_concurrency)
+            units += self._page_units(
+                restaurant_name, page_number, [page_categories[i] for i in pending]
+            )
+        report_units(**plan.counts())
 
-        async def _run(coro):
-            async with sem:
-                return await coro
+        results = await self.runner.run(
+            self.pdf_processor.iter_pages(pdf_path, {u.page_number for u in units}),
+            units,
+            on_result=plan.recorder(),
+            return_exceptions=self.partial,
+            report_index=plan.index,
+        )
+        all_pages = [
+            {
+                "page_number": page["page_number"],
+                "categories": settle(
+                    plan.merge(
+                        page["page_number"], results.get(page["page_number"], [])
+                    ),
+                    categories_by_page[page["page_number"]],
+                    CategoryWithItems,
+                ),
+                "input_hashes": plan.hashes[page["page_number"]],
+            }
+            for page in categories_payload["pages"]
+        ]
 
-        return await asyncio.gather(*(_run(c) for c in coros))
+        return {
+            "restaurant_name": restaurant_name,
+            "pages": all_pages,
+            "units": plan.counts(),
+        }
 
 
 # Convenience function
 async def run_phase2(
-    restaurant_name: str, categories_payload: Dict[str, Any], pdf_path: str
+    restaurant_name: str,
+    categories_payload: Dict[str, Any],
+    pdf_path: str,
+    previous: Optional[Dict[str, Any]] = None,
+    partial: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """Run phase 2 extraction with default settings"""
 
     extractor = Phase2Extractor(
-        llm_client=get_llm_client(), pdf_processor=get_pdf_processor()
+        llm_client=get_llm_client(),
+        pdf_processor=get_pdf_processor(),
+        partial=partial,
     )
 
     return await extractor.extract_all_pages(
-        restaurant_name, categories_payload, pdf_path
+        restaurant_name, categories_payload, pdf_path, previous
     )
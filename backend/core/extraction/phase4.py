@@ -3,15 +3,25 @@ Phase 4: Complete Item Extraction with Addons
 Combines Phase 2 items with Phase 3 bases to extract full item details.
 """
 
-import asyncio
-import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from backend.config import get_settings
+from backend.core.extraction.batching import batch_units
+from backend.core.extraction.partial import failed_result, is_failed, settle
+from backend.core.extraction.reuse import ReusePlan, input_hash
+from backend.core.extraction.runner import PhaseRunner, WorkUnit, single_page
 from backend.core.processors.pdf import PDFProcessor, get_pdf_processor
 from backend.core.prompts.builder import get_prompt_builder
-from backend.models.domain import CategoryBase, CategoryItemAddons, CategoryWithItems
+from backend.models.domain import (
+    CategoryBase,
+    CategoryItemAddons,
+    CategoryItemAddonsBatch,
+    CategoryWithItems,
+)
+from backend.services.checkpoint import get_checkpoint
 from backend.services.llm_client import LLMClient, get_llm_client
+from backend.services.progress import report_units
+from backend.services.retry import ErrorClass
 
 
 class Phase4Extractor:
@@ -22,11 +32,21 @@ class Phase4Extractor:
         llm_client: LLMClient,
         pdf_processor: PDFProcessor,
         max_concurrency: int = None,
+        batch_size: int = None,
+        partial: bool = None,
     ):
         self.llm = llm_client
         self.pdf_processor = pdf_processor
         self.prompt_builder = get_prompt_builder()
-        self.max_concurrency = max_concurrency or get_settings().MAX_CONCURRENCY
+        # Calls are throttled by the process-wide limiter; the runner only
+        # needs enough workers to use the largest limit it may grant
+        self.max_concurrency = max_concurrency or get_settings().LLM_CONCURRENCY_MAX
+        self.runner = PhaseRunner(self.max_concurrency)
+        self.batch_size = batch_size or get_settings().LLM_BATCH_CATEGORIES
+        # Save the categories that succeeded when others fail
+        self.partial = (
+            get_settings().EXTRACTION_PARTIAL_SUCCESS if partial is None else partial
+        )
 
     async def extract_category_addons(
         self,
@@ -37,64 +57,68 @@ class Phase4Extractor:
         category_base: Dict[str, Any],
     ) -> Dict[str, Any]:
         """Extract complete item details with addons for a category"""
-        max_retries = 2
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                # Wrap data for prompt
-                category_wrapper = {"category": category}
-                base_wrapper = {"category_base": category_base}
-
-                # Build prompt
-                prompt = self.prompt_builder.phase4_prompt(
-                    restaurant_name, page_number, category_wrapper, base_wrapper
-                )
-
-                # Prepare message
-                message_content = [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{page_image}"},
-                    },
-                ]
-
-                # Call LLM
-                response = await self.llm.generate(
-                    messages=[{"role": "user", "content": message_content}],
-                    response_format=self.llm.json_schema_format(CategoryItemAddons),
-                )
-
-                # Parse and validate
-                raw = response.choices[0].message.content
-                try:
-                    obj = json.loads(raw)
-                except json.JSONDecodeError as e:
-                    error_msg = f"JSON decode error at position {e.pos}: {e.msg}"
-                    print(f"Phase 4, Attempt {attempt + 1}/{max_retries} - Failed to parse LLM response: {error_msg}")
-                    print(f"Raw response (first 500 chars): {raw[:500]}")
-                    print(f"Raw response (around error): {raw[max(0, e.pos-100):e.pos+100]}")
-                    
-                    if attempt < max_retries - 1:
-                        print(f"Retrying category '{category.get('name_raw', 'unknown')}'...")
-                        await asyncio.sleep(1)
-                        continue
-                    
-                    raise ValueError(f"LLM returned invalid JSON for category '{category.get('name_raw', 'unknown')}': {error_msg}")
-                
-                validated = CategoryItemAddons.model_validate(obj)
-                return validated.model_dump()
-                
-            except Exception as e:
-                last_error = e
-                if attempt < max_retries - 1:
-                    print(f"Phase 4, Attempt {attempt + 1}/{max_retries} failed: {str(e)}")
-                    await asyncio.sleep(1)
-                    continue
-                raise
-        
-        raise last_error if last_error else ValueError("All retry attempts failed")
+        # Wrap data for prompt
+        category_wrapper = {"category": category}
+        base_wrapper = {"category_base": category_base}
+
+        # Build prompt
+        prompt = self.prompt_builder.phase4_prompt(
+            restaurant_name, page_number, category_wrapper, base_wrapper
+        )
+
+        # Prepare message
+        message_content = [
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/png;base64,{page_image}"},
+            },
+        ]
+
+        category_name = category.get('name_raw', 'unknown')
+
+        # Call LLM (retried per the client's policy, served from the
+        # response cache if unchanged)
+        result = await self.llm.generate_structured(
+            messages=[{"role": "user", "content": message_content}],
+            model_cls=CategoryItemAddons,
+            phase="phase4",
+            label=f"Phase 4 - Category '{category_name}'",
+        )
+        return result.data
+
+    async def extract_categories_addons(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        page_image: str,
+        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Extract addons for several (category, category_base) pairs in one call"""
+        prompt = self.prompt_builder.phase4_batch_prompt(
+            restaurant_name,
+            page_number,
+            [cat for cat, _ in pairs],
+            [base for _, base in pairs],
+        )
+
+        message_content = [
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/png;base64,{page_image}"},
+            },
+        ]
+
+        # Invalid output is split into smaller batches rather than retried
+        result = await self.llm.generate_structured(
+            messages=[{"role": "user", "content": message_content}],
+            model_cls=CategoryItemAddonsBatch,
+            phase="phase4_batch",
+            label=f"Phase 4 - {len(pairs)} categories on page {page_number}",
+            retry_policy=self.llm.retry_policy.with_budget(ErrorClass.SCHEMA, 0),
+        )
+        return result.data["categories"]
 
     async def extract_page(
         self,
@@ -105,18 +129,34 @@ class Phase4Extractor:
         page_bases: List[Dict[str, Any]],
     ) -> Dict[str, Any]:
         """Extract addons for all categories on a page"""
-        # Create coroutines for each category
-        coros = [
-            self.extract_category_addons(
-                restaurant_name, page_number, page_image, cat, base
-            )
-            for cat, base in zip(page_categories, page_bases)
-        ]
+        units = self._page_units(
+            restaurant_name, page_number, page_categories, page_bases
+        )
+        results = await self.runner.run(single_page(page_number, page_image), units)
 
-        # Run with concurrency limit
-        category_results = await self._bounded_gather(coros)
+        return {"page_number": page_number, "categories": results.get(page_number, [])}
 
-        return {"page_number": page_number, "categories": category_results}
+    def _page_units(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        page_categories: List[Dict[str, Any]],
+        page_bases: List[Dict[str, Any]],
+    ) -> List[WorkUnit]:
+        """Work units for the categories on a page, batch_size per call"""
+        return batch_units(
+            page_number,
+            list(zip(page_categories, page_bases)),
+            self.batch_size,
+            run_many=lambda img, pairs: self.extract_categories_addons(
+                restaurant_name, page_number, img, pairs
+            ),
+            run_one=lambda img, pair: self.extract_category_addons(
+                restaurant_name, page_number, img, *pair
+            ),
+            label="Phase 4",
+            return_exceptions=self.partial,
+        )
 
     async def extract_all_pages(
         self,
@@ -124,46 +164,89 @@ class Phase4Extractor:
         items_payload: Dict[str, Any],
         bases_payload: Dict[str, Any],
         pdf_path: str,
+        previous: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Extract complete item details from all pages"""
-        # Convert PDF to images
-        images = await self.pdf_processor.convert_to_images(pdf_path)
+        """
+        Extract complete item details from all pages.
 
-        # Extract for each page
-        all_pages = []
+        Categories whose Phase 2 items and Phase 3 base are unchanged keep
+        their result from the previous output, if given.
+        """
+        # Validate structures up front; ones that failed earlier stay failed
+        work_by_page = {}
         for page_items, page_bases in zip(
             items_payload["pages"], bases_payload["pages"]
         ):
-            page_number = page_items["page_number"]
-            img_b64 = images[page_number - 1]
-
-            # Validate structures
             page_categories = [
-                CategoryWithItems.model_validate(cat).model_dump()
+                cat
+                if is_failed(cat)
+                else CategoryWithItems.model_validate(cat).model_dump()
                 for cat in page_items["categories"]
             ]
             page_bases_list = [
-                CategoryBase.model_validate(base).model_dump()
+                base
+                if is_failed(base)
+                else CategoryBase.model_validate(base).model_dump()
                 for base in page_bases["categories"]
             ]
+            work_by_page[page_items["page_number"]] = (page_categories, page_bases_list)
 
-            # Extract for this page
-            page_result = await self.extract_page(
-                restaurant_name, page_number, img_b64, page_categories, page_bases_list
-            )
-            all_pages.append(page_result)
-
-        return {"restaurant_name": restaurant_name, "pages": all_pages}
+        # Flatten (page, category) units of all pages into one scheduler,
+        # leaving out categories whose previous result can be kept
+        plan = ReusePlan(previous, get_checkpoint())
+        units = []
+        for page_number, (page_categories, page_bases_list) in work_by_page.items():
+            upstream_failures = {}
+            for i, (cat, base) in enumerate(zip(page_categories, page_bases_list)):
+                if is_failed(cat):
+                    error = f"Phase 2: {cat['error']}"
+                elif is_failed(base):
+                    error = f"Phase 3: {base['error']}"
+                else:
+                    continue
+                upstream_failures[i] = failed_result(CategoryItemAddons, cat, error)
 
-    async def _bounded_gather(self, coros: List) -> List:
-        """Run coroutines with concurrency limit"""
-        sem = asyncio.Semaphore(self.max_concurrency)
+            pending = plan.add_page(
+                page_number,
+                [
+                    input_hash(restaurant_name, page_number, cat, base)
+                    for cat, base in zip(page_categories, page_bases_list)
+                ],
+                fixed=upstream_failures,
+            )
+            units += self._page_units(
+                restaurant_name,
+                page_number,
+                [page_categories[i] for i in pending],
+                [page_bases_list[i] for i in pending],
+            )
+        report_units(**plan.counts())
 
-        async def _run(coro):
-            async with sem:
-                return await coro
+        results = await self.runner.run(
+            self.pdf_processor.iter_pages(pdf_path, {u.page_number for u in units}),
+            units,
+            on_result=plan.recorder(),
+            return_exceptions=self.partial,
+            report_index=plan.index,
+        )
+        all_pages = [
+            {
+                "page_number": page_number,
+                "categories": settle(
+                    plan.merge(page_number, results.get(page_number, [])),
+                    work_by_page[page_number][0],
+                    CategoryItemAddons,
+                ),
+                "input_hashes": plan.hashes[page_number],
+            }
+            for page_number in work_by_page
+        ]
 
-        return await asyncio.gather(*(_run(c) for c in coros))
+        return {
+            "restaurant_name": restaurant_name,
+            "pages": all_pages,
+            "units": plan.counts(),
+        }
 
 
 # Convenience function
@@ -172,13 +255,17 @@ async def run_phase4(
     items_payload: Dict[str, Any],
     bases_payload: Dict[str, Any],
     pdf_path: str,
+    previous: Optional[Dict[str, Any]] = None,
+    partial: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """Run phase 4 extraction with default settings"""
 
     extractor = Phase4Extractor(
-        llm_client=get_llm_client(), pdf_processor=get_pdf_processor()
+        llm_client=get_llm_client(),
+        pdf_processor=get_pdf_processor(),
+        partial=partial,
     )
 
     return await extractor.extract_all_pages(
-        restaurant_name, items_payload, bases_payload, pdf_path
+        restaurant_name, items_payload, bases_payload, pdf_path, previous
     )
@@ -0,0 +1,170 @@
+"""
+Pipeline: Phases 1-4 without review in between
+Chains the phases per work unit: a page's categories go to phase 2 as soon
+as phase 1 has read that page, and each category moves on to phases 3 and 4
+as soon as its own earlier results exist.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from backend.config import get_settings
+from backend.core.extraction.phase1 import Phase1Extractor
+from backend.core.extraction.phase2 import Phase2Extractor
+from backend.core.extraction.phase3 import Phase3Extractor
+from backend.core.extraction.phase4 import Phase4Extractor
+from backend.core.extraction.reuse import input_hash
+from backend.core.processors.pdf import PDFProcessor, get_pdf_processor
+from backend.models.domain import Categories, CategoryBase, CategoryWithItems
+from backend.services.llm_client import LLMClient, get_llm_client
+from backend.services.progress import report_result, report_total
+
+
+class PipelineExtractor:
+    """Runs all four phases end to end under the shared LLM limit"""
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        pdf_processor: PDFProcessor,
+        max_pages: int = None,
+    ):
+        self.pdf_processor = pdf_processor
+        self.phase1 = Phase1Extractor(llm_client, pdf_processor)
+        self.phase2 = Phase2Extractor(llm_client, pdf_processor)
+        self.phase3 = Phase3Extractor(llm_client, pdf_processor)
+        self.phase4 = Phase4Extractor(llm_client, pdf_processor)
+        # Pages whose image is held while their categories are extracted;
+        # LLM calls themselves are bounded by the process-wide limiter
+        self.max_pages = max_pages or get_settings().PIPELINE_MAX_PAGES
+
+    async def extract_category(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        page_image: str,
+        category: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Phases 2, 3 and 4 of one category, each started once its inputs exist"""
+        items = await self.phase2.extract_category(
+            restaurant_name, page_number, page_image, category
+        )
+        base = await self.phase3.extract_category_base(
+            restaurant_name, page_number, page_image, items
+        )
+        addons = await self.phase4.extract_category_addons(
+            restaurant_name, page_number, page_image, items, base
+        )
+        return items, base, addons
+
+    async def extract_page(
+        self, restaurant_name: str, page_number: int, page_image: str
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Run all phases for one page.
+
+        Returns:
+            Dict of phase -> that phase's output for the page
+        """
+        page = await self.phase1.extract_page(restaurant_name, page_number, page_image)
+        categories = [
+            cat.model_dump() for cat in Categories.model_validate(page["data"]).categories
+        ]
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(
+                    self.extract_category(restaurant_name, page_number, page_image, cat)
+                )
+                for cat in categories
+            ]
+        chains = [task.result() for task in tasks]
+
+        # Input hashes as the phases record them, so a later run of a single
+        # phase can reuse these results
+        items = [CategoryWithItems.model_validate(c[0]).model_dump() for c in chains]
+        bases = [CategoryBase.model_validate(c[1]).model_dump() for c in chains]
+        return {
+            1: page,
+            2: {
+                "page_number": page_number,
+                "categories": [c[0] for c in chains],
+                "input_hashes": [
+                    input_hash(restaurant_name, page_number, cat) for cat in categories
+                ],
+            },
+            3: {
+                "page_number": page_number,
+                "categories": [c[1] for c in chains],
+                "input_hashes": [
+                    input_hash(restaurant_name, page_number, cat) for cat in items
+                ],
+            },
+            4: {
+                "page_number": page_number,
+                "categories": [c[2] for c in chains],
+                "input_hashes": [
+                    input_hash(restaurant_name, page_number, cat, base)
+                    for cat, base in zip(items, bases)
+                ],
+            },
+        }
+
+    async def extract_all_pages(
+        self, restaurant_name: str, pdf_path: str
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Run all phases for every page of the PDF.
+
+        Args:
+            restaurant_name: Name of the restaurant
+            pdf_path: Path to PDF file
+
+        Returns:
+            Dict of phase -> complete output of that phase
+        """
+        page_count = await self.pdf_processor.page_count(pdf_path)
+        report_total(page_count)
+
+        pages: List[Dict[int, Dict[str, Any]]] = []
+        page_slots = asyncio.Semaphore(self.max_pages)
+
+        async def _page(page_number: int, page_image: str) -> None:
+            try:
+                result = await self.extract_page(restaurant_name, page_number, page_image)
+                pages.append(result)
+                report_result(page_number, 0, result[4])
+            finally:
+                page_slots.release()
+
+        page_source = self.pdf_processor.iter_pages(pdf_path)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                async for page_number, page_image in page_source:
+                    await page_slots.acquire()
+                    tg.create_task(_page(page_number, page_image))
+        except ExceptionGroup as eg:
+            # Surface the first failure like asyncio.gather did
+            raise eg.exceptions[0]
+        finally:
+            await page_source.aclose()
+
+        pages.sort(key=lambda result: result[1]["page_number"])
+        return {
+            phase: {
+                "restaurant_name": restaurant_name,
+                "pages": [result[phase] for result in pages],
+            }
+            for phase in (1, 2, 3, 4)
+        }
+
+
+# Convenience function
+async def run_pipeline(restaurant_name: str, pdf_path: str) -> Dict[int, Dict[str, Any]]:
+    """Run all phases end to end with default settings"""
+
+    extractor = PipelineExtractor(
+        llm_client=get_llm_client(), pdf_processor=get_pdf_processor()
+    )
+
+    return await extractor.extract_all_pages(restaurant_name, pdf_path)
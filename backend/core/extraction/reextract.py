@@ -0,0 +1,169 @@
+"""
+Re-extraction of a single category
+Renders only the category's page and re-runs one phase for that category
+alone, so a bad result can be fixed without re-running the whole phase.
+"""
+
+import copy
+from typing import Any, Dict, List, Tuple
+
+from backend.core.extraction.partial import is_failed
+from backend.core.extraction.phase2 import Phase2Extractor
+from backend.core.extraction.phase3 import Phase3Extractor
+from backend.core.extraction.phase4 import Phase4Extractor
+from backend.core.processors.pdf import PDFProcessor, get_pdf_processor
+from backend.models.domain import CategoryBase, CategoryRef, CategoryWithItems
+from backend.services.llm_client import LLMClient, get_llm_client
+
+
+class CategoryNotFound(LookupError):
+    """The page or category to re-extract doesn't exist in the job"""
+
+
+class EarlierPhaseFailed(ValueError):
+    """The category's input failed in an earlier phase"""
+
+
+def _page(payload: Dict[str, Any], page_number: int) -> Dict[str, Any]:
+    for page in payload["pages"]:
+        if page["page_number"] == page_number:
+            return page
+    raise CategoryNotFound(f"Page {page_number} not found")
+
+
+def _page_categories(page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Phase 1 nests categories under "data"; later phases don't
+    return page["data"]["categories"] if "data" in page else page["categories"]
+
+
+def find_category(payload: Dict[str, Any], page_number: int, category_name: str) -> int:
+    """
+    Position of a category on a page of a phase payload.
+
+    Raises:
+        CategoryNotFound: If the page or category doesn't exist
+    """
+    for index, category in enumerate(_page_categories(_page(payload, page_number))):
+        if category.get("name_raw") == category_name:
+            return index
+    raise CategoryNotFound(
+        f"Category '{category_name}' not found on page {page_number}"
+    )
+
+
+def splice_category(
+    payload: Dict[str, Any], page_number: int, index: int, category: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Copy of a phase payload with one category replaced."""
+    payload = copy.deepcopy(payload)
+    categories = _page_categories(_page(payload, page_number))
+    if index < len(categories):
+        categories[index] = category
+    else:
+        categories.append(category)
+    return payload
+
+
+class CategoryReextractor:
+    """Re-runs phase 2, 3 or 4 for one category of a stored job"""
+
+    def __init__(self, llm_client: LLMClient, pdf_processor: PDFProcessor):
+        self.pdf_processor = pdf_processor
+        self.phase2 = Phase2Extractor(llm_client, pdf_processor)
+        self.phase3 = Phase3Extractor(llm_client, pdf_processor)
+        self.phase4 = Phase4Extractor(llm_client, pdf_processor)
+
+    async def reextract(
+        self,
+        phase: int,
+        restaurant_name: str,
+        pdf_path: str,
+        page_number: int,
+        category_name: str,
+        inputs: Dict[int, Dict[str, Any]],
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        Extract one category again.
+
+        Args:
+            phase: Phase to re-run (2, 3 or 4)
+            restaurant_name: Name of the restaurant
+            pdf_path: Path to PDF file
+            page_number: Page the category is on
+            category_name: name_raw of the category
+            inputs: Stored payloads by phase number: the ones the phase reads
+                (1 for phase 2; 2 for phase 3; 2 and 3 for phase 4) and the
+                phase's own current output
+
+        Returns:
+            (position of the category on its page, its new result); phases
+            keep the order of their input, so the position is the same in
+            the phase's own output
+
+        Raises:
+            CategoryNotFound: If the page or category doesn't exist in the inputs
+            EarlierPhaseFailed: If the category's input failed in an earlier phase
+        """
+        source = inputs[1] if phase == 2 else inputs[2]
+        try:
+            index = find_category(source, page_number, category_name)
+        except CategoryNotFound:
+            # Named as in the phase's output, which may differ from its input
+            index = find_category(inputs[phase], page_number, category_name)
+        category = _page_categories(_page(source, page_number))[index]
+        base = (
+            _page_categories(_page(inputs[3], page_number))[index] if phase == 4 else None
+        )
+        for earlier, result in ((2, category), (3, base)):
+            if phase > earlier and is_failed(result):
+                raise EarlierPhaseFailed(
+                    f"Category '{category_name}' failed in Phase {earlier}; "
+                    f"re-extract it there first"
+                )
+
+        page_image = await self.pdf_processor.page_images(pdf_path).get(page_number)
+
+        if phase == 2:
+            result = await self.phase2.extract_category(
+                restaurant_name,
+                page_number,
+                page_image,
+                CategoryRef.model_validate(category).model_dump(),
+            )
+            return index, result
+
+        category = CategoryWithItems.model_validate(category).model_dump()
+        if phase == 3:
+            result = await self.phase3.extract_category_base(
+                restaurant_name, page_number, page_image, category
+            )
+            return index, result
+
+        result = await self.phase4.extract_category_addons(
+            restaurant_name,
+            page_number,
+            page_image,
+            category,
+            CategoryBase.model_validate(base).model_dump(),
+        )
+        return index, result
+
+
+# Convenience function
+async def reextract_category(
+    phase: int,
+    restaurant_name: str,
+    pdf_path: str,
+    page_number: int,
+    category_name: str,
+    inputs: Dict[int, Dict[str, Any]],
+) -> Tuple[int, Dict[str, Any]]:
+    """Re-extract one category with default settings"""
+
+    extractor = CategoryReextractor(
+        llm_client=get_llm_client(), pdf_processor=get_pdf_processor()
+    )
+
+    return await extractor.reextract(
+        phase, restaurant_name, pdf_path, page_number, category_name, inputs
+    )
@@ -0,0 +1,133 @@
+"""
+Reuse of unchanged results.
+Each phase 2-4 result stores a hash of every category's input next to the
+category. A later run of the phase only re-extracts categories whose input
+hash changed (e.g. after a reviewer edited one category upstream) and keeps
+the previous result, including any manual edits, for the rest. Results
+checkpointed by an earlier, unfinished attempt of the run are kept as well.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.core.extraction.partial import is_failed
+from backend.services.checkpoint import CheckpointLog
+
+
+def input_hash(*payloads: Any) -> str:
+    """Stable hash of a unit's input."""
+    text = json.dumps(payloads, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class ReusePlan:
+    """Decides per category whether a previous result can be kept"""
+
+    def __init__(
+        self,
+        previous: Optional[Dict[str, Any]] = None,
+        checkpoint: Optional[CheckpointLog] = None,
+    ):
+        """
+        Args:
+            previous: The phase's previous output, if any
+            checkpoint: Log of the current run; units already in it are
+                resumed and new results are appended to it
+        """
+        self.checkpoint = checkpoint
+        self._resumable: Dict[Tuple[int, str], Any] = (
+            checkpoint.load() if checkpoint else {}
+        )
+        # page_number -> input hash -> previous result; failures are retried
+        self._previous: Dict[int, Dict[str, Any]] = {}
+        for page in (previous or {}).get("pages", []):
+            hashes = page.get("input_hashes") or []
+            if len(hashes) == len(page["categories"]):
+                self._previous[page["page_number"]] = {
+                    h: result
+                    for h, result in zip(hashes, page["categories"])
+                    if not is_failed(result)
+                }
+
+        self.hashes: Dict[int, List[str]] = {}
+        self._reused: Dict[int, Dict[int, Any]] = {}
+        self._resumed: Dict[int, Dict[int, Any]] = {}
+        self._fixed: Dict[int, Dict[int, Any]] = {}
+        self._pending: Dict[int, List[int]] = {}
+
+    def add_page(
+        self,
+        page_number: int,
+        hashes: List[str],
+        fixed: Optional[Dict[int, Any]] = None,
+    ) -> List[int]:
+        """
+        Register the input hashes of a page's categories.
+
+        Args:
+            page_number: Page number
+            hashes: Input hash of each category
+            fixed: Results of positions that need no extraction, e.g.
+                categories whose input failed in an earlier phase
+
+        Returns:
+            Positions of the categories that must be extracted
+        """
+        previous = self._previous.get(page_number, {})
+        fixed = fixed or {}
+        reused, resumed, pending = {}, {}, []
+        for i, h in enumerate(hashes):
+            if i in fixed:
+                continue
+            if h in previous:
+                reused[i] = previous[h]
+            elif (page_number, h) in self._resumable:
+                resumed[i] = self._resumable[(page_number, h)]
+            else:
+                pending.append(i)
+
+        self.hashes[page_number] = hashes
+        self._reused[page_number] = reused
+        self._resumed[page_number] = resumed
+        self._fixed[page_number] = fixed
+        self._pending[page_number] = pending
+        return pending
+
+    def merge(self, page_number: int, computed: List[Any]) -> List[Any]:
+        """Page results in category order from kept and newly computed ones"""
+        results = {
+            **self._reused[page_number],
+            **self._resumed[page_number],
+            **self._fixed[page_number],
+        }
+        results.update(zip(self._pending[page_number], computed))
+        return [results.get(i) for i in range(len(self.hashes[page_number]))]
+
+    def index(self, page_number: int, position: int) -> int:
+        """Category index of a page's pending category, given its position"""
+        return self._pending[page_number][position]
+
+    def recorder(self) -> Optional[Callable[[int, int, Any], None]]:
+        """
+        Runner callback appending each computed result to the checkpoint.
+
+        Results arrive by position among the page's pending categories.
+        """
+        if self.checkpoint is None:
+            return None
+
+        def _record(page_number: int, position: int, result: Any) -> None:
+            index = self.index(page_number, position)
+            self.checkpoint.append(
+                page_number, self.hashes[page_number][index], result
+            )
+
+        return _record
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "reused": sum(len(r) for r in self._reused.values()),
+            "resumed": sum(len(r) for r in self._resumed.values()),
+            "recomputed": sum(len(p) for p in self._pending.values()),
+        }
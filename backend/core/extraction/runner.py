@@ -0,0 +1,175 @@
+"""
+Shared phase runner.
+Flattens the (page, category) work of a job into one bounded scheduler fed
+by the streaming page source, then reassembles results per page.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from backend.services.progress import report_failure, report_result, report_total
+
+
+@dataclass
+class WorkUnit:
+    """One LLM call of a phase, e.g. one category on one page"""
+
+    page_number: int
+    index: int  # position of the (first) result within its page
+    run: Callable[[str], Awaitable[Any]]  # called with the base64 page image
+    cost: int = 0  # bigger units are started first
+    span: int = 1  # results produced; run returns a list when > 1
+
+
+def unit_cost(*payloads: Any) -> int:
+    """Rough size of a unit's input, used to start long units first."""
+    return sum(len(json.dumps(p, ensure_ascii=False, default=str)) for p in payloads)
+
+
+async def single_page(
+    page_number: int, page_image: str
+) -> AsyncGenerator[Tuple[int, str], None]:
+    """Page source for an image that is already rendered."""
+    yield page_number, page_image
+
+
+class PhaseRunner:
+    """Runs work units of all pages under one concurrency limit"""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+
+    async def run(
+        self,
+        pages: AsyncGenerator[Tuple[int, str], None],
+        units: List[WorkUnit],
+        on_result: Optional[Callable[[int, int, Any], None]] = None,
+        return_exceptions: bool = False,
+        report_index: Optional[Callable[[int, int], int]] = None,
+    ) -> Dict[int, List[Any]]:
+        """
+        Run every unit once its page has been rendered.
+
+        Units whose page is available wait in a queue ordered by cost, so the
+        longest calls start first. A new page is only pulled from the source
+        while fewer than max_concurrency units are waiting, which keeps the
+        number of page images in memory bounded. Each result is reported to
+        the progress channel of the current run as soon as it's ready.
+
+        Args:
+            pages: Source of (page_number, base64 image)
+            units: Work units for the pages of the source
+            on_result: Called with (page_number, index, result) for every
+                result as soon as it's ready, e.g. to checkpoint it
+            return_exceptions: Put the exception of a failed unit in its
+                result slots instead of aborting the other units
+            report_index: Maps (page_number, index) of a result to the index
+                its progress event names, e.g. the category's position on
+                the page when only some of its categories are extracted
+
+        Returns:
+            Dict of page_number -> results ordered by unit index
+        """
+        units_by_page: Dict[int, List[WorkUnit]] = {}
+        for unit in units:
+            units_by_page.setdefault(unit.page_number, []).append(unit)
+
+        results: Dict[int, List[Any]] = {
+            page_number: [None] * max(u.index + u.span for u in page_units)
+            for page_number, page_units in units_by_page.items()
+        }
+
+        report_total(sum(u.span for u in units))
+
+        def _reported(page_number: int, index: int) -> int:
+            if report_index is None:
+                return index
+            return report_index(page_number, index)
+
+        ready: List[Tuple[int, int, WorkUnit, str]] = []
+        seq = itertools.count()
+        changed = asyncio.Condition()
+        feeding_done = False
+
+        async def _feed() -> None:
+            nonlocal feeding_done
+            try:
+                async for page_number, page_image in pages:
+                    async with changed:
+                        for unit in units_by_page.get(page_number, []):
+                            heapq.heappush(
+                                ready, (-unit.cost, next(seq), unit, page_image)
+                            )
+                        changed.notify_all()
+                        # Backpressure: wait for workers before the next page
+                        await changed.wait_for(
+                            lambda: len(ready) < self.max_concurrency
+                        )
+            finally:
+                async with changed:
+                    feeding_done = True
+                    changed.notify_all()
+
+        async def _work() -> None:
+            while True:
+                async with changed:
+                    await changed.wait_for(lambda: ready or feeding_done)
+                    if not ready:
+                        return
+                    _, _, unit, page_image = heapq.heappop(ready)
+                    changed.notify_all()
+
+                slots = slice(unit.index, unit.index + unit.span)
+                try:
+                    result = await unit.run(page_image)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[unit.page_number][slots] = [e] * unit.span
+                    for index in range(slots.start, slots.stop):
+                        report_failure(
+                            unit.page_number, _reported(unit.page_number, index), e
+                        )
+                    continue
+
+                if unit.span == 1:
+                    result = [result]
+                results[unit.page_number][slots] = result
+                # A batch unit may return the exceptions of single categories
+                for index, item in enumerate(result, start=unit.index):
+                    reported = _reported(unit.page_number, index)
+                    if isinstance(item, Exception):
+                        if not return_exceptions:
+                            raise item
+                        report_failure(unit.page_number, reported, item)
+                        continue
+                    if on_result is not None:
+                        on_result(unit.page_number, index, item)
+                    report_result(unit.page_number, reported, item)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(_feed())
+                for _ in range(self.max_concurrency):
+                    tg.create_task(_work())
+        except ExceptionGroup as eg:
+            # Surface the first failure like asyncio.gather did
+            raise eg.exceptions[0]
+        finally:
+            # Stops any rendering still in progress
+            await pages.aclose()
+
+        return results
@@ -0,0 +1,174 @@
+"""
+Content-addressed on-disk cache for rendered PDF pages.
+Pages are keyed by (PDF hash, page, resolution, format) so every phase
+re-reads the same render instead of rasterizing the PDF again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class PageCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    render_seconds: float = 0.0  # time spent rendering on misses
+
+    @property
+    def seconds_saved(self) -> float:
+        """Estimated render time saved (hits x average render time)."""
+        if not self.misses:
+            return 0.0
+        return self.hits * (self.render_seconds / self.misses)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "render_seconds": round(self.render_seconds, 3),
+            "seconds_saved": round(self.seconds_saved, 3),
+        }
+
+
+# Process-wide counters shared by every job cache
+_stats = PageCacheStats()
+_stats_lock = threading.Lock()
+
+# PDF hashes memoized by (path, size, mtime) so each phase doesn't re-hash
+_hash_memo: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, memoized while the file is unchanged."""
+    path = Path(path)
+    st = path.stat()
+    memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    cached = _hash_memo.get(memo_key)
+    if cached:
+        return cached
+
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _hash_memo[memo_key] = digest
+    return digest
+
+
+def remember_sha256(path: str | Path, digest: str) -> None:
+    """Memoize a hash computed while the file was written, e.g. an upload."""
+    path = Path(path)
+    st = path.stat()
+    _hash_memo[(str(path.resolve()), st.st_size, st.st_mtime_ns)] = digest
+
+
+class PageImageCache:
+    """Stores rendered page images under a directory with size-based eviction"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(pdf_hash: str, page_number: int, zoom: float, fmt: str) -> str:
+        raw = f"{pdf_hash}:{page_number}:{zoom}:{fmt.lower()}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.cache_dir / f"{key}.{fmt.lower()}"
+
+    def get(
+        self, pdf_hash: str, page_number: int, zoom: float, fmt: str
+    ) -> Optional[bytes]:
+        """Return cached image bytes, or None on a miss."""
+        path = self._path(self.key(pdf_hash, page_number, zoom, fmt), fmt)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with _stats_lock:
+                _stats.misses += 1
+            return None
+
+        # Touch so eviction drops least recently used pages first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with _stats_lock:
+            _stats.hits += 1
+        return data
+
+    def put(
+        self,
+        pdf_hash: str,
+        page_number: int,
+        zoom: float,
+        fmt: str,
+        data: bytes,
+        render_seconds: float = 0.0,
+    ) -> None:
+        """Store a rendered page and evict old entries if over the size limit."""
+        path = self._path(self.key(pdf_hash, page_number, zoom, fmt), fmt)
+        tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # readers never see a partial file
+
+        with _stats_lock:
+            _stats.render_seconds += render_seconds
+        self._evict()
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.cache_dir.iterdir() if p.is_file())
+
+    def _evict(self) -> None:
+        entries = []
+        for p in self.cache_dir.iterdir():
+            if p.is_file() and not p.name.endswith(".tmp"):
+                st = p.stat()
+                entries.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        # Oldest access first
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            with _stats_lock:
+                _stats.evictions += 1
+
+
+def get_page_cache(pdf_path: str | Path) -> PageImageCache:
+    """Get the page cache living in the job folder of an uploaded PDF."""
+    from backend.config import get_settings
+    from backend.services.storage import get_storage_service
+
+    settings = get_settings()
+    # Uploads are stored as <job_id>.pdf
+    job_id = Path(pdf_path).stem
+    return PageImageCache(
+        cache_dir=get_storage_service().page_cache_dir(job_id),
+        max_bytes=settings.PAGE_CACHE_MAX_MB * 1024 * 1024,
+    )
+
+
+def get_page_cache_stats() -> Dict[str, float]:
+    """Process-wide hit/miss counters for the page cache."""
+    with _stats_lock:
+        return _stats.as_dict()
@@ -4,53 +4,210 @@ from __future__ import annotations
 import asyncio
 import base64
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
 
 import fitz  # PyMuPDF
 
 from backend.core.processors.image import ImageProcessor
+from backend.core.processors.page_cache import (
+    PageImageCache,
+    file_sha256,
+    get_page_cache,
+)
+from backend.core.processors.rasterizer import RasterEngine, get_raster_engine
+
+
+class PageImages:
+    """
+    Lazy, cache-backed access to the rendered pages of one PDF.
+    Pages are rendered on first request and read back from the cache after.
+    """
+
+    def __init__(
+        self,
+        pdf_path: Path,
+        cache: PageImageCache,
+        engine: RasterEngine,
+        *,
+        zoom: float = 2.0,
+        fmt: str = "png",
+    ):
+        self.pdf_path = pdf_path
+        self.cache = cache
+        self.engine = engine
+        self.zoom = zoom
+        self.fmt = fmt
+        self._pdf_hash: Optional[str] = None
+        self._page_count: Optional[int] = None
+
+    async def pdf_hash(self) -> str:
+        # Hashing reads the whole file, so it runs off the event loop
+        if self._pdf_hash is None:
+            self._pdf_hash = await asyncio.to_thread(file_sha256, self.pdf_path)
+        return self._pdf_hash
+
+    async def page_count(self) -> int:
+        if self._page_count is None:
+
+            def _count() -> int:
+                with fitz.open(self.pdf_path) as doc:
+                    return len(doc)
+
+            self._page_count = await asyncio.to_thread(_count)
+        return self._page_count
+
+    async def get_bytes(self, page_number: int) -> bytes:
+        """Rendered image bytes for a page (1-indexed)."""
+        pdf_hash = await self.pdf_hash()
+        data = await asyncio.to_thread(
+            self.cache.get, pdf_hash, page_number, self.zoom, self.fmt
+        )
+        if data is not None:
+            return data
+
+        data, seconds = await self.engine.render(
+            str(self.pdf_path), page_number, self.zoom, self.fmt
+        )
+        await asyncio.to_thread(
+            self.cache.put,
+            pdf_hash,
+            page_number,
+            self.zoom,
+            self.fmt,
+            data,
+            render_seconds=seconds,
+        )
+        return data
+
+    async def get(self, page_number: int) -> str:
+        """Base64 encoded image for a page (1-indexed)."""
+        data = await self.get_bytes(page_number)
+        return await asyncio.to_thread(_b64encode, data)
+
+    def close(self) -> None:
+        # Documents live in the render workers; nothing to release here
+        pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("utf-8")
 
 
 class PDFProcessor:
     def __init__(self, image_processor: Optional[ImageProcessor] = None):
         self.image_processor = image_processor or ImageProcessor()
 
+    def page_images(
+        self, pdf_path: str | Path, cache: Optional[PageImageCache] = None
+    ) -> PageImages:
+        """Open cache-backed page access for a PDF stored on disk."""
+        from backend.config import get_settings
+
+        pdf_path = Path(pdf_path)
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+        return PageImages(
+            pdf_path,
+            cache or get_page_cache(pdf_path),
+            get_raster_engine(),
+            zoom=get_settings().PAGE_RENDER_ZOOM,
+        )
+
+    async def iter_pages(
+        self,
+        pdf_path: str | Path,
+        page_numbers: Optional[Iterable[int]] = None,
+        *,
+        max_buffered: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yield (page_number, base64 image) as soon as each page is rendered.
+
+        Rendered pages wait in a bounded queue, so rendering stays at most
+        max_buffered pages ahead of the consumer. Pages arrive in completion
+        order, not page order.
+
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: Pages to render (1-indexed). Defaults to all pages.
+            max_buffered: Queue size. Defaults to PAGE_QUEUE_SIZE.
+        """
+        from backend.config import get_settings
+
+        page_images = self.page_images(pdf_path)
+        if page_numbers is None:
+            page_numbers = range(1, await page_images.page_count() + 1)
+        page_numbers = list(dict.fromkeys(page_numbers))  # dedupe, keep order
+
+        queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max_buffered or get_settings().PAGE_QUEUE_SIZE
+        )
+        render_slots = asyncio.Semaphore(page_images.engine.max_workers)
+        done = object()
+
+        async def _render(page_number: int) -> None:
+            # Hold the slot until the page is queued so memory stays bounded
+            async with render_slots:
+                img = await page_images.get(page_number)
+                await queue.put((page_number, img))
+
+        async def _produce() -> None:
+            try:
+                # TaskGroup cancels the remaining renders if one page fails
+                async with asyncio.TaskGroup() as tg:
+                    for n in page_numbers:
+                        tg.create_task(_render(n))
+                await queue.put(done)
+            except* Exception as eg:
+                await queue.put(eg.exceptions[0])
+
+        producer = asyncio.create_task(_produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            page_images.close()
+
     async def convert_to_base64(self, page: fitz.Page) -> str:
         """Convert a PDF page to a base64 PNG image."""
-        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # Increase resolution
-        img_data = pix.tobytes("png")
-        base64_str = base64.b64encode(img_data).decode("utf-8")
-        return base64_str
+
+        def _render() -> str:
+            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # Increase resolution
+            return _b64encode(pix.tobytes("png"))
+
+        return await asyncio.to_thread(_render)
 
     async def convert_to_images(
         self,
-        pdf_path: str | Path,
+        pdf_path: str | Path | bytes,
         *,
         dpi: int = 200,
         fmt: str = "png",
     ) -> List[str]:
         """
         Convert a PDF into a list of base64-encoded images (one per page).
-        This wraps your existing utils.processing.convert_pdf_into_images().
+        Files on disk go through the page cache and render pool.
         """
 
-        if isinstance(pdf_path, str):
-            pdf_path = Path(pdf_path)
-            if not pdf_path.exists():
-                raise FileNotFoundError(f"PDF not found: {pdf_path}")  # file path
-            doc = fitz.open(pdf_path)
-        else:
-            doc = fitz.open(stream=pdf_path, filetype="pdf")
+        if isinstance(pdf_path, (str, Path)):
+            page_images = self.page_images(pdf_path)
+            count = await page_images.page_count()
+            return list(
+                await asyncio.gather(
+                    *(page_images.get(n) for n in range(1, count + 1))
+                )
+            )
 
+        doc = fitz.open(stream=pdf_path, filetype="pdf")
         try:
-            images_b64: List[str] = []
-            tasks = [
-                self.convert_to_base64(doc[page_num]) for page_num in range(len(doc))
-            ]
-            awaitable_results = await asyncio.gather(*tasks)
-            images_b64.extend(awaitable_results)
-            return images_b64
-
+            # One page at a time: a fitz document isn't safe to share across threads
+            return [await self.convert_to_base64(page) for page in doc]
         finally:
             doc.close()
 
@@ -59,15 +216,8 @@ class PDFProcessor:
         # images_b64 = [self.image_processor.normalize_base64(img) for img in images_b64]
 
     async def page_count(self, pdf_path: str | Path) -> int:
-        """
-        Return number of pages (optional but useful).
-        Implement via PyPDF or pdfplumber if you add it.
-        """
-        from pypdf import PdfReader  # if installed
-
-        pdf_path = Path(pdf_path)
-        reader = PdfReader(str(pdf_path))
-        return len(reader.pages)
+        """Return number of pages."""
+        return await self.page_images(pdf_path).page_count()
 
 
 # convenient singleton
@@ -0,0 +1,202 @@
+"""
+Process-pool page rasterization.
+Renders and PNG-encodes PDF pages in worker processes so the event loop
+stays free while large menus are rasterized.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# ---------- WORKER SIDE ----------
+
+# Documents opened by this worker process, most recently used last
+_worker_docs: "OrderedDict[str, fitz.Document]" = OrderedDict()
+_WORKER_MAX_OPEN_DOCS = 4
+
+
+def _worker_document(pdf_path: str) -> fitz.Document:
+    """Open each PDF once per worker and keep it for later pages."""
+    doc = _worker_docs.get(pdf_path)
+    if doc is not None:
+        _worker_docs.move_to_end(pdf_path)
+        return doc
+
+    while len(_worker_docs) >= _WORKER_MAX_OPEN_DOCS:
+        _, old = _worker_docs.popitem(last=False)
+        old.close()
+
+    doc = fitz.open(pdf_path)
+    _worker_docs[pdf_path] = doc
+    return doc
+
+
+def _render_page(
+    pdf_path: str, page_index: int, zoom: float, fmt: str
+) -> Tuple[bytes, float]:
+    """Render one page in a worker. Returns (image bytes, render seconds)."""
+    start = time.perf_counter()
+    doc = _worker_document(pdf_path)
+    pix = doc[page_index].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    data = pix.tobytes(fmt)
+    return data, time.perf_counter() - start
+
+
+# ---------- PARENT SIDE ----------
+
+
+class RenderError(RuntimeError):
+    """Page could not be rendered."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class RenderTiming:
+    pdf_path: str
+    page_number: int
+    render_seconds: float  # time spent inside the worker
+    wall_seconds: float  # including queueing and transfer
+
+
+class RasterEngine:
+    """Renders pages in a recyclable ProcessPoolExecutor"""
+
+    def __init__(self, max_workers: int, page_timeout: float):
+        self.max_workers = max_workers
+        self.page_timeout = page_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.timings: Deque[RenderTiming] = deque(maxlen=500)
+        self.pages_rendered = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycles = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: never fork a process that holds MuPDF or event loop state
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        """Kill the workers of a stuck or broken pool and start fresh next time."""
+        with self._lock:
+            if self._pool is not pool:
+                return  # another caller already replaced it
+            self._pool = None
+            self.recycles += 1
+
+        # A running render can't be cancelled, so terminate the processes
+        for proc in list((getattr(pool, "_processes", None) or {}).values()):
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def render(
+        self, pdf_path: str, page_number: int, zoom: float, fmt: str = "png"
+    ) -> Tuple[bytes, float]:
+        """
+        Render a page (1-indexed) in the pool.
+
+        Returns:
+            (image bytes, render seconds)
+
+        Raises:
+            RenderError: On timeout or if the worker crashes twice
+        """
+        start = time.perf_counter()
+
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                future = pool.submit(
+                    _render_page, str(pdf_path), page_number - 1, zoom, fmt
+                )
+                data, seconds = await asyncio.wait_for(
+                    asyncio.wrap_future(future), timeout=self.page_timeout
+                )
+                break
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._recycle(pool)
+                raise RenderError(
+                    f"Rendering page {page_number} timed out after {self.page_timeout}s"
+                )
+            except BrokenProcessPool as e:
+                # The crash may come from another job's PDF, so retry once
+                self.crashes += 1
+                self._recycle(pool)
+                if attempt == 0:
+                    continue
+                raise RenderError(
+                    f"Renderer crashed on page {page_number} of {pdf_path}"
+                ) from e
+
+        self.pages_rendered += 1
+        self.timings.append(
+            RenderTiming(
+                pdf_path=str(pdf_path),
+                page_number=page_number,
+                render_seconds=seconds,
+                wall_seconds=time.perf_counter() - start,
+            )
+        )
+        return data, seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Render counters and timing summary over recent pages."""
+        recent = [t.render_seconds for t in self.timings]
+        summary = {
+            "workers": self.max_workers,
+            "pages_rendered": self.pages_rendered,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "recycles": self.recycles,
+        }
+        if recent:
+            summary["avg_render_seconds"] = round(statistics.fmean(recent), 3)
+            summary["max_render_seconds"] = round(max(recent), 3)
+        return summary
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton
+_raster_engine: Optional[RasterEngine] = None
+
+
+def get_raster_engine() -> RasterEngine:
+    """Get the process-wide rasterization engine."""
+    global _raster_engine
+    if _raster_engine is None:
+        from backend.config import get_settings
+
+        settings = get_settings()
+        _raster_engine = RasterEngine(
+            max_workers=settings.RENDER_WORKERS,
+            page_timeout=settings.RENDER_PAGE_TIMEOUT_S,
+        )
+    return _raster_engine
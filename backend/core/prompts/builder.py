@@ -5,12 +5,15 @@ Centralizes all prompt logic and Jinja2 template rendering.
 """
 
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from jinja2 import Environment, FileSystemLoader, StrictUndefined
 
 from backend.config import get_settings
 
+# Stands in for the category in a single-category prompt wrapped by batch.j2
+BATCH_PLACEHOLDER = {"name_raw": "<each entry of the 'categories' list>"}
+
 
 class PromptBuilder:
     """Builds prompts from Jinja2 templates with validation"""
@@ -150,6 +153,65 @@ class PromptBuilder:
             has_pricing=bool(category_base.get("base_price")),
         )
 
+    def batch_prompt(self, base_prompt: str, entries: List[Dict[str, Any]]) -> str:
+        """
+        Wrap a single-category prompt so it is applied to several categories.
+
+        Args:
+            base_prompt: Phase prompt rendered with a placeholder category
+            entries: Per-category inputs, in the order results must come back
+
+        Returns:
+            Formatted prompt string
+        """
+        return self.render(
+            "batch.j2", base_prompt=base_prompt, entries=entries, count=len(entries)
+        )
+
+    def phase2_batch_prompt(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        categories: List[Dict[str, Any]],
+    ) -> str:
+        """Build a Phase 2 prompt covering several categories of one page."""
+        base = self.phase2_prompt(restaurant_name, page_number, BATCH_PLACEHOLDER)
+        return self.batch_prompt(base, categories)
+
+    def phase3_batch_prompt(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        categories: List[Dict[str, Any]],
+    ) -> str:
+        """Build a Phase 3 prompt covering several categories of one page."""
+        base = self.phase3_prompt(
+            restaurant_name, page_number, {"category": BATCH_PLACEHOLDER}
+        )
+        return self.batch_prompt(base, [{"category": cat} for cat in categories])
+
+    def phase4_batch_prompt(
+        self,
+        restaurant_name: str,
+        page_number: int,
+        categories: List[Dict[str, Any]],
+        category_bases: List[Dict[str, Any]],
+    ) -> str:
+        """Build a Phase 4 prompt covering several categories of one page."""
+        base = self.phase4_prompt(
+            restaurant_name,
+            page_number,
+            {"category": BATCH_PLACEHOLDER},
+            {"category_base": BATCH_PLACEHOLDER},
+        )
+        return self.batch_prompt(
+            base,
+            [
+                {"category": cat, "category_base": cat_base}
+                for cat, cat_base in zip(categories, category_bases)
+            ],
+        )
+
     def custom_prompt(self, template_name: str, **variables) -> str:
         """
         Build a custom prompt from any template.
@@ -1,6 +1,18 @@
 # backend/database/__init__.py
 from backend.database.db import init_db, get_db, engine
-from backend.database.models import Restaurant, PhaseData, ExtractionHistory, CategorySizes
+from backend.database.models import (
+    Restaurant,
+    PhaseData,
+    ExtractionHistory,
+    CategorySizes,
+    JobQueue,
+    MenuCategory,
+    MenuSubcategory,
+    MenuItem,
+    MenuVariation,
+    MenuOption,
+    MenuAddon,
+)
 
 # Legacy aliases for backwards compatibility
 Job = Restaurant
@@ -13,5 +25,12 @@ __all__ = [
     "PhaseData",
     "ExtractionHistory",
     "CategorySizes",
+    "JobQueue",
+    "MenuCategory",
+    "MenuSubcategory",
+    "MenuItem",
+    "MenuVariation",
+    "MenuOption",
+    "MenuAddon",
     "Job",  # Alias
 ]
@@ -18,8 +18,12 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 def init_db():
-    """Create all tables."""
+    """Create missing tables and upgrade existing ones."""
+    # Imported here so `python -m backend.database.migrations` runs cleanly
+    from backend.database.migrations import upgrade
+
     Base.metadata.create_all(bind=engine)
+    return upgrade(engine)
 
 
 def get_db() -> Session:
@@ -0,0 +1,156 @@
+# backend/database/migrations.py
+"""
+Schema upgrades for databases created by earlier versions.
+
+create_all only creates missing tables; it never changes a table that
+already exists. Columns and indexes added to existing tables are added
+here instead, along with backfills of data the new columns and tables
+need for existing jobs. Every step checks the live schema or data first,
+so upgrade() runs on each startup (init_db) and can also be run by hand:
+
+    python -m backend.database.migrations
+"""
+
+from typing import Callable, List, Optional
+
+from sqlalchemy import Column, exists, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from backend.database.models import MenuCategory, PhaseData, Restaurant
+
+
+def _columns(conn: Connection, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _indexes(conn: Connection, table: str) -> set:
+    return {i["name"] for i in inspect(conn).get_indexes(table)}
+
+
+def _add_column(
+    conn: Connection, column: Column, default: Optional[str] = None
+) -> bool:
+    # ALTER TABLE ... ADD COLUMN as the model declares it; existing rows get
+    # default, which NOT NULL columns need
+    table = column.table.name
+    if column.name in _columns(conn, table):
+        return False
+    ddl = str(CreateColumn(column).compile(dialect=conn.dialect))
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+    return True
+
+
+def _add_index(conn: Connection, column: Column) -> bool:
+    # Create the model's index on a column if the table doesn't have it
+    table = column.table
+    index = next(
+        i for i in table.indexes if [c.name for c in i.columns] == [column.name]
+    )
+    if index.name in _indexes(conn, table.name):
+        return False
+    index.create(conn)
+    return True
+
+
+def _restaurant_pdf_sha256(conn: Connection) -> bool:
+    # Duplicate upload detection (Restaurant.pdf_sha256)
+    added = _add_column(conn, Restaurant.__table__.c.pdf_sha256)
+    indexed = _add_index(conn, Restaurant.__table__.c.pdf_sha256)
+    return added or indexed
+
+
+def _restaurant_counters(conn: Connection) -> bool:
+    # Job summary counters and the newest-first listing index
+    table = Restaurant.__table__
+    changed = False
+    for column in (table.c.page_count, table.c.category_count, table.c.item_count):
+        changed |= _add_column(conn, column, default="0")
+    changed |= _add_index(conn, table.c.created_at)
+    return changed
+
+
+def _backfill_menu(conn: Connection) -> bool:
+    # Fill the menu tables, and with them the counters, of jobs extracted
+    # before the tables existed, from their saved phase documents. Picks up
+    # where it left off if interrupted: only jobs without menu rows are done.
+    from backend.services import menu_store  # imports backend.database
+
+    db = Session(bind=conn)
+    job_ids = db.scalars(
+        select(Restaurant.job_id).where(
+            Restaurant.phase >= 1,
+            ~exists().where(MenuCategory.job_id == Restaurant.job_id),
+        )
+    ).all()
+
+    filled = 0
+    for job_id in job_ids:
+        documents = {
+            row.phase: row.json
+            for row in db.query(PhaseData.phase, PhaseData.json).filter(
+                PhaseData.job_id == job_id,
+                PhaseData.phase.between(1, 4),
+                PhaseData.json.isnot(None),
+            )
+        }
+        if not documents:
+            row = db.query(Restaurant.phase, Restaurant.json).filter(
+                Restaurant.job_id == job_id
+            ).one()
+            if row.json and 1 <= row.phase <= 4:
+                documents = {row.phase: row.json}
+        if not documents:
+            continue
+
+        try:
+            with db.begin_nested():
+                for phase in sorted(documents):
+                    menu_store.save_phase(db, job_id, phase, documents[phase])
+                # Phase 1 has one page entry per PDF page
+                pages = len((documents.get(1) or documents.get(2) or {}).get("pages", []))
+                db.query(Restaurant).filter(
+                    Restaurant.job_id == job_id, Restaurant.page_count == 0
+                ).update({Restaurant.page_count: pages}, synchronize_session=False)
+            # Jobs without any category are looked at again, but not reported
+            filled += db.query(
+                exists().where(MenuCategory.job_id == job_id)
+            ).scalar()
+        except Exception as e:
+            # A malformed old document mustn't keep the app from starting
+            print(f"Backfilling menu of job {job_id} failed: {e}")
+    db.close()
+    return filled > 0
+
+
+# Applied in order; each returns True if it changed the schema or data
+MIGRATIONS: List[Callable[[Connection], bool]] = [
+    _restaurant_pdf_sha256,
+    _restaurant_counters,
+    _backfill_menu,
+]
+
+
+def upgrade(engine: Engine) -> List[str]:
+    """
+    Bring existing tables up to date with the models.
+
+    Returns:
+        Names of the steps that changed something
+    """
+    applied = []
+    for step in MIGRATIONS:
+        with engine.begin() as conn:
+            if step(conn):
+                applied.append(step.__name__.lstrip("_"))
+    return applied
+
+
+if __name__ == "__main__":
+    from backend.database.db import init_db
+
+    applied = init_db()
+    print("Applied: " + ", ".join(applied) if applied else "Schema is up to date")
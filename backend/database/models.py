@@ -2,9 +2,9 @@
 # Database tables for menu extraction
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Boolean, Column, Float, Integer, String, DateTime, JSON, Index, Text, ForeignKey, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 Base = declarative_base()
 
@@ -17,10 +17,17 @@ class Restaurant(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     job_id = Column(String(32), unique=True, nullable=False, index=True)
     name = Column(String(255), nullable=True)
+    pdf_sha256 = Column(String(64), nullable=True, index=True)  # Finds re-uploads of the same PDF
     phase = Column(Integer, default=0, nullable=False)
-    json = Column(JSON, nullable=True)  # All the extracted menu data
+    json = deferred(Column(JSON, nullable=True))  # All the extracted menu data; only loaded when accessed
     status = Column(String(50), default="created", nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Summary counters, kept up to date when phases are saved
+    page_count = Column(Integer, default=0, nullable=False)
+    category_count = Column(Integer, default=0, nullable=False)
+    item_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)  # Updates when data changes
 
     # Links to other tables
@@ -42,7 +49,7 @@ class PhaseData(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False, index=True)
     phase = Column(Integer, nullable=False)
-    json = Column(JSON, nullable=True)
+    json = deferred(Column(JSON, nullable=True))  # only loaded when accessed
     status = Column(String(50), default="success", nullable=False)
     datetime = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -94,6 +101,168 @@ class CategorySizes(Base):
     )
 
 
+class JobQueue(Base):
+    # Durable queue of phase runs waiting for a worker (survives restarts)
+
+    __tablename__ = "job_queue"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False, index=True)
+    phase = Column(Integer, nullable=False)  # 0 = whole pipeline
+    status = Column(String(20), default="pending", nullable=False)  # pending, claimed, done, failed
+    priority = Column(Integer, default=0, nullable=False)  # higher runs first
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=2, nullable=False)
+    payload = Column(JSON, nullable=True)  # run options, e.g. use_cache
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # hidden until then (lease)
+    claimed_by = Column(String(64), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # last sign of life from claimed_by
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Links back to the main job
+    job = relationship("Restaurant")
+
+    __table_args__ = (
+        Index("idx_job_queue_claim", "status", "priority", "available_at"),
+    )
+
+
+# Normalized menu, rebuilt from each phase's result when it's saved. Rows are
+# addressed by their position in the phase documents (page, category index,
+# item index) rather than parent ids, so a whole phase is written with one
+# bulk insert per table. Text columns hold LLM output, which has no length
+# limit.
+
+
+class MenuCategory(Base):
+    # A category on a page (phase 1, then phase 2)
+
+    __tablename__ = "menu_categories"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False)
+    page_number = Column(Integer, nullable=False)
+    category_index = Column(Integer, nullable=False)  # position on the page
+    name_raw = Column(Text, nullable=False)
+    description_raw = Column(Text, nullable=True)
+    note = Column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "page_number", "category_index", name="uq_menu_category"),
+    )
+
+
+class MenuSubcategory(Base):
+    # A subcategory of a category (phase 1, then phase 2)
+
+    __tablename__ = "menu_subcategories"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False)
+    page_number = Column(Integer, nullable=False)
+    category_index = Column(Integer, nullable=False)
+    subcategory_index = Column(Integer, nullable=False)  # position in the category
+    name_raw = Column(Text, nullable=False)
+    description_raw = Column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "job_id", "page_number", "category_index", "subcategory_index",
+            name="uq_menu_subcategory",
+        ),
+    )
+
+
+class MenuItem(Base):
+    # An item of a category, directly or in a subcategory (phase 2)
+
+    __tablename__ = "menu_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False)
+    page_number = Column(Integer, nullable=False)
+    category_index = Column(Integer, nullable=False)
+    item_index = Column(Integer, nullable=False)  # position in the category, subcategories included
+    subcategory_index = Column(Integer, nullable=True)  # None = directly under the category
+    name_raw = Column(Text, nullable=False)
+    description_raw = Column(Text, nullable=True)
+    base_price = Column(Float, nullable=True)
+    size = Column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "job_id", "page_number", "category_index", "item_index", name="uq_menu_item"
+        ),
+        # MySQL can only index a prefix of a TEXT column
+        Index("idx_menu_item_name", "job_id", "name_raw", mysql_length={"name_raw": 191}),
+    )
+
+
+class MenuVariation(Base):
+    # A size/variation of an item with its price (phase 2)
+
+    __tablename__ = "menu_variations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False)
+    page_number = Column(Integer, nullable=False)
+    category_index = Column(Integer, nullable=False)
+    item_index = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)
+    name_raw = Column(Text, nullable=False)
+    price = Column(Float, nullable=True)
+    size = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("idx_menu_variation_item", "job_id", "page_number", "category_index", "item_index"),
+    )
+
+
+class MenuOption(Base):
+    # A base option of a category or its subcategories (phase 3)
+
+    __tablename__ = "menu_options"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False)
+    page_number = Column(Integer, nullable=False)
+    category_index = Column(Integer, nullable=False)
+    scope = Column(String(20), nullable=False)  # category, subcategory
+    position = Column(Integer, nullable=False)
+    name_raw = Column(Text, nullable=False)
+    price = Column(Float, nullable=True)
+    default = Column(Boolean, default=False, nullable=False)
+    price_by_variation = Column(JSON, nullable=True)  # [{variation_name, price}]
+
+    __table_args__ = (
+        Index("idx_menu_option_category", "job_id", "page_number", "category_index"),
+    )
+
+
+class MenuAddon(Base):
+    # An addon of an item (phase 4)
+
+    __tablename__ = "menu_addons"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey('restaurants.job_id'), nullable=False)
+    page_number = Column(Integer, nullable=False)
+    category_index = Column(Integer, nullable=False)
+    item_index = Column(Integer, nullable=True)  # None if no phase 2 item has the name
+    item_name_raw = Column(Text, nullable=False)
+    position = Column(Integer, nullable=False)
+    name_raw = Column(Text, nullable=False)
+    price = Column(Float, nullable=True)
+    default = Column(Boolean, default=False, nullable=False)
+    price_by_variation = Column(JSON, nullable=True)  # [{variation_name, price}]
+
+    __table_args__ = (
+        Index("idx_menu_addon_item", "job_id", "page_number", "category_index", "item_index"),
+    )
+
+
 # Old names that still work (for backwards compatibility)
 Job = Restaurant
 JobStatus = None
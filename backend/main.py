@@ -6,8 +6,12 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.api.routes import health, phase1, phase2, phase3, phase4, jobs
+from backend.api.middleware import UploadSizeLimitMiddleware
+from backend.api.routes import health, ingest, jobs, menu, phase1, phase2, phase3, phase4, pipeline
 from backend.config import get_settings
+from backend.core.processors.rasterizer import get_raster_engine
+from backend.services.job_runner import get_job_runner
+from backend.services.llm_client import close_llm_client
 from backend.services.storage import get_storage_service
 from backend.database import init_db
 
@@ -18,8 +22,13 @@ async def lifespan(app: FastAPI):
     # Setup: create folders and database
     get_storage_service()
     init_db()
+    if get_settings().JOB_RUN_IN_API:
+        get_job_runner().start()
     yield
-    # Cleanup happens here if needed
+    # Cleanup: stop background jobs, render workers and LLM connections
+    await get_job_runner().stop()
+    get_raster_engine().shutdown()
+    await close_llm_client()
 
 
 def create_app() -> FastAPI:
@@ -42,6 +51,18 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Cap upload bodies before they are spooled to disk; single uploads get
+    # 1 MB on top of the file for the form's other fields and framing
+    upload_limit = (settings.MAX_FILE_SIZE_MB + 1) * 1024 * 1024
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        limits={
+            "/api/phase1/extract": upload_limit,
+            "/api/pipeline/extract": upload_limit,
+            "/api/ingest": settings.INGEST_MAX_REQUEST_MB * 1024 * 1024,
+        },
+    )
+
     # Register API routes
     app.include_router(health.router)
     app.include_router(phase1.router)
@@ -49,6 +70,9 @@ def create_app() -> FastAPI:
     app.include_router(phase3.router)
     app.include_router(phase4.router)
     app.include_router(jobs.router)
+    app.include_router(pipeline.router)
+    app.include_router(ingest.router)
+    app.include_router(menu.router)
 
     return app
 
@@ -93,6 +93,13 @@ class CategoryWithItems(BaseModel):
     note: Optional[str] = "No notes provided"
 
 
+class CategoryWithItemsBatch(BaseModel):
+    """Several categories of one page extracted in a single call."""
+
+    model_config = ConfigDict(extra="ignore")
+    categories: List[CategoryWithItems] = Field(default_factory=list)
+
+
 # ---------- PHASE 3 ----------
 
 
@@ -111,6 +118,11 @@ class CategoryBase(BaseModel):
     subcategories_base: Optional[List[BaseOption]] = Field(default_factory=list)
 
 
+class CategoryBaseBatch(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    categories: List[CategoryBase] = Field(default_factory=list)
+
+
 # ---------- PHASE 4 ----------
 
 
@@ -139,3 +151,8 @@ class CategoryItemAddons(BaseModel):
     name_raw: str
     subcategory_items: Optional[List[SubcategoryAddons]] = Field(default_factory=list)
     items_addons: Optional[List[ItemsAddons]] = Field(default_factory=list)
+
+
+class CategoryItemAddonsBatch(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    categories: List[CategoryItemAddons] = Field(default_factory=list)
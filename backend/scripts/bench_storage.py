@@ -0,0 +1,145 @@
+# backend/scripts/bench_storage.py
+"""Benchmark JSON persistence of large phase documents.
+
+Compares the old stdlib pretty-printed save/load with the current
+StorageService (orjson if installed, compact, atomic), and measures how long
+the event loop stalls while a document is saved.
+
+Usage: python backend/scripts/bench_storage.py [--pages 40] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import storage as storage_module
+from backend.services.storage import StorageService
+
+
+def make_menu(pages: int, categories: int = 10, items: int = 30) -> dict:
+    """Phase 4 shaped document of the given size."""
+
+    def addon(i: int) -> dict:
+        return {
+            "name_raw": f"Extra topping {i} – fromage râpé",
+            "default": False,
+            "price": {"amount": 1.5 + i, "currency": "USD"},
+            "price_by_variation": [
+                {"variation_name": v, "price": {"amount": 1.0 + i, "currency": "USD"}}
+                for v in ("Small", "Medium", "Large")
+            ],
+        }
+
+    return {
+        "restaurant_name": "Benchmark Bistro",
+        "pages": [
+            {
+                "page_number": p,
+                "categories": [
+                    {
+                        "name_raw": f"Category {p}.{c}",
+                        "subcategory_items": [],
+                        "items_addons": [
+                            {"name_raw": f"Item {i}", "addons": [addon(a) for a in range(4)]}
+                            for i in range(items)
+                        ],
+                    }
+                    for c in range(categories)
+                ],
+                "input_hashes": [f"{p:08x}{c:024x}" for c in range(categories)],
+            }
+            for p in range(1, pages + 1)
+        ],
+    }
+
+
+def legacy_save(path: Path, data: dict) -> None:
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def legacy_load(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+async def max_loop_stall(save) -> float:
+    """Longest gap between event loop ticks while save() runs."""
+    stall = 0.0
+    done = False
+
+    async def ticker() -> None:
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await save()
+    done = True
+    await task
+    return stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_menu(args.pages)
+    backend = "orjson" if storage_module.orjson is not None else "stdlib json"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        storage = StorageService(tmp / "uploads", tmp / "outputs")
+        old_path, new_path = tmp / "legacy.json", tmp / "current.json"
+
+        legacy_save(old_path, data)
+        storage.save_json(new_path, data)
+        old_size, new_size = old_path.stat().st_size, new_path.stat().st_size
+
+        rows = [
+            ("save", best_of(args.repeat, legacy_save, old_path, data),
+             best_of(args.repeat, storage.save_json, new_path, data)),
+            ("load", best_of(args.repeat, legacy_load, old_path),
+             best_of(args.repeat, storage.load_json, new_path)),
+        ]
+
+        async def _sync_save():
+            legacy_save(old_path, data)
+
+        stall_sync = asyncio.run(max_loop_stall(_sync_save))
+        stall_async = asyncio.run(
+            max_loop_stall(lambda: storage.save_json_async(new_path, data))
+        )
+
+    print("=" * 50)
+    print(f"JSON storage benchmark ({args.pages} pages, backend: {backend})")
+    print("=" * 50)
+    print(f"{'':<12}{'legacy':>12}{'current':>12}{'speedup':>10}")
+    for name, old, new in rows:
+        print(f"{name:<12}{old * 1000:>10.1f}ms{new * 1000:>10.1f}ms{old / new:>9.1f}x")
+    print(f"{'file size':<12}{old_size / 1e6:>10.2f}MB{new_size / 1e6:>10.2f}MB")
+    print(f"{'loop stall':<12}{stall_sync * 1000:>10.1f}ms{stall_async * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
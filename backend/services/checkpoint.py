@@ -0,0 +1,104 @@
+"""
+Checkpoints of running phases.
+Every finished page or category result of a background run is appended to
+a per-job, per-phase log as soon as it exists. When the run fails or its
+worker dies, the next attempt loads the log and only calls the LLM for the
+units that are still missing. The log is removed once the phase result is
+saved.
+"""
+
+import asyncio
+import json
+import threading
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CheckpointLog:
+    """
+    Append-only JSON lines log of finished units, keyed by input hash.
+
+    Appends come from runner callbacks on the event loop, so they only
+    buffer the line; a writer task appends buffered lines to the file in a
+    worker thread, several at a time when units finish faster than the disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    def load(self) -> Dict[Tuple[int, str], Any]:
+        """
+        Results logged so far.
+
+        Returns:
+            Dict of (page_number, input hash) -> result
+        """
+        entries: Dict[Tuple[int, str], Any] = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # last line torn by a crash
+                entries[(record["page_number"], record["key"])] = record["result"]
+        return entries
+
+    def append(self, page_number: int, key: str, result: Any) -> None:
+        """Log one finished unit (written in the background on an event loop)."""
+        line = json.dumps(
+            {"page_number": page_number, "key": key, "result": result},
+            ensure_ascii=False,
+        )
+        self._buffer.append(line + "\n")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            lines, self._buffer = self._buffer, []
+            self._write(lines)
+            return
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._drain())
+
+    async def flush(self) -> None:
+        """Wait until every appended unit is on disk."""
+        while self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+
+    async def clear(self) -> None:
+        """Remove the log, after any writes still in flight."""
+        await self.flush()
+        self._buffer.clear()
+        await asyncio.to_thread(self.path.unlink, missing_ok=True)
+
+    async def _drain(self) -> None:
+        while self._buffer:
+            lines, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._write, lines)
+            except OSError as e:
+                # A lost checkpoint only costs a resumed run some LLM calls
+                print(f"Checkpoint write to {self.path} failed: {e}")
+
+    def _write(self, lines: List[str]) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+
+
+_current: ContextVar[Optional[CheckpointLog]] = ContextVar("checkpoint", default=None)
+
+
+def set_checkpoint(log: Optional[CheckpointLog]) -> None:
+    """Bind the log that finished units of this context are written to."""
+    _current.set(log)
+
+
+def get_checkpoint() -> Optional[CheckpointLog]:
+    return _current.get()
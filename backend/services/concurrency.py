@@ -0,0 +1,188 @@
+"""
+Process-wide adaptive limit on in-flight LLM calls.
+Grows and shrinks AIMD-style from observed latency and provider throttling,
+and pauses new calls when the provider asks us to back off.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def parse_rate_limit_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds until a rate-limit window resets (epoch ms, epoch s or delta s)."""
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1e12:  # epoch milliseconds (OpenRouter)
+        return max(0.0, reset / 1000 - time.time())
+    if reset > 1e9:  # epoch seconds
+        return max(0.0, reset - time.time())
+    return max(0.0, reset)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter shared by all phases and jobs"""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_tolerance: float = 2.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self.throttled = 0
+        self.latency_ewma: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of a call."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < self.current_limit:
+                    self.in_flight += 1
+                    return
+                await self._cond.wait()
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _decrease(self, factor: float) -> None:
+        # Concurrent failures from one overload event count once
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * factor)
+
+    def on_success(self, latency: float) -> None:
+        """Additive increase while latency stays near the baseline."""
+        self.latency_ewma = (
+            latency
+            if self.latency_ewma is None
+            else 0.8 * self.latency_ewma + 0.2 * latency
+        )
+        # Baseline tracks the best recent latency and drifts up slowly
+        if self.baseline_latency is None or self.latency_ewma < self.baseline_latency:
+            self.baseline_latency = self.latency_ewma
+        else:
+            self.baseline_latency *= 1.01
+
+        if self.latency_ewma > self.latency_tolerance * self.baseline_latency:
+            self._decrease(0.9)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease after a 429/5xx/timeout."""
+        self.throttled += 1
+        self._decrease(0.5)
+        if retry_after:
+            self.pause(retry_after)
+
+    def on_headers(self, headers: Mapping[str, str]) -> None:
+        """Pause until the window resets when the provider says none are left."""
+        remaining = headers.get("x-ratelimit-remaining") or headers.get(
+            "x-ratelimit-remaining-requests"
+        )
+        if remaining is None:
+            return
+        try:
+            if float(remaining) > 0:
+                return
+        except ValueError:
+            return
+        reset = parse_rate_limit_reset(
+            headers.get("x-ratelimit-reset") or headers.get("x-ratelimit-reset-requests")
+        )
+        if reset:
+            self.pause(reset)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.current_limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "throttled": self.throttled,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma else None,
+        }
+
+
+# Singleton
+_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_concurrency_limiter() -> AdaptiveLimiter:
+    """Get the process-wide LLM concurrency limiter."""
+    global _limiter
+    if _limiter is None:
+        from backend.config import get_settings
+
+        settings = get_settings()
+        _limiter = AdaptiveLimiter(
+            initial=settings.MAX_CONCURRENCY,
+            min_limit=settings.LLM_CONCURRENCY_MIN,
+            max_limit=settings.LLM_CONCURRENCY_MAX,
+        )
+    return _limiter
@@ -0,0 +1,120 @@
+# backend/services/duplicates.py
+"""
+Duplicate uploads.
+Uploads are indexed by the SHA-256 of the PDF (Restaurant.pdf_sha256). When
+the same PDF is uploaded again for the same restaurant, the new job is
+seeded with the rendered pages and phase results of the job that got
+furthest with it, instead of extracting everything again.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session, undefer
+
+from backend.core.extraction.partial import describe_failures, failures
+from backend.database import ExtractionHistory, PhaseData, Restaurant
+from backend.services import menu_store
+from backend.services.phase_store import PARTIAL, PIPELINE, SUCCESS, job_status
+from backend.services.storage import StorageService
+
+
+def find_duplicate(
+    db: Session, job: Restaurant, min_phase: int = 1
+) -> Optional[Restaurant]:
+    # Earlier job with the same PDF and restaurant name that saved at least
+    # min_phase; the most advanced, then most recent, wins
+    if not job.pdf_sha256:
+        return None
+    return (
+        db.query(Restaurant)
+        .filter(
+            Restaurant.pdf_sha256 == job.pdf_sha256,
+            Restaurant.name == job.name,
+            Restaurant.job_id != job.job_id,
+            Restaurant.phase >= min_phase,
+        )
+        .order_by(Restaurant.phase.desc(), Restaurant.updated_at.desc())
+        .first()
+    )
+
+
+def copy_results(
+    db: Session, storage: StorageService, source: Restaurant, job: Restaurant
+) -> str:
+    """
+    Give a new job the saved results of an earlier job with the same PDF.
+
+    Files are hard-linked where possible; every write replaces a file rather
+    than changing it in place, so edits to one job never show in the other.
+
+    Returns:
+        The job's status, e.g. "phase4_complete"
+    """
+    storage.copy_job_outputs(source.job_id, job.job_id)
+
+    rows = (
+        db.query(PhaseData)
+        .options(undefer(PhaseData.json))
+        .filter(
+            PhaseData.job_id == source.job_id,
+            PhaseData.status.in_((SUCCESS, PARTIAL)),
+        )
+        .order_by(PhaseData.phase)
+        .all()
+    )
+    statuses = {}
+    for row in rows:
+        statuses[row.phase] = row.status
+        db.add(
+            PhaseData(job_id=job.job_id, phase=row.phase, json=row.json, status=row.status)
+        )
+        if row.phase == PIPELINE or row.json is None:
+            continue
+        menu_store.save_phase(db, job.job_id, row.phase, row.json)
+        failed = failures(row.json or {}) if row.phase > 1 else []
+        db.add(
+            ExtractionHistory(
+                job_id=job.job_id,
+                phase=row.phase,
+                action="reuse",
+                status=row.status,
+                error_message=describe_failures(failed) or None,
+            )
+        )
+
+    job.phase = source.phase
+    job.json = source.json
+    job.status = job_status(source.phase, statuses.get(source.phase, SUCCESS))
+    job.updated_at = datetime.utcnow()
+    db.commit()
+    return job.status
+
+
+def reuse_duplicate(
+    db: Session, storage: StorageService, job_id: str, phase: int
+) -> Optional[str]:
+    """
+    Seed a freshly uploaded job from an earlier job with the same PDF.
+
+    Args:
+        phase: Run the upload asked for, 1 or PIPELINE; a pipeline run
+            only reuses a job that got through phase 4
+
+    Returns:
+        The reused job's ID, or None if there is no such job
+    """
+    job = db.query(Restaurant).filter(Restaurant.job_id == job_id).first()
+    min_phase = 4 if phase == PIPELINE else phase
+    source = find_duplicate(db, job, min_phase) if job else None
+    if source is None:
+        return None
+
+    copy_results(db, storage, source, job)
+    if phase == PIPELINE and not db.query(PhaseData.id).filter(
+        PhaseData.job_id == job_id, PhaseData.phase == PIPELINE
+    ).first():
+        # Polled like any finished pipeline run
+        db.add(PhaseData(job_id=job_id, phase=PIPELINE, status=SUCCESS))
+        db.commit()
+    return source.job_id
@@ -0,0 +1,113 @@
+"""
+Hedged LLM requests.
+When a call runs longer than a percentile of recent latencies for its phase,
+a duplicate is fired and the first valid response wins.
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """Fires a backup request for stragglers, within a cap on extra calls"""
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        max_extra_ratio: float = 0.1,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_extra_ratio = max_extra_ratio
+        self.window = window
+
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, phase: str, latency: float) -> None:
+        self._latencies.setdefault(phase, deque(maxlen=self.window)).append(latency)
+
+    def threshold(self, phase: str) -> Optional[float]:
+        """Latency after which a call of this phase gets hedged."""
+        samples = self._latencies.get(phase)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        cut = statistics.quantiles(samples, n=100)
+        return cut[min(98, max(0, round(self.percentile * 100) - 1))]
+
+    def _can_hedge(self) -> bool:
+        return self.hedges < self.max_extra_ratio * self.calls
+
+    async def run(self, phase: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run call, hedging it if it outlives the phase's latency threshold.
+
+        A backup that fails doesn't fail the call while the other is still
+        running; the loser is cancelled once one succeeds.
+        """
+        self.calls += 1
+
+        async def _timed() -> T:
+            start = time.monotonic()
+            result = await call()
+            self.record(phase, time.monotonic() - start)
+            return result
+
+        delay = self.threshold(phase)
+        started = time.monotonic()
+        primary = asyncio.create_task(_timed())
+        tasks = {primary}
+        try:
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._can_hedge():
+                return await primary
+
+            self.hedges += 1
+            backup = asyncio.create_task(_timed())
+            tasks.add(backup)
+
+            pending = set(tasks)
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            if not primary.done():
+                # Keep the straggler in the window so the threshold
+                # isn't biased towards the calls that won
+                self.record(phase, time.monotonic() - started)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "thresholds": {
+                phase: round(t, 3)
+                for phase in self._latencies
+                if (t := self.threshold(phase)) is not None
+            },
+        }
@@ -0,0 +1,244 @@
+# backend/services/job_queue.py
+# Durable queue of phase runs stored in the job_queue table
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, case, delete, exists, func, update
+from sqlalchemy.orm import Session
+
+from backend.database import JobQueue
+
+# Queue entry statuses
+PENDING = "pending"
+CLAIMED = "claimed"
+DONE = "done"
+FAILED = "failed"
+
+# Interactive runs go ahead of bulk ingestion
+PRIORITY_INTERACTIVE = 10
+PRIORITY_BULK = 0
+
+
+class LeaseLostError(Exception):
+    """Another worker took over a run whose lease expired."""
+
+    pass
+
+
+def _owned(entry_id: int, worker_id: str):
+    # The entry is still claimed by this worker (its lease wasn't taken over)
+    return and_(
+        JobQueue.id == entry_id,
+        JobQueue.claimed_by == worker_id,
+        JobQueue.status == CLAIMED,
+    )
+
+
+def _claimable(now: datetime):
+    # Pending and visible, or claimed by a worker whose lease ran out
+    return and_(
+        JobQueue.status.in_([PENDING, CLAIMED]),
+        JobQueue.available_at <= now,
+    )
+
+
+def active_entry(db: Session, job_id: str, phase: int) -> Optional[JobQueue]:
+    # Entry of this phase that is still waiting or running
+    return db.query(JobQueue).filter(
+        JobQueue.job_id == job_id,
+        JobQueue.phase == phase,
+        JobQueue.status.in_([PENDING, CLAIMED]),
+    ).first()
+
+
+def has_active(db: Session, job_id: str) -> bool:
+    # Any phase of the job is still waiting or running
+    return db.query(
+        exists().where(
+            JobQueue.job_id == job_id,
+            JobQueue.status.in_([PENDING, CLAIMED]),
+        )
+    ).scalar()
+
+
+def delete_entries(db: Session, job_id: str) -> None:
+    # Remove the finished entries of a job, e.g. before deleting the job;
+    # the caller checks has_active first and commits
+    db.execute(delete(JobQueue).where(JobQueue.job_id == job_id))
+
+
+def enqueue(
+    db: Session,
+    job_id: str,
+    phase: int,
+    payload: Optional[Dict[str, Any]] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    max_attempts: int = 2,
+) -> JobQueue:
+    # Add a phase run to the queue; the caller commits
+    entry = JobQueue(
+        job_id=job_id,
+        phase=phase,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+        status=PENDING,
+        available_at=datetime.utcnow(),
+    )
+    db.add(entry)
+    return entry
+
+
+def claim(db: Session, worker_id: str, lease_seconds: float) -> Optional[JobQueue]:
+    """
+    Claim the next visible entry, highest priority first.
+
+    The claim is a lease: the entry stays hidden from other workers for
+    lease_seconds and the worker keeps extending it with heartbeats. If the
+    worker dies, the entry becomes claimable again once the lease runs out.
+
+    On PostgreSQL/MySQL the row is locked with SELECT ... FOR UPDATE SKIP
+    LOCKED, so concurrent workers never wait on each other. SQLite has no row
+    locks; there the claim is an UPDATE guarded by the same condition as the
+    SELECT, so two workers can't both win the same entry.
+    """
+    now = datetime.utcnow()
+    lease = {
+        "status": CLAIMED,
+        "claimed_by": worker_id,
+        "available_at": now + timedelta(seconds=lease_seconds),
+        "heartbeat_at": now,
+        "updated_at": now,
+    }
+    next_entry = (
+        db.query(JobQueue)
+        .filter(_claimable(now))
+        .order_by(JobQueue.priority.desc(), JobQueue.available_at, JobQueue.id)
+        .limit(1)
+    )
+
+    if db.bind.dialect.name in ("postgresql", "mysql"):
+        entry = next_entry.with_for_update(skip_locked=True).first()
+        if entry is None:
+            db.commit()
+            return None
+        for field, value in lease.items():
+            setattr(entry, field, value)
+        entry.attempts += 1
+        db.commit()
+        return entry
+
+    while True:
+        candidate = next_entry.with_entities(JobQueue.id).scalar()
+        if candidate is None:
+            return None
+
+        claimed = db.execute(
+            update(JobQueue)
+            .where(JobQueue.id == candidate, _claimable(now))
+            .values(attempts=JobQueue.attempts + 1, **lease)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(JobQueue, candidate)
+        # Another worker got it first; try the next one
+
+
+def heartbeat(db: Session, entry_id: int, worker_id: str, lease_seconds: float) -> bool:
+    """
+    Extend a worker's lease on an entry.
+
+    Returns:
+        False if the lease was lost (it expired and another worker took over)
+    """
+    now = datetime.utcnow()
+    extended = db.execute(
+        update(JobQueue)
+        .where(_owned(entry_id, worker_id))
+        .values(
+            available_at=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
+        )
+    ).rowcount
+    db.commit()
+    return bool(extended)
+
+
+def complete(db: Session, entry_id: int, worker_id: str) -> None:
+    """
+    Mark a worker's entry done.
+
+    Raises:
+        LeaseLostError: If the entry is no longer claimed by worker_id
+    """
+    now = datetime.utcnow()
+    done = db.execute(
+        update(JobQueue)
+        .where(_owned(entry_id, worker_id))
+        .values(status=DONE, updated_at=now)
+    ).rowcount
+    db.commit()
+    if not done:
+        raise LeaseLostError(f"Lease on queue entry {entry_id} was lost")
+
+
+def fail(
+    db: Session, entry_id: int, worker_id: str, error: str, retry_delay: float
+) -> bool:
+    """
+    Record a failed attempt of a worker's entry.
+
+    Returns:
+        True if the entry will be retried after retry_delay seconds,
+        False if it ran out of attempts
+
+    Raises:
+        LeaseLostError: If the entry is no longer claimed by worker_id; the
+            worker that took over records the outcome
+    """
+    now = datetime.utcnow()
+    retry = JobQueue.attempts < JobQueue.max_attempts
+    failed = db.execute(
+        update(JobQueue)
+        .where(_owned(entry_id, worker_id))
+        .values(
+            status=case((retry, PENDING), else_=FAILED),
+            available_at=case(
+                (retry, now + timedelta(seconds=retry_delay)),
+                else_=JobQueue.available_at,
+            ),
+            last_error=error,
+            updated_at=now,
+        )
+    ).rowcount
+    db.commit()
+    if not failed:
+        raise LeaseLostError(f"Lease on queue entry {entry_id} was lost")
+    status = db.query(JobQueue.status).filter(JobQueue.id == entry_id).scalar()
+    return status == PENDING
+
+
+def release(db: Session, entry_id: int, worker_id: str) -> None:
+    # Hand an unfinished entry back without counting the attempt (e.g. shutdown)
+    db.execute(
+        update(JobQueue)
+        .where(_owned(entry_id, worker_id))
+        .values(
+            status=PENDING,
+            attempts=JobQueue.attempts - 1,
+            available_at=datetime.utcnow(),
+            claimed_by=None,
+        )
+    )
+    db.commit()
+
+
+def queue_stats(db: Session) -> Dict[str, int]:
+    # Number of entries per status
+    rows = (
+        db.query(JobQueue.status, func.count(JobQueue.id))
+        .group_by(JobQueue.status)
+        .all()
+    )
+    return {status: count for status, count in rows}
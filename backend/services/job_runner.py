@@ -0,0 +1,491 @@
+"""
+Background execution of extraction phases.
+Extract endpoints put a phase run on the durable job queue and return at
+once; a pool of worker tasks claims queued runs, executes them and records
+progress on Restaurant.status and PhaseData. Workers run inside the API
+process and/or in standalone `python -m backend.worker` processes that share
+the database and storage.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.core.extraction.phase1 import run_phase1
+from backend.core.extraction.phase2 import run_phase2
+from backend.core.extraction.phase3 import run_phase3
+from backend.core.extraction.phase4 import run_phase4
+from backend.core.extraction.pipeline import run_pipeline
+from backend.core.extraction.reextract import reextract_category, splice_category
+from backend.database import JobQueue, Restaurant
+from backend.database.db import SessionLocal
+from backend.services import job_queue, phase_store
+from backend.services.checkpoint import CheckpointLog, set_checkpoint
+from backend.services.job_queue import LeaseLostError
+from backend.services.llm_client import set_cache_bypass, set_restaurant_context
+from backend.services.progress import (
+    close_channel,
+    get_channel,
+    open_channel,
+    set_progress_channel,
+)
+from backend.services.storage import get_storage_service
+
+
+def _with_session(fn: Callable[..., Any], *args: Any) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def build_run(
+    job_id: str,
+    phase: int,
+    restaurant_name: Optional[str],
+    reuse: bool = True,
+    partial: Optional[bool] = None,
+) -> Callable[[], Awaitable[Dict[str, Any]]]:
+    """
+    Coroutine factory running one phase of a job from its saved inputs.
+
+    With reuse, phases 2-4 only re-extract categories whose input changed
+    since the phase's last result. With partial, categories that fail are
+    marked in the result instead of failing the run (None: settings default).
+    """
+    storage = get_storage_service()
+    pdf_path = str(storage.pdf_path(job_id))
+
+    async def _previous() -> Optional[Dict[str, Any]]:
+        path = phase_store.phase_output_path(storage, job_id, phase)
+        if not reuse or not storage.exists(path):
+            return None
+        return await storage.load_json_async(path)
+
+    async def _run() -> Dict[str, Any]:
+        if phase == phase_store.PIPELINE:
+            return await run_pipeline(restaurant_name, pdf_path)
+        if phase == 1:
+            return await run_phase1(restaurant_name, pdf_path)
+        if phase == 2:
+            reviewed_data = await storage.load_json_async(
+                storage.phase1_reviewed_path(job_id)
+            )
+            return await run_phase2(
+                reviewed_data["restaurant_name"],
+                reviewed_data,
+                pdf_path,
+                await _previous(),
+                partial,
+            )
+
+        items_data = await storage.load_json_async(storage.phase2_path(job_id))
+        if phase == 3:
+            return await run_phase3(
+                items_data["restaurant_name"],
+                items_data,
+                pdf_path,
+                await _previous(),
+                partial,
+            )
+
+        bases_data = await storage.load_json_async(storage.phase3_path(job_id))
+        return await run_phase4(
+            items_data["restaurant_name"],
+            items_data,
+            bases_data,
+            pdf_path,
+            await _previous(),
+            partial,
+        )
+
+    return _run
+
+
+async def reextract_phase_category(
+    db: Session,
+    job_id: str,
+    phase: int,
+    page_number: int,
+    category_name: str,
+    *,
+    use_cache: bool = False,
+) -> Dict[str, Any]:
+    """
+    Re-run phase 2, 3 or 4 for one category and splice it into the job.
+
+    Runs in the request rather than on the queue: it is a single LLM call on
+    one rendered page. The response cache is skipped unless use_cache is
+    set, as the cached reply is usually the bad result being replaced.
+
+    Returns:
+        The category's new result
+
+    Raises:
+        FileNotFoundError: If an input or the phase's own output is missing
+        CategoryNotFound: If the page or category doesn't exist
+        EarlierPhaseFailed: If the category failed in an earlier phase
+    """
+    storage = get_storage_service()
+    output_path = phase_store.phase_output_path(storage, job_id, phase)
+    input_paths = {
+        2: {1: storage.phase1_reviewed_path(job_id)},
+        3: {2: storage.phase2_path(job_id)},
+        4: {2: storage.phase2_path(job_id), 3: storage.phase3_path(job_id)},
+    }[phase]
+    if not storage.exists(output_path):
+        raise FileNotFoundError(f"Phase {phase} has no result to update yet")
+
+    inputs = {
+        n: await storage.load_json_async(path) for n, path in input_paths.items()
+    }
+    # Same name the phase run used, so prompts match the original extraction
+    restaurant_name = next(iter(inputs.values()))["restaurant_name"]
+    inputs[phase] = await storage.load_json_async(output_path)
+
+    set_restaurant_context(restaurant_name)
+    set_cache_bypass(not use_cache)
+    index, category = await reextract_category(
+        phase,
+        restaurant_name,
+        str(storage.pdf_path(job_id)),
+        page_number,
+        category_name,
+        inputs,
+    )
+
+    # Reload in case the file changed during the call
+    result = splice_category(
+        await storage.load_json_async(output_path), page_number, index, category
+    )
+    phase_store.save_category_result(
+        db, storage, job_id, phase, result, category=(page_number, index)
+    )
+    return category
+
+
+def enqueue_phase(
+    db: Session,
+    job_id: str,
+    phase: int,
+    *,
+    restaurant_name: Optional[str] = None,
+    use_cache: bool = True,
+    partial: Optional[bool] = None,
+    priority: int = job_queue.PRIORITY_INTERACTIVE,
+) -> str:
+    """
+    Queue a phase run of a job and mark the phase queued.
+
+    A run of the same phase that is still queued or running is reused
+    instead of starting a duplicate. The check and the insert run under a
+    write lock on the job's restaurant row, so concurrent requests for the
+    same job queue one run between them.
+
+    Returns:
+        The job's status
+    """
+    # Start a fresh transaction whose first statement takes the lock; the
+    # check below then sees any entry committed by the request that held it
+    db.commit()
+    db.execute(
+        update(Restaurant)
+        .where(Restaurant.job_id == job_id)
+        .values(updated_at=datetime.utcnow())
+    )
+    if job_queue.active_entry(db, job_id, phase):
+        status = db.query(Restaurant.status).filter(
+            Restaurant.job_id == job_id
+        ).scalar()
+        db.commit()
+        return status
+
+    from backend.config import get_settings
+
+    if not use_cache:
+        # A forced re-run must not resume from an earlier attempt
+        storage = get_storage_service()
+        storage.checkpoint_path(job_id, phase).unlink(missing_ok=True)
+
+    job_queue.enqueue(
+        db,
+        job_id,
+        phase,
+        payload={
+            "restaurant_name": restaurant_name,
+            "use_cache": use_cache,
+            "partial": partial,
+        },
+        priority=priority,
+        max_attempts=get_settings().JOB_MAX_ATTEMPTS,
+    )
+    phase_store.mark_phase(db, job_id, phase, phase_store.QUEUED)
+
+    if get_settings().JOB_RUN_IN_API:
+        # Only the process that runs jobs closes channels; standalone
+        # workers open their own when they claim the run
+        open_channel(job_id, phase).publish("status", status=phase_store.QUEUED)
+    get_job_runner().notify()
+    return phase_store.job_status(phase, phase_store.QUEUED)
+
+
+class JobRunner:
+    """Pool of worker tasks draining the job queue"""
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float = 2.0,
+        lease_seconds: float = 120.0,
+        heartbeat_interval: float = 30.0,
+        retry_delay: float = 30.0,
+        max_starts_per_minute: int = 0,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = min(heartbeat_interval, lease_seconds / 2)
+        self.retry_delay = retry_delay
+        self.max_starts_per_minute = max_starts_per_minute  # 0 = unlimited
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._starting: Optional[asyncio.Lock] = None
+        self._next_start = 0.0
+        # Queue entry id -> (job_id, phase) of runs on this process
+        self._running: Dict[int, Tuple[str, int]] = {}
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._starting = asyncio.Lock()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers; their unfinished runs go back on the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after new work was queued (from any thread)."""
+        if self._wakeup is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._wakeup.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            entry = await self._claim()
+            if entry is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._running[entry.id] = (entry.job_id, entry.phase)
+            try:
+                await self._execute(entry)
+            finally:
+                self._running.pop(entry.id, None)
+
+    async def _claim(self) -> Optional[JobQueue]:
+        # Spread run starts out to drain the queue at a controlled rate. The
+        # wait comes before the claim so it never eats into the lease, and
+        # only a successful claim uses up the start slot.
+        async with self._starting:
+            if self.max_starts_per_minute:
+                await asyncio.sleep(max(0.0, self._next_start - time.monotonic()))
+            entry = await asyncio.to_thread(
+                _with_session, job_queue.claim, self.worker_id, self.lease_seconds
+            )
+            if entry is not None and self.max_starts_per_minute:
+                self._next_start = time.monotonic() + 60.0 / self.max_starts_per_minute
+            return entry
+
+    async def _renew_lease(self, entry_id: int) -> None:
+        # Heartbeat; raises LeaseLostError if another worker took the run over
+        alive = await asyncio.to_thread(
+            _with_session,
+            job_queue.heartbeat,
+            entry_id,
+            self.worker_id,
+            self.lease_seconds,
+        )
+        if not alive:
+            raise LeaseLostError(f"Lease on queue entry {entry_id} was lost")
+
+    async def _with_heartbeat(self, entry_id: int, run: Awaitable[Any]) -> Any:
+        # Await a run while extending its lease; abandon it if the lease is lost
+        task = asyncio.ensure_future(run)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.heartbeat_interval)
+                if done:
+                    return task.result()
+                await self._renew_lease(entry_id)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.wait({task})
+
+    async def _execute(self, entry: JobQueue) -> None:
+        job_id, phase = entry.job_id, entry.phase
+        payload = entry.payload or {}
+        restaurant_name = payload.get("restaurant_name")
+
+        # Context for the LLM calls and progress events of this run
+        set_restaurant_context(restaurant_name)
+        set_cache_bypass(not payload.get("use_cache", True))
+        channel = get_channel(job_id, phase)
+        if channel is None or channel.closed:
+            channel = open_channel(job_id, phase)
+        set_progress_channel(channel)
+        checkpoint = None
+        if phase != phase_store.PIPELINE:
+            checkpoint = CheckpointLog(
+                get_storage_service().checkpoint_path(job_id, phase)
+            )
+        set_checkpoint(checkpoint)
+
+        try:
+            if entry.attempts > entry.max_attempts:
+                # Reclaimed after its worker died too many times
+                raise RuntimeError(f"Gave up after {entry.max_attempts} attempts")
+
+            await asyncio.to_thread(
+                _with_session,
+                phase_store.mark_phase,
+                job_id,
+                phase,
+                phase_store.RUNNING,
+            )
+            channel.publish(
+                "status", status=phase_store.RUNNING, attempt=entry.attempts
+            )
+
+            try:
+                result = await self._with_heartbeat(
+                    entry.id,
+                    build_run(
+                        job_id,
+                        phase,
+                        restaurant_name,
+                        reuse=payload.get("use_cache", True),
+                        partial=payload.get("partial"),
+                    )(),
+                )
+            finally:
+                # Units finished so far must be on disk for the next attempt
+                if checkpoint is not None:
+                    await checkpoint.flush()
+
+            # The lease may have run out during the run's last stretch; only
+            # its owner may save, and a fresh heartbeat covers the save
+            await self._renew_lease(entry.id)
+            if phase == phase_store.PIPELINE:
+                save, args = phase_store.save_pipeline_result, (result,)
+            else:
+                save, args = phase_store.save_phase_result, (phase, result)
+            status = await asyncio.to_thread(
+                _with_session, save, get_storage_service(), job_id, *args
+            )
+            if checkpoint is not None:
+                await checkpoint.clear()
+            await asyncio.to_thread(
+                _with_session, job_queue.complete, entry.id, self.worker_id
+            )
+            close_channel(
+                channel,
+                "status",
+                status=status,
+                units=result.get("units"),
+            )
+
+        except asyncio.CancelledError:
+            # Shutting down: let another worker pick the run up
+            await asyncio.to_thread(
+                _with_session, job_queue.release, entry.id, self.worker_id
+            )
+            raise
+        except LeaseLostError as e:
+            # The worker that took over records the outcome
+            print(f"Phase {phase} abandoned for job {job_id}: {e}")
+        except Exception as e:
+            print(f"Phase {phase} failed for job {job_id}: {e}")
+            try:
+                retry = await asyncio.to_thread(
+                    _with_session,
+                    job_queue.fail,
+                    entry.id,
+                    self.worker_id,
+                    str(e),
+                    self.retry_delay * 2 ** (entry.attempts - 1),
+                )
+            except LeaseLostError as lost:
+                print(f"Phase {phase} abandoned for job {job_id}: {lost}")
+                return
+            await asyncio.to_thread(
+                _with_session, phase_store.fail_phase, job_id, phase, str(e), retry
+            )
+            if retry:
+                channel.publish("status", status=phase_store.QUEUED, error=str(e))
+            else:
+                close_channel(
+                    channel, "status", status=phase_store.FAILED, error=str(e)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "workers": self.workers,
+            "running": len(self._running),
+            "queue": _with_session(job_queue.queue_stats),
+        }
+
+
+# Singleton
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    """Get the process-wide job runner."""
+    global _job_runner
+    if _job_runner is None:
+        from backend.config import get_settings
+
+        settings = get_settings()
+        _job_runner = JobRunner(
+            workers=settings.JOB_WORKERS,
+            poll_interval=settings.JOB_POLL_INTERVAL_S,
+            lease_seconds=settings.JOB_LEASE_S,
+            heartbeat_interval=settings.JOB_HEARTBEAT_S,
+            retry_delay=settings.JOB_RETRY_DELAY_S,
+            max_starts_per_minute=settings.JOB_MAX_STARTS_PER_MINUTE,
+        )
+    return _job_runner
@@ -0,0 +1,207 @@
+"""
+Incremental JSON parsing of streamed LLM output.
+Checks the structure one chunk at a time, so a reply that can no longer
+become valid JSON is rejected at the first bad token instead of after the
+whole response, and hands out array elements as soon as they are complete.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+
+Path = List[Union[str, int]]
+
+# Characters of numbers and true/false/null
+_LITERAL_START = set("-0123456789tfn")
+_LITERAL_CHARS = set("-+.0123456789eEtrufalsn")
+_ESCAPES = set('"\\/bfnrtu')
+_WHITESPACE = set(" \t\r\n")
+
+
+class JSONStreamError(ValueError):
+    """The streamed text can no longer become valid JSON."""
+
+    pass
+
+
+class IncrementalJSONParser:
+    """Pushdown validator for JSON text that arrives in chunks"""
+
+    def __init__(
+        self,
+        on_item: Optional[Callable[[Path, Any], None]] = None,
+        require_object: bool = True,
+    ):
+        """
+        Args:
+            on_item: Called with (path, value) for each object element of an
+                array once it is complete, e.g. (["categories", 0], {...})
+            require_object: Reject output whose top-level value isn't an object
+        """
+        self.on_item = on_item
+        self.require_object = require_object
+        self.text = ""
+        self.done = False
+
+        self._stack: List[Dict[str, Any]] = []
+        self._expect = "value"  # top-level expectation
+        self._in_string = False
+        self._escape = False
+        self._is_key = False
+        self._key: List[str] = []
+        self._literal: List[str] = []
+
+    def feed(self, chunk: str) -> None:
+        """
+        Consume the next piece of text.
+
+        Raises:
+            JSONStreamError: If the text so far can't be the start of valid JSON
+        """
+        offset = len(self.text)
+        self.text += chunk
+        for i, c in enumerate(chunk):
+            self._consume(c, offset + i)
+
+    def finish(self) -> str:
+        """
+        Check that the text is complete and return it.
+
+        Raises:
+            JSONStreamError: If the text stops before the JSON value ends
+        """
+        if self._literal:
+            self._end_literal(len(self.text))
+        if not self.done:
+            raise JSONStreamError(
+                f"JSON ends unexpectedly at position {len(self.text)}"
+            )
+        return self.text
+
+    def _error(self, message: str, pos: int) -> JSONStreamError:
+        context = self.text[max(0, pos - 40) : pos + 1]
+        return JSONStreamError(f"{message} at position {pos}: {context!r}")
+
+    def _consume(self, c: str, pos: int) -> None:
+        if self._in_string:
+            self._consume_string(c, pos)
+            return
+
+        if self._literal:
+            if c in _LITERAL_CHARS:
+                self._literal.append(c)
+                return
+            self._end_literal(pos)
+
+        if c in _WHITESPACE:
+            return
+        if self.done:
+            raise self._error("Unexpected text after the JSON value", pos)
+
+        frame = self._stack[-1] if self._stack else None
+        expect = frame["expect"] if frame else self._expect
+
+        if expect in ("value", "value_or_end"):
+            if c == "]" and expect == "value_or_end":
+                self._close(pos)
+            elif frame is None and self.require_object and c != "{":
+                raise self._error("Response doesn't start with a JSON object", pos)
+            elif c == "{":
+                self._open("object", pos)
+            elif c == "[":
+                self._open("array", pos)
+            elif c == '"':
+                self._in_string, self._is_key = True, False
+            elif c in _LITERAL_START:
+                self._literal = [c]
+            else:
+                raise self._error(f"Unexpected {c!r} where a value should be", pos)
+
+        elif expect in ("key", "key_or_end"):
+            if c == '"':
+                self._in_string, self._is_key = True, True
+                self._key = []
+            elif c == "}" and expect == "key_or_end":
+                self._close(pos)
+            else:
+                raise self._error(f"Unexpected {c!r} where a key should be", pos)
+
+        elif expect == "colon":
+            if c != ":":
+                raise self._error(f"Expected ':' but got {c!r}", pos)
+            frame["expect"] = "value"
+
+        elif expect == "comma_or_end":
+            if c == ",":
+                if frame["type"] == "array":
+                    frame["index"] += 1
+                    frame["expect"] = "value"
+                else:
+                    frame["expect"] = "key"
+            elif c == ("}" if frame["type"] == "object" else "]"):
+                self._close(pos)
+            else:
+                raise self._error(
+                    f"Expected ',' or a closing bracket but got {c!r}", pos
+                )
+
+    def _consume_string(self, c: str, pos: int) -> None:
+        if self._escape:
+            if c not in _ESCAPES:
+                raise self._error(f"Invalid escape '\\{c}'", pos)
+            self._escape = False
+        elif c == "\\":
+            self._escape = True
+        elif c == '"':
+            self._in_string = False
+            if self._is_key:
+                self._stack[-1]["key"] = "".join(self._key)
+                self._stack[-1]["expect"] = "colon"
+                return
+            self._value_done()
+            return
+        elif c < " ":
+            raise self._error("Control character in string", pos)
+
+        if self._is_key:
+            self._key.append(c)
+
+    def _end_literal(self, pos: int) -> None:
+        literal = "".join(self._literal)
+        self._literal = []
+        try:
+            json.loads(literal)
+        except ValueError:
+            raise self._error(f"Invalid literal {literal!r}", pos - 1) from None
+        self._value_done()
+
+    def _open(self, kind: str, pos: int) -> None:
+        self._stack.append(
+            {
+                "type": kind,
+                "start": pos,
+                "expect": "key_or_end" if kind == "object" else "value_or_end",
+                "key": None,
+                "index": 0,
+            }
+        )
+
+    def _close(self, pos: int) -> None:
+        frame = self._stack.pop()
+        parent = self._stack[-1] if self._stack else None
+        if (
+            self.on_item
+            and frame["type"] == "object"
+            and parent is not None
+            and parent["type"] == "array"
+        ):
+            path = [
+                f["key"] if f["type"] == "object" else f["index"] for f in self._stack
+            ]
+            self.on_item(path, json.loads(self.text[frame["start"] : pos + 1]))
+        self._value_done()
+
+    def _value_done(self) -> None:
+        if self._stack:
+            self._stack[-1]["expect"] = "comma_or_end"
+        else:
+            self.done = True
@@ -1,15 +1,31 @@
 # backend/services/llm_client.py
 """LLM client wrapper for OpenRouter/OpenAI."""
 
+import asyncio
+import json
+import time
 from contextvars import ContextVar
-from typing import Any, Dict, List, Type
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Type
 
-from openai import AsyncOpenAI
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
 from pydantic import BaseModel
 
+from backend.services.concurrency import get_concurrency_limiter, parse_retry_after
+from backend.services.hedging import HedgePolicy
+from backend.services.json_stream import IncrementalJSONParser, JSONStreamError, Path
+from backend.services.progress import report_partial
+from backend.services.response_cache import cache_key, get_response_cache
+from backend.services.retry import ErrorClass, RetryPolicy
+
 # Context variable for restaurant name (works across async operations)
 _restaurant_name: ContextVar[str] = ContextVar('restaurant_name', default=None)
 
+# Set per request to skip the response cache (e.g. a forced re-run)
+_cache_bypass: ContextVar[bool] = ContextVar('cache_bypass', default=False)
+
 
 class LLMClientError(RuntimeError):
     """LLM client error."""
@@ -17,11 +33,54 @@ class LLMClientError(RuntimeError):
     pass
 
 
+@dataclass
+class LLMResult:
+    """Validated structured output of one LLM request"""
+
+    data: Dict[str, Any]
+    cached: bool = False
+    attempts: int = 1  # LLM requests made, including retries
+
+
+@lru_cache(maxsize=None)
+def _schema_envelope(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """Build the response_format envelope once per model class."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model_cls.__name__,
+            "schema": model_cls.model_json_schema(),
+            "strict": True,
+        },
+    }
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
 class LLMClient:
     """Wrapper around OpenRouter chat completions."""
 
     def __init__(
-        self, api_key: str, provider: str = "OpenRouter", model: str = None
+        self,
+        api_key: str,
+        provider: str = "OpenRouter",
+        model: str = None,
+        *,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        timeout: float = 180.0,
+        connect_timeout: float = 10.0,
+        http2: bool = False,
+        stream: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
     ):
         self.api_key = api_key
         self.model = model
@@ -29,49 +88,236 @@ class LLMClient:
         if not self.model:
             raise LLMClientError("Model must be specified")
 
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            print("LLM_HTTP2 is on but the h2 package is missing; using HTTP/1.1")
+        self.stream = stream  # streamed completions, parsed as they arrive
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_policy = hedge_policy  # None disables hedging
+        self._client: Optional[AsyncOpenAI] = None
+
     def _get_client(self) -> AsyncOpenAI:
-        """Create client with dynamic headers based on context."""
+        """Get the pooled client, created once per process."""
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url="https://openrouter.ai/api/v1",
+                timeout=self.timeout,
+                # Retries happen above the limiter so it sees every 429/5xx
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    limits=self.limits, timeout=self.timeout, http2=self.http2
+                ),
+                default_headers={
+                    "HTTP-Referer": "http://localhost:8080",
+                    "X-User-Id": "orderart",
+                },
+            )
+        return self._client
+
+    def _request_headers(self) -> Dict[str, str]:
+        """Per-request headers based on the current restaurant context."""
         restaurant_name = _restaurant_name.get()
         x_title = f"OrderArt / {restaurant_name}" if restaurant_name else "OrderArt Menu Extraction"
-        
-        return AsyncOpenAI(
-            api_key=self.api_key,
-            base_url="https://openrouter.ai/api/v1",
-            default_headers={
-                "HTTP-Referer": "http://localhost:8080",
-                "X-Title": x_title,
-                "X-User-Id": "orderart"
-            }
-        )
+        return {"X-Title": x_title}
 
     def json_schema_format(self, model_cls: Type[BaseModel]) -> Dict[str, Any]:
         """Generate JSON schema response format."""
-        return {
-            "type": "json_schema",
-            "json_schema": {
-                "name": model_cls.__name__,
-                "schema": model_cls.model_json_schema(),
-                "strict": True,
-            },
-        }
+        return _schema_envelope(model_cls)
 
     async def generate(
         self,
         messages: List[Dict[str, Any]],
         response_format: Dict[str, Any] = None,
     ):
-        """Call LLM with messages."""
+        """Call LLM with messages under the process-wide concurrency limit."""
+        limiter = get_concurrency_limiter()
+        async with limiter.slot():
+            start = time.monotonic()
+            try:
+                raw = await self._get_client().chat.completions.with_raw_response.create(
+                    model=self.model,
+                    messages=messages,
+                    response_format=response_format,
+                    extra_headers=self._request_headers(),
+                )
+            except Exception as e:
+                raise self._call_error(e)
+
+            limiter.on_headers(raw.headers)
+            limiter.on_success(time.monotonic() - start)
+            return raw.parse()
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        response_format: Dict[str, Any] = None,
+        on_item: Optional[Callable[[Path, Any], None]] = None,
+    ) -> str:
+        """
+        Stream a completion, checking its JSON structure as tokens arrive.
+
+        The stream is abandoned at the first token that can't be part of valid
+        JSON, so a retry starts without waiting for the rest of the reply.
+
+        Args:
+            messages: Chat messages
+            response_format: Structured output format
+            on_item: Called with (path, value) for each completed array element
+
+        Returns:
+            The full response text
+
+        Raises:
+            LLMClientError: If the call fails
+            JSONStreamError: If the output stops being valid JSON
+        """
+        limiter = get_concurrency_limiter()
+        async with limiter.slot():
+            start = time.monotonic()
+            parser = IncrementalJSONParser(on_item=on_item)
+            try:
+                raw = await self._get_client().chat.completions.with_raw_response.create(
+                    model=self.model,
+                    messages=messages,
+                    response_format=response_format,
+                    extra_headers=self._request_headers(),
+                    stream=True,
+                )
+                limiter.on_headers(raw.headers)
+                stream = raw.parse()
+                try:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            parser.feed(chunk.choices[0].delta.content)
+                finally:
+                    await stream.close()
+            except JSONStreamError:
+                raise
+            except Exception as e:
+                raise self._call_error(e)
+
+            text = parser.finish()
+            limiter.on_success(time.monotonic() - start)
+            return text
+
+    def _call_error(self, e: Exception) -> LLMClientError:
+        """Report throttling to the limiter and wrap the SDK error."""
+        limiter = get_concurrency_limiter()
+        if isinstance(e, httpx.TimeoutException):
+            # Raised by the transport while reading a stream
+            e = APITimeoutError(request=e.request)
+        elif isinstance(e, httpx.TransportError):
+            e = APIConnectionError(request=e.request)
+
+        if isinstance(e, APIStatusError):
+            if e.status_code == 429 or e.status_code >= 500:
+                limiter.on_throttle(
+                    parse_retry_after(e.response.headers.get("retry-after"))
+                )
+        elif isinstance(e, (APITimeoutError, APIConnectionError)):
+            limiter.on_throttle()
+        error = LLMClientError(f"LLM call failed: {e}")
+        error.__cause__ = e
+        return error
+
+    async def generate_structured(
+        self,
+        messages: List[Dict[str, Any]],
+        model_cls: Type[BaseModel],
+        *,
+        phase: Optional[str] = None,
+        use_cache: bool = True,
+        label: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> LLMResult:
+        """
+        Call LLM and validate the response against model_cls.
+
+        Failed calls and invalid responses are retried per the retry policy,
+        and slow calls are hedged when a hedge policy is set. With streaming,
+        malformed output is caught while it arrives.
+        Validated responses are cached by model, prompt, image and schema, so
+        re-running a phase on an unchanged PDF doesn't pay for the calls again.
+
+        Args:
+            messages: Chat messages
+            model_cls: Pydantic model the response must match
+            phase: Phase label used for cache hit-rate reporting
+            use_cache: Set False to skip the cache for this call
+            label: Description of the call for retry logs
+            retry_policy: Overrides the client's retry policy for this call
+
+        Raises:
+            LLMClientError: If the call fails after all retries
+            ValueError: If the response isn't valid JSON for model_cls
+        """
+        response_format = self.json_schema_format(model_cls)
+        cache = get_response_cache() if use_cache and not _cache_bypass.get() else None
+        key = cache_key(self.model, messages, response_format) if cache else None
+
+        if cache:
+            cached = await asyncio.to_thread(cache.get, key, phase)
+            if cached is not None:
+                return LLMResult(data=self._parse(cached, model_cls, phase), cached=True)
+
+        async def _call():
+            if self.stream:
+                # Completed array elements (e.g. items) go to progress consumers
+                raw = await self.generate_stream(
+                    messages,
+                    response_format=response_format,
+                    on_item=lambda path, item: report_partial(
+                        label or phase, path, item
+                    ),
+                )
+            else:
+                response = await self.generate(messages, response_format=response_format)
+                raw = response.choices[0].message.content
+            return raw, self._parse(raw, model_cls, phase)
+
+        async def _attempt():
+            # A hedge only wins with a response that also validated
+            if self.hedge_policy:
+                return await self.hedge_policy.run(phase or "default", _call)
+            return await _call()
+
+        (raw, data), attempts = await (retry_policy or self.retry_policy).run(
+            _attempt, label=label or phase or "LLM"
+        )
+
+        # Only responses that validated are cached
+        if cache:
+            await asyncio.to_thread(cache.put, key, self.model, phase, raw)
+        return LLMResult(data=data, attempts=attempts)
+
+    def _parse(
+        self, raw: str, model_cls: Type[BaseModel], phase: Optional[str]
+    ) -> Dict[str, Any]:
+        """Parse and validate a raw JSON response."""
         try:
-            # Create client with current context headers
-            client = self._get_client()
-            
-            return await client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_format=response_format,
-            )
-        except Exception as e:
-            raise LLMClientError(f"LLM call failed: {e}") from e
+            obj = json.loads(raw)
+        except (json.JSONDecodeError, TypeError) as e:
+            pos = getattr(e, "pos", 0) or 0
+            error_msg = f"JSON decode error at position {pos}: {getattr(e, 'msg', e)}"
+            raw = raw or ""
+            print(f"{phase or 'LLM'} - Failed to parse LLM response: {error_msg}")
+            print(f"Raw response (first 500 chars): {raw[:500]}")
+            print(f"Raw response (around error): {raw[max(0, pos-100):pos+100]}")
+            raise ValueError(f"LLM returned invalid JSON: {error_msg}") from e
+
+        return model_cls.model_validate(obj).model_dump()
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
 
 
 # Singleton
@@ -83,6 +329,11 @@ def set_restaurant_context(restaurant_name: str):
     _restaurant_name.set(restaurant_name)
 
 
+def set_cache_bypass(bypass: bool):
+    """Skip the response cache for LLM calls made from this context."""
+    _cache_bypass.set(bypass)
+
+
 def get_llm_client() -> LLMClient:
     """Get cached LLM client instance."""
     global _llm_client
@@ -99,5 +350,44 @@ def get_llm_client() -> LLMClient:
             api_key=api_key,
             provider="OpenRouter",
             model=settings.OPENROUTER_DEFAULT_MODEL,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            timeout=settings.LLM_TIMEOUT_S,
+            connect_timeout=settings.LLM_CONNECT_TIMEOUT_S,
+            http2=settings.LLM_HTTP2,
+            stream=settings.LLM_STREAM,
+            retry_policy=RetryPolicy(
+                base_delay=settings.LLM_RETRY_BASE_DELAY_S,
+                max_delay=settings.LLM_RETRY_MAX_DELAY_S,
+                budgets={
+                    ErrorClass.RATE_LIMIT: settings.LLM_RETRY_BUDGET_RATE_LIMIT,
+                    ErrorClass.TIMEOUT: settings.LLM_RETRY_BUDGET_TIMEOUT,
+                    ErrorClass.SERVER_ERROR: settings.LLM_RETRY_BUDGET_SERVER_ERROR,
+                    ErrorClass.SCHEMA: settings.LLM_RETRY_BUDGET_SCHEMA,
+                    ErrorClass.NON_RETRYABLE: 0,
+                },
+            ),
+            hedge_policy=(
+                HedgePolicy(
+                    percentile=settings.LLM_HEDGE_PERCENTILE,
+                    min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+                    max_extra_ratio=settings.LLM_HEDGE_MAX_EXTRA_RATIO,
+                )
+                if settings.LLM_HEDGE_ENABLED
+                else None
+            ),
         )
     return _llm_client
+
+
+def get_hedge_stats() -> Optional[Dict[str, Any]]:
+    """Hedging counters of the cached client, if hedging is enabled."""
+    if _llm_client is None or _llm_client.hedge_policy is None:
+        return None
+    return _llm_client.hedge_policy.stats()
+
+
+async def close_llm_client() -> None:
+    """Close the cached client's connections, if one was created."""
+    if _llm_client is not None:
+        await _llm_client.close()
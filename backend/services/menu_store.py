@@ -0,0 +1,348 @@
+# backend/services/menu_store.py
+"""
+Normalized menu tables.
+Each phase's result is also written to the menu tables when it's saved, so
+one category or item can be read and edited with indexed queries instead of
+loading and rewriting the whole JSON document. Phase 1 fills categories
+and subcategories until phase 2 replaces them and adds items and
+variations; phase 3 fills options and phase 4 addons. Tables are written
+inside the caller's transaction; the caller commits.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from backend.database import (
+    MenuAddon,
+    MenuCategory,
+    MenuItem,
+    MenuOption,
+    MenuSubcategory,
+    MenuVariation,
+    PhaseData,
+    Restaurant,
+)
+
+# Tables holding the rows written for each phase
+_PHASE_TABLES = {
+    1: (MenuCategory, MenuSubcategory),
+    2: (MenuCategory, MenuSubcategory, MenuItem, MenuVariation),
+    3: (MenuOption,),
+    4: (MenuAddon,),
+}
+
+_ALL_TABLES = (
+    MenuCategory,
+    MenuSubcategory,
+    MenuItem,
+    MenuVariation,
+    MenuOption,
+    MenuAddon,
+)
+
+
+def _amount(price: Optional[Dict[str, Any]]) -> Optional[float]:
+    return price.get("amount") if price else None
+
+
+def _categories(
+    phase: int, result: Dict[str, Any]
+) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    # (page_number, category_index, category) of a phase result
+    for page in result.get("pages", []):
+        # Phase 1 nests the categories under "data"
+        categories = (page.get("data") or {}) if phase == 1 else page
+        for index, category in enumerate(categories.get("categories") or []):
+            yield page["page_number"], index, category
+
+
+def _category_items(
+    category: Dict[str, Any]
+) -> List[Tuple[Optional[int], Dict[str, Any]]]:
+    # (subcategory_index, item) of a phase 2 category, in item_index order:
+    # items directly under the category, then those of each subcategory
+    items = [
+        (None, item)
+        for group in category.get("category_items") or []
+        for item in group.get("items") or []
+    ]
+    for i, sub in enumerate(category.get("subcategory_items") or []):
+        items.extend((i, item) for item in sub.get("items") or [])
+    return items
+
+
+class ItemNotFound(LookupError):
+    """No item at the given position of a phase 2 result"""
+
+
+def find_item(
+    result: Dict[str, Any], page_number: int, category_index: int, item_index: int
+) -> Dict[str, Any]:
+    """
+    The item of a phase 2 result that a menu_items row was written from.
+
+    Raises:
+        ItemNotFound: If the result has no item at that position
+    """
+    for page, index, category in _categories(2, result):
+        if (page, index) == (page_number, category_index):
+            items = _category_items(category)
+            if 0 <= item_index < len(items):
+                return items[item_index][1]
+            break
+    raise ItemNotFound(
+        f"Item {item_index} of category {category_index} on page {page_number} not found"
+    )
+
+
+def _category_rows(
+    job_id: str, phase: int, page_number: int, index: int, category: Dict[str, Any]
+) -> Dict[type, List[Dict[str, Any]]]:
+    key = {"job_id": job_id, "page_number": page_number, "category_index": index}
+    rows: Dict[type, List[Dict[str, Any]]] = {table: [] for table in _PHASE_TABLES[phase]}
+
+    if phase == 1:
+        rows[MenuCategory].append({**key, "name_raw": category["name_raw"]})
+        rows[MenuSubcategory].extend(
+            {**key, "subcategory_index": i, "name_raw": sub["name_raw"]}
+            for i, sub in enumerate(category.get("subcategories") or [])
+        )
+        return rows
+
+    if phase == 2:
+        groups = category.get("category_items") or []
+        description = next(
+            (g["description_raw"] for g in groups if g.get("description_raw")), None
+        )
+        rows[MenuCategory].append(
+            {
+                **key,
+                "name_raw": category["name_raw"],
+                "description_raw": description,
+                "note": category.get("note"),
+            }
+        )
+
+        rows[MenuSubcategory].extend(
+            {
+                **key,
+                "subcategory_index": i,
+                "name_raw": sub["name_raw"],
+                "description_raw": sub.get("description_raw"),
+            }
+            for i, sub in enumerate(category.get("subcategory_items") or [])
+        )
+
+        # Items are numbered across the category and its subcategories
+        for item_index, (sub_index, item) in enumerate(_category_items(category)):
+            rows[MenuItem].append(
+                {
+                    **key,
+                    "item_index": item_index,
+                    "subcategory_index": sub_index,
+                    "name_raw": item["name_raw"],
+                    "description_raw": item.get("description_raw"),
+                    "base_price": _amount(item.get("base_price")),
+                    "size": item.get("size"),
+                }
+            )
+            rows[MenuVariation].extend(
+                {
+                    **key,
+                    "item_index": item_index,
+                    "position": position,
+                    "name_raw": variation["name_raw"],
+                    "price": _amount(variation.get("price")),
+                    "size": variation.get("size"),
+                }
+                for position, variation in enumerate(item.get("variations") or [])
+            )
+        return rows
+
+    if phase == 3:
+        for scope, options in (
+            ("category", category.get("base_options")),
+            ("subcategory", category.get("subcategories_base")),
+        ):
+            rows[MenuOption].extend(
+                {
+                    **key,
+                    "scope": scope,
+                    "position": position,
+                    "name_raw": option["name_raw"],
+                    "price": _amount(option.get("price")),
+                    "default": bool(option.get("default")),
+                    "price_by_variation": option.get("price_by_variation"),
+                }
+                for position, option in enumerate(options or [])
+            )
+        return rows
+
+    # Phase 4: addons are listed per item name, directly under the category
+    # or per subcategory
+    groups = [(None, category.get("items_addons"))] + [
+        (sub["name_raw"], sub.get("items_addons"))
+        for sub in category.get("subcategory_items") or []
+    ]
+    for sub_name, items_addons in groups:
+        for item in items_addons or []:
+            rows[MenuAddon].extend(
+                {
+                    **key,
+                    "item_name_raw": item["name_raw"],
+                    "subcategory_name_raw": sub_name,
+                    "position": position,
+                    "name_raw": addon["name_raw"],
+                    "price": _amount(addon.get("price")),
+                    "default": bool(addon.get("default")),
+                    "price_by_variation": addon.get("price_by_variation"),
+                }
+                for position, addon in enumerate(item.get("addons") or [])
+            )
+    return rows
+
+
+def _link_addons(db: Session, job_id: str, rows: List[Dict[str, Any]]) -> None:
+    # Resolve the item each addon belongs to by name, preferring the item in
+    # the named subcategory
+    if not rows:
+        return
+    subcategories = {
+        (s.page_number, s.category_index, s.subcategory_index): s.name_raw
+        for s in db.execute(
+            select(
+                MenuSubcategory.page_number,
+                MenuSubcategory.category_index,
+                MenuSubcategory.subcategory_index,
+                MenuSubcategory.name_raw,
+            ).where(MenuSubcategory.job_id == job_id)
+        )
+    }
+    items: Dict[Tuple[int, int, Optional[str], str], int] = {}
+    for item in db.execute(
+        select(
+            MenuItem.page_number,
+            MenuItem.category_index,
+            MenuItem.subcategory_index,
+            MenuItem.item_index,
+            MenuItem.name_raw,
+        ).where(MenuItem.job_id == job_id)
+    ):
+        sub_name = subcategories.get(
+            (item.page_number, item.category_index, item.subcategory_index)
+        )
+        for scope in {sub_name, None}:
+            items.setdefault(
+                (item.page_number, item.category_index, scope, item.name_raw),
+                item.item_index,
+            )
+
+    for row in rows:
+        page_number, index = row["page_number"], row["category_index"]
+        name, sub_name = row["item_name_raw"], row.pop("subcategory_name_raw")
+        row["item_index"] = items.get(
+            (page_number, index, sub_name, name), items.get((page_number, index, None, name))
+        )
+
+
+def save_phase(
+    db: Session,
+    job_id: str,
+    phase: int,
+    result: Dict[str, Any],
+    only: Optional[Tuple[int, int]] = None,
+) -> None:
+    """
+    Replace the menu rows of a phase with those of its result.
+
+    Once the job has a phase 2 result, phase 1 saves (a review edit or a
+    re-run) leave its category rows alone. Options and addons of categories
+    that no longer exist are deleted.
+
+    Args:
+        only: (page_number, category_index) to replace just one category,
+            e.g. after it was re-extracted
+    """
+    if phase == 1 and _has_phase2(db, job_id):
+        return
+
+    rows: Dict[type, List[Dict[str, Any]]] = {table: [] for table in _PHASE_TABLES[phase]}
+    for page_number, index, category in _categories(phase, result):
+        if only and (page_number, index) != only:
+            continue
+        for table, table_rows in _category_rows(
+            job_id, phase, page_number, index, category
+        ).items():
+            rows[table].extend(table_rows)
+
+    for table in _PHASE_TABLES[phase]:
+        query = delete(table).where(table.job_id == job_id)
+        if only:
+            query = query.where(
+                table.page_number == only[0], table.category_index == only[1]
+            )
+        db.execute(query)
+
+    if phase == 4:
+        _link_addons(db, job_id, rows[MenuAddon])
+    for table, table_rows in rows.items():
+        if table_rows:
+            db.execute(insert(table), table_rows)
+
+    if MenuCategory in _PHASE_TABLES[phase]:
+        _drop_orphans(db, job_id)
+        _update_counts(db, job_id)
+
+
+def _has_phase2(db: Session, job_id: str) -> bool:
+    return db.query(
+        exists().where(
+            PhaseData.job_id == job_id,
+            PhaseData.phase == 2,
+            PhaseData.json.isnot(None),
+        )
+    ).scalar()
+
+
+def _drop_orphans(db: Session, job_id: str) -> None:
+    # Options and addons whose category is gone, e.g. after a re-run found
+    # fewer categories on a page
+    for table in (MenuOption, MenuAddon):
+        db.execute(
+            delete(table).where(
+                table.job_id == job_id,
+                ~exists().where(
+                    MenuCategory.job_id == table.job_id,
+                    MenuCategory.page_number == table.page_number,
+                    MenuCategory.category_index == table.category_index,
+                ),
+            )
+        )
+
+
+def _update_counts(db: Session, job_id: str) -> None:
+    # Keep the job's summary counters in step with its menu rows, in one
+    # UPDATE that doesn't load the job
+    def _count(table):
+        return (
+            select(func.count())
+            .select_from(table)
+            .where(table.job_id == job_id)
+            .scalar_subquery()
+        )
+
+    db.query(Restaurant).filter(Restaurant.job_id == job_id).update(
+        {
+            Restaurant.category_count: _count(MenuCategory),
+            Restaurant.item_count: _count(MenuItem),
+        },
+        synchronize_session=False,
+    )
+
+
+def delete_menu(db: Session, job_id: str) -> None:
+    # Remove every menu row of a job, e.g. before deleting the job
+    for table in reversed(_ALL_TABLES):
+        db.execute(delete(table).where(table.job_id == job_id))
@@ -0,0 +1,284 @@
+# backend/services/phase_store.py
+# Records phase progress and results on the job's database rows and files
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.core.extraction.partial import describe_failures, failures
+from backend.database import ExtractionHistory, PhaseData, Restaurant
+from backend.services import menu_store
+from backend.services.storage import StorageService
+
+# PhaseData / ExtractionHistory statuses of a background run
+QUEUED = "queued"
+RUNNING = "running"
+SUCCESS = "success"
+PARTIAL = "partial"  # saved, but some categories failed
+FAILED = "failed"
+
+# Phase number recorded for an end-to-end pipeline run
+PIPELINE = 0
+
+# Restaurant.status for each run status, e.g. "phase2_running"
+_JOB_STATUS = {
+    QUEUED: "queued",
+    RUNNING: "running",
+    SUCCESS: "complete",
+    PARTIAL: "partial",
+    FAILED: "failed",
+}
+
+
+def job_status(phase: int, status: str) -> str:
+    # Restaurant.status for a phase run status
+    stage = "pipeline" if phase == PIPELINE else f"phase{phase}"
+    return f"{stage}_{_JOB_STATUS[status]}"
+
+
+def _upsert_phase_data(
+    db: Session, job_id: str, phase: int, status: str, result: Optional[Dict[str, Any]] = None
+) -> None:
+    # One PhaseData row per job and phase; keeps the last result until replaced
+    phase_data = db.query(PhaseData).filter(
+        PhaseData.job_id == job_id,
+        PhaseData.phase == phase
+    ).first()
+
+    if phase_data:
+        phase_data.status = status
+        phase_data.datetime = datetime.utcnow()
+        if result is not None:
+            phase_data.json = result
+    else:
+        db.add(
+            PhaseData(
+                job_id=job_id,
+                phase=phase,
+                json=result,
+                status=status,
+            )
+        )
+
+
+def phase_output_path(storage: StorageService, job_id: str, phase: int) -> Path:
+    # File holding the output of phase 2, 3 or 4
+    return {
+        2: storage.phase2_path,
+        3: storage.phase3_path,
+        4: storage.phase4_path,
+    }[phase](job_id)
+
+
+def mark_phase(db: Session, job_id: str, phase: int, status: str) -> None:
+    # Record that a phase run was queued or started
+    restaurant = db.query(Restaurant).filter(
+        Restaurant.job_id == job_id
+    ).first()
+    if not restaurant:
+        raise ValueError(f"Job {job_id} not found")
+
+    restaurant.status = job_status(phase, status)
+    _upsert_phase_data(db, job_id, phase, status)
+    db.commit()
+
+
+def save_phase_result(
+    db: Session,
+    storage: StorageService,
+    job_id: str,
+    phase: int,
+    result: Dict[str, Any],
+) -> str:
+    """
+    Save a finished phase to its files, Restaurant, PhaseData and history.
+
+    Returns:
+        SUCCESS, or PARTIAL if some categories failed; those are listed in
+        the history entry's error_message
+    """
+    if phase == 1:
+        storage.save_json(storage.phase1_raw_path(job_id), result)
+        # Also save as reviewed (user can edit later)
+        storage.save_json(storage.phase1_reviewed_path(job_id), result)
+    else:
+        storage.save_json(phase_output_path(storage, job_id, phase), result)
+
+    restaurant = db.query(Restaurant).filter(
+        Restaurant.job_id == job_id
+    ).first()
+    if not restaurant:
+        raise ValueError(f"Job {job_id} not found")
+
+    failed = failures(result) if phase > 1 else []
+    status = PARTIAL if failed else SUCCESS
+
+    restaurant.phase = phase
+    restaurant.json = result
+    restaurant.status = job_status(phase, status)
+
+    _upsert_phase_data(db, job_id, phase, status, result)
+    menu_store.save_phase(db, job_id, phase, result)
+
+    # Always log extraction attempt
+    db.add(
+        ExtractionHistory(
+            job_id=job_id,
+            phase=phase,
+            action="extract",
+            status=status,
+            error_message=describe_failures(failed) or None,
+        )
+    )
+    db.commit()
+    return status
+
+
+def save_category_result(
+    db: Session,
+    storage: StorageService,
+    job_id: str,
+    phase: int,
+    result: Dict[str, Any],
+    category: Optional[Tuple[int, int]] = None,
+) -> None:
+    # Save a phase 2-4 result in which one category, given as (page_number,
+    # index), was re-extracted; unlike a full run, Restaurant.json is only
+    # replaced if it still holds this phase
+    storage.save_json(phase_output_path(storage, job_id, phase), result)
+
+    restaurant = db.query(Restaurant).filter(
+        Restaurant.job_id == job_id
+    ).first()
+    if not restaurant:
+        raise ValueError(f"Job {job_id} not found")
+
+    # Still partial while other categories of the phase have failed
+    failed = failures(result)
+    status = PARTIAL if failed else SUCCESS
+
+    if restaurant.phase == phase:
+        restaurant.json = result
+        restaurant.status = job_status(phase, status)
+    restaurant.updated_at = datetime.utcnow()
+
+    _upsert_phase_data(db, job_id, phase, status, result)
+    menu_store.save_phase(db, job_id, phase, result, only=category)
+    db.add(
+        ExtractionHistory(
+            job_id=job_id,
+            phase=phase,
+            action="reextract",
+            status=status,
+            error_message=describe_failures(failed) or None,
+        )
+    )
+    db.commit()
+
+
+def edit_item(
+    db: Session,
+    storage: StorageService,
+    job_id: str,
+    page_number: int,
+    category_index: int,
+    item_index: int,
+    changes: Dict[str, Any],
+) -> None:
+    """
+    Change fields of one phase 2 item in the phase document and its rows.
+
+    The edit is written to the phase 2 file, PhaseData and Restaurant.json
+    (if it still holds phase 2) like a manual edit of the whole document, so
+    phases 3-4, exports and later saves see it. Only the item's category is
+    rewritten in the menu tables.
+
+    Args:
+        changes: Item fields to set; base_price is an amount or None
+
+    Raises:
+        FileNotFoundError: If phase 2 has no result
+        menu_store.ItemNotFound: If there is no item at that position
+    """
+    # Hold the job's row lock while the document is read and rewritten, so
+    # concurrent edits don't overwrite each other
+    now = datetime.utcnow()
+    if not db.query(Restaurant).filter(Restaurant.job_id == job_id).update(
+        {Restaurant.updated_at: now}, synchronize_session=False
+    ):
+        raise ValueError(f"Job {job_id} not found")
+
+    path = storage.phase2_path(job_id)
+    result = storage.load_json(path)
+    item = menu_store.find_item(result, page_number, category_index, item_index)
+    for field, value in changes.items():
+        if field == "base_price" and value is not None:
+            value = {**(item.get("base_price") or {}), "amount": value}
+        item[field] = value
+    storage.save_json(path, result)
+
+    db.query(Restaurant).filter(
+        Restaurant.job_id == job_id, Restaurant.phase == 2
+    ).update({Restaurant.json: result}, synchronize_session=False)
+
+    phase_data = db.query(PhaseData).filter(
+        PhaseData.job_id == job_id, PhaseData.phase == 2
+    ).first()
+    if phase_data:
+        phase_data.json = result
+        phase_data.datetime = now
+
+    menu_store.save_phase(db, job_id, 2, result, only=(page_number, category_index))
+    db.add(
+        ExtractionHistory(
+            job_id=job_id,
+            phase=2,
+            action="manual_edit",
+            status=SUCCESS,
+        )
+    )
+    db.commit()
+
+
+def save_pipeline_result(
+    db: Session,
+    storage: StorageService,
+    job_id: str,
+    results: Dict[int, Dict[str, Any]],
+) -> str:
+    # Save every phase of a pipeline run, as if each had been run on its own
+    for phase in sorted(results):
+        save_phase_result(db, storage, job_id, phase, results[phase])
+
+    _upsert_phase_data(db, job_id, PIPELINE, SUCCESS)
+    db.commit()
+    return SUCCESS
+
+
+def fail_phase(
+    db: Session, job_id: str, phase: int, error: str, will_retry: bool = False
+) -> None:
+    # Record a failed phase run and why it failed; a run that will be retried
+    # goes back to queued
+    db.rollback()
+    restaurant = db.query(Restaurant).filter(
+        Restaurant.job_id == job_id
+    ).first()
+    if not restaurant:
+        return
+
+    status = QUEUED if will_retry else FAILED
+    restaurant.status = job_status(phase, status)
+    _upsert_phase_data(db, job_id, phase, status)
+    db.add(
+        ExtractionHistory(
+            job_id=job_id,
+            phase=phase,
+            action="extract",
+            status="retry" if will_retry else FAILED,
+            error_message=error,
+        )
+    )
+    db.commit()
@@ -0,0 +1,167 @@
+"""
+Live progress of background phase runs.
+Each run publishes its events (status changes, per-page/per-category
+results and counters) to a channel that SSE clients subscribe to. Code deep
+in a run reports through the channel bound to the current context.
+"""
+
+import asyncio
+import itertools
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Events are kept this long after a run ends so late subscribers can replay them
+RETENTION_SECONDS = 300
+
+
+class ProgressChannel:
+    """Ordered events of one phase run, replayed to every subscriber"""
+
+    def __init__(self, job_id: str, phase: int):
+        self.job_id = job_id
+        self.phase = phase
+        self.events: List[Dict[str, Any]] = []
+        self.completed = 0
+        self.total = 0
+        self.closed = False
+        self._seq = itertools.count(1)
+        self._subscribers: List[asyncio.Queue] = []
+
+    def publish(self, event: str, **data: Any) -> None:
+        if self.closed:
+            return
+        message = {"id": next(self._seq), "event": event, "data": data}
+        self.events.append(message)
+        for queue in self._subscribers:
+            queue.put_nowait(message)
+
+    def close(self, event: str, **data: Any) -> None:
+        """Publish the final event of the run."""
+        self.publish(event, **data)
+        self.closed = True
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    async def subscribe(
+        self, after: int = 0, keepalive: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events with an id above after, then new ones as they come.
+
+        Yields None every keepalive seconds without events, so callers can
+        keep idle connections open.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in self.events:
+            if message["id"] > after:
+                queue.put_nowait(message)
+        if self.closed:
+            queue.put_nowait(None)
+        else:
+            self._subscribers.append(queue)
+
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+
+_channels: Dict[Tuple[str, int], ProgressChannel] = {}
+_current: ContextVar[Optional[ProgressChannel]] = ContextVar(
+    "progress_channel", default=None
+)
+
+
+def open_channel(job_id: str, phase: int) -> ProgressChannel:
+    """Start a fresh channel for a phase run, replacing any previous one."""
+    channel = ProgressChannel(job_id, phase)
+    _channels[(job_id, phase)] = channel
+    return channel
+
+
+def close_channel(channel: ProgressChannel, event: str, **data: Any) -> None:
+    """End a run's channel and forget it once the retention period passes."""
+    channel.close(event, **data)
+
+    def _drop() -> None:
+        if _channels.get((channel.job_id, channel.phase)) is channel:
+            del _channels[(channel.job_id, channel.phase)]
+
+    asyncio.get_running_loop().call_later(RETENTION_SECONDS, _drop)
+
+
+def get_channel(job_id: str, phase: int) -> Optional[ProgressChannel]:
+    return _channels.get((job_id, phase))
+
+
+def set_progress_channel(channel: Optional[ProgressChannel]) -> None:
+    """Bind the channel that progress from this context is reported to."""
+    _current.set(channel)
+
+
+def report_total(total: int) -> None:
+    """Announce how many results the current run will produce."""
+    channel = _current.get()
+    if channel is None:
+        return
+    channel.total = total
+    channel.publish("progress", completed=channel.completed, total=total)
+
+
+def report_result(page_number: int, index: int, result: Any) -> None:
+    """Publish one finished page or category result of the current run."""
+    channel = _current.get()
+    if channel is None:
+        return
+    channel.completed += 1
+    channel.publish(
+        "result",
+        page_number=page_number,
+        index=index,
+        result=result,
+        completed=channel.completed,
+        total=channel.total,
+    )
+
+
+def report_failure(page_number: int, index: int, error: Exception) -> None:
+    """Publish a result of the current run that failed without aborting it."""
+    channel = _current.get()
+    if channel is None:
+        return
+    channel.completed += 1
+    channel.publish(
+        "failure",
+        page_number=page_number,
+        index=index,
+        error=str(error),
+        completed=channel.completed,
+        total=channel.total,
+    )
+
+
+def report_partial(label: Optional[str], path: List[Any], item: Any) -> None:
+    """Publish an element of a response that is still streaming."""
+    channel = _current.get()
+    if channel is None:
+        return
+    channel.publish("partial", label=label, path=path, item=item)
+
+
+def report_units(reused: int, resumed: int, recomputed: int) -> None:
+    """Announce how many units of the current run keep an earlier result."""
+    channel = _current.get()
+    if channel is None:
+        return
+    channel.publish(
+        "units", reused=reused, resumed=resumed, recomputed=recomputed
+    )
@@ -0,0 +1,177 @@
+"""Content-addressed cache of validated LLM responses (SQLite backed)."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(
+    model: str, messages: List[Dict[str, Any]], response_format: Optional[Dict[str, Any]]
+) -> str:
+    """
+    Key a request by model, rendered prompt hash, image hash and schema.
+
+    Text parts and image parts are hashed separately, so the same prompt on
+    a different page (or the same page with a different prompt) never collides.
+    """
+    prompt_hash = hashlib.sha256()
+    image_hash = hashlib.sha256()
+
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            prompt_hash.update(content.encode("utf-8"))
+            continue
+        for part in content or []:
+            if part.get("type") == "image_url":
+                image_hash.update(part["image_url"]["url"].encode("utf-8"))
+            else:
+                prompt_hash.update(part.get("text", "").encode("utf-8"))
+
+    schema_hash = _sha256(json.dumps(response_format or {}, sort_keys=True))
+    return _sha256(
+        ":".join(
+            [model, prompt_hash.hexdigest(), image_hash.hexdigest(), schema_hash]
+        )
+    )
+
+
+class ResponseCache:
+    """LLM responses stored in SQLite with TTL and LRU size limits"""
+
+    def __init__(self, db_path: Path, ttl_seconds: int, max_bytes: int):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # Per-phase hit/miss counters
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                phase TEXT,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _count(self, phase: Optional[str], field: str) -> None:
+        counters = self._stats.setdefault(phase or "other", {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, key: str, phase: Optional[str] = None) -> Optional[str]:
+        """Return cached content, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self._count(phase, "misses")
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._count(phase, "hits")
+            return row[0]
+
+    def put(self, key: str, model: str, phase: Optional[str], content: str) -> None:
+        """Store a validated response and evict expired/least recently used rows."""
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, phase, content, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, phase, content, size, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates per phase."""
+        with self._lock:
+            phases = {}
+            for phase, counters in self._stats.items():
+                lookups = counters["hits"] + counters["misses"]
+                phases[phase] = {
+                    **counters,
+                    "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+                }
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": entries, "size_bytes": size, "phases": phases}
+
+
+# Singleton
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the shared response cache, or None when caching is disabled."""
+    global _response_cache
+    if _response_cache is None:
+        from backend.config import get_settings
+
+        settings = get_settings()
+        if not settings.LLM_CACHE_ENABLED:
+            return None
+        _response_cache = ResponseCache(
+            db_path=settings.LLM_CACHE_PATH,
+            ttl_seconds=settings.LLM_CACHE_TTL_HOURS * 3600,
+            max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _response_cache
@@ -0,0 +1,138 @@
+"""Retry policy for LLM calls: error classification, backoff with jitter and budgets."""
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+from pydantic import ValidationError
+
+from backend.services.concurrency import parse_retry_after
+
+T = TypeVar("T")
+
+
+class ErrorClass(str, Enum):
+    RATE_LIMIT = "rate_limit"
+    TIMEOUT = "timeout"
+    SERVER_ERROR = "server_error"
+    SCHEMA = "schema"  # invalid JSON or failed validation
+    NON_RETRYABLE = "non_retryable"
+
+
+def _root_cause(exc: BaseException) -> BaseException:
+    # LLMClientError wraps the SDK error as its cause
+    while exc.__cause__ is not None and not isinstance(
+        exc, (APIStatusError, APITimeoutError, APIConnectionError)
+    ):
+        exc = exc.__cause__
+    return exc
+
+
+def classify(exc: BaseException) -> ErrorClass:
+    """Map an exception from an LLM call to an error class."""
+    if isinstance(exc, (ValueError, ValidationError, json.JSONDecodeError)):
+        return ErrorClass.SCHEMA
+
+    cause = _root_cause(exc)
+    if isinstance(cause, APITimeoutError) or isinstance(cause, asyncio.TimeoutError):
+        return ErrorClass.TIMEOUT
+    if isinstance(cause, APIConnectionError):
+        return ErrorClass.SERVER_ERROR
+    if isinstance(cause, APIStatusError):
+        if cause.status_code == 429:
+            return ErrorClass.RATE_LIMIT
+        if cause.status_code == 408:
+            return ErrorClass.TIMEOUT
+        if cause.status_code >= 500:
+            return ErrorClass.SERVER_ERROR
+        return ErrorClass.NON_RETRYABLE
+    if isinstance(cause, (ValueError, ValidationError)):
+        return ErrorClass.SCHEMA
+    return ErrorClass.NON_RETRYABLE
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Retry-After of a throttled response, if the provider sent one."""
+    cause = _root_cause(exc)
+    if isinstance(cause, APIStatusError):
+        return parse_retry_after(cause.response.headers.get("retry-after"))
+    return None
+
+
+def _default_budgets() -> Dict[ErrorClass, int]:
+    return {
+        ErrorClass.RATE_LIMIT: 5,
+        ErrorClass.TIMEOUT: 2,
+        ErrorClass.SERVER_ERROR: 3,
+        ErrorClass.SCHEMA: 2,
+        ErrorClass.NON_RETRYABLE: 0,
+    }
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter and a retry budget per error class"""
+
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    budgets: Dict[ErrorClass, int] = field(default_factory=_default_budgets)
+
+    # Throttling needs longer pauses; a malformed response can retry at once
+    delay_scale: Dict[ErrorClass, float] = field(
+        default_factory=lambda: {
+            ErrorClass.RATE_LIMIT: 4.0,
+            ErrorClass.SCHEMA: 0.2,
+        }
+    )
+
+    def with_budget(self, error_class: ErrorClass, retries: int) -> "RetryPolicy":
+        """Copy of this policy with a different budget for one error class."""
+        return replace(self, budgets={**self.budgets, error_class: retries})
+
+    def delay(
+        self, error_class: ErrorClass, retry: int, retry_after: Optional[float] = None
+    ) -> float:
+        """Seconds to wait before the given retry (1-indexed) of a class."""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        scale = self.delay_scale.get(error_class, 1.0)
+        cap = min(self.max_delay, self.base_delay * scale * 2 ** (retry - 1))
+        return random.uniform(0, cap)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        label: str = "LLM",
+    ) -> Tuple[T, int]:
+        """
+        Run call until it succeeds or its error class is out of retries.
+
+        Returns:
+            (result, number of attempts made)
+        """
+        retries: Dict[ErrorClass, int] = {}
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                return await call(), attempt
+            except Exception as e:
+                error_class = classify(e)
+                used = retries.get(error_class, 0) + 1
+                if used > self.budgets.get(error_class, 0):
+                    print(f"{label} - Attempt {attempt} failed ({error_class.value}), giving up: {e}")
+                    raise
+                retries[error_class] = used
+
+                wait = self.delay(error_class, used, retry_after_seconds(e))
+                print(
+                    f"{label} - Attempt {attempt} failed ({error_class.value}): {e}. "
+                    f"Retrying in {wait:.1f}s"
+                )
+                await asyncio.sleep(wait)
@@ -1,20 +1,113 @@
 # backend/services/storage.py
 # Handles file uploads and JSON storage
 
+import asyncio
+import hashlib
 import json
+import os
+import shutil
+import tempfile
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import UploadFile
 
+try:
+    import orjson  # optional, much faster on large phase documents
+except ImportError:
+    orjson = None
+
+
+def dump_json(data: Any, indent: bool = False) -> bytes:
+    # Serialize with orjson when installed, else the stdlib
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS  # like the stdlib, e.g. int keys
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if indent:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def parse_json(content: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    # Write to a temp file next to the target, then rename it over the target,
+    # so readers and crashes never see a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+PDF_HEADER = b"%PDF-"
+
+
+class UploadRejected(ValueError):
+    """Uploaded file failed validation while being stored"""
+
+
+@dataclass
+class StoredPdf:
+    """A PDF saved for a job"""
+
+    path: Path
+    sha256: str
+    size: int
+    page_count: int
+
+
+def count_pdf_pages(path: Path) -> int:
+    # Opening a PDF only reads its cross-reference table, not every page
+    import fitz  # PyMuPDF
+
+    try:
+        with fitz.open(path, filetype="pdf") as doc:
+            return len(doc)
+    except Exception:
+        raise UploadRejected("Not a valid PDF")
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
 
 class StorageService:
     # Saves PDFs and JSON files
 
-    def __init__(self, uploads_dir: Path, outputs_dir: Path):
+    def __init__(
+        self,
+        uploads_dir: Path,
+        outputs_dir: Path,
+        pretty_json: bool = False,
+        max_upload_bytes: Optional[int] = None,
+        max_pdf_pages: Optional[int] = None,
+    ):
         self.uploads_dir = uploads_dir
         self.outputs_dir = outputs_dir
+        self.pretty_json = pretty_json  # indented files for debugging
+        self.max_upload_bytes = max_upload_bytes
+        self.max_pdf_pages = max_pdf_pages
 
         # Ensure directories exist
         self.uploads_dir.mkdir(parents=True, exist_ok=True)
@@ -34,30 +127,119 @@ class StorageService:
         # Where the PDF is saved
         return self.uploads_dir / f"{job_id}.pdf"
 
-    async def save_pdf(self, job_id: str, pdf: UploadFile) -> Path:
-        # Save uploaded PDF file
+    async def save_pdf(self, job_id: str, pdf: UploadFile) -> StoredPdf:
+        """
+        Copy an uploaded PDF to disk in chunks.
+
+        The request body was already spooled to a temp file by the multipart
+        parser (UploadSizeLimitMiddleware caps its size while it arrives).
+        The copy checks the file's own size limit and computes the SHA-256
+        chunk by chunk, so the upload is never held in memory, and the file
+        only appears under its final name once it passed every check.
+
+        Raises:
+            UploadRejected: Not a PDF, too large or without pages
+        """
         dest = self.pdf_path(job_id)
-        content = await pdf.read()
-        dest.write_bytes(content)
-        return dest
+        tmp = dest.with_name(f".{dest.name}.part")
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
 
-    def save_json(self, path: Path, data: Any) -> None:
-        # Save data as JSON file
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8"
+        def _write(f, chunk: bytes) -> None:
+            digest.update(chunk)
+            f.write(chunk)
+
+        try:
+            with tmp.open("wb") as f:
+                while chunk := await pdf.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    self._check_size(size)
+                    # Reject anything else on its first bytes
+                    head += chunk[: len(PDF_HEADER) - len(head)]
+                    if not PDF_HEADER.startswith(head):
+                        raise UploadRejected("Not a PDF")
+                    await asyncio.to_thread(_write, f, chunk)
+            if head != PDF_HEADER:
+                raise UploadRejected("Not a PDF")
+            page_count = await asyncio.to_thread(self._check_pages, tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        return self._stored(dest, digest.hexdigest(), size, page_count)
+
+    def save_pdf_bytes(self, job_id: str, content: bytes) -> StoredPdf:
+        """
+        Save PDF content that was already read (e.g. from a zip archive).
+
+        Raises:
+            UploadRejected: Not a PDF, too large or without pages
+        """
+        self._check_size(len(content))
+        if not content.startswith(PDF_HEADER):
+            raise UploadRejected("Not a PDF")
+
+        dest = self.pdf_path(job_id)
+        write_atomic(dest, content)
+        try:
+            page_count = self._check_pages(dest)
+        except UploadRejected:
+            dest.unlink(missing_ok=True)
+            raise
+        return self._stored(
+            dest, hashlib.sha256(content).hexdigest(), len(content), page_count
         )
 
+    def _check_size(self, size: int) -> None:
+        if self.max_upload_bytes and size > self.max_upload_bytes:
+            limit_mb = self.max_upload_bytes // (1024 * 1024)
+            raise UploadRejected(f"File too large. Max size: {limit_mb}MB")
+
+    def _check_pages(self, path: Path) -> int:
+        page_count = count_pdf_pages(path)
+        if page_count == 0:
+            raise UploadRejected("PDF has no pages")
+        if self.max_pdf_pages and page_count > self.max_pdf_pages:
+            raise UploadRejected(
+                f"PDF has {page_count} pages. Max pages: {self.max_pdf_pages}"
+            )
+        return page_count
+
+    def _stored(self, path: Path, sha256: str, size: int, page_count: int) -> StoredPdf:
+        from backend.core.processors.page_cache import remember_sha256
+
+        # Spares the page cache from hashing the file again
+        remember_sha256(path, sha256)
+        return StoredPdf(path=path, sha256=sha256, size=size, page_count=page_count)
+
+    def save_json(self, path: Path, data: Any) -> None:
+        # Save data as JSON file, atomically
+        write_atomic(path, dump_json(data, indent=self.pretty_json))
+
     def load_json(self, path: Path) -> Dict[str, Any]:
         """Load JSON data from file."""
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
-        return json.loads(path.read_text(encoding="utf-8"))
+        return parse_json(path.read_bytes())
+
+    async def save_json_async(self, path: Path, data: Any) -> None:
+        """save_json in a worker thread, keeping the event loop free."""
+        await asyncio.to_thread(self.save_json, path, data)
+
+    async def load_json_async(self, path: Path) -> Dict[str, Any]:
+        """load_json in a worker thread, keeping the event loop free."""
+        return await asyncio.to_thread(self.load_json, path)
 
     def exists(self, path: Path) -> bool:
         """Check if file exists."""
         return path.exists()
 
+    def page_cache_dir(self, job_id: str) -> Path:
+        # Rendered page images for this job
+        return self.job_dir(job_id) / "pages"
+
     # Phase-specific paths
     def phase1_raw_path(self, job_id: str) -> Path:
         return self.job_dir(job_id) / "phase1_categories_raw.json"
@@ -74,6 +256,22 @@ class StorageService:
     def phase4_path(self, job_id: str) -> Path:
         return self.job_dir(job_id) / "phase4_final.json"
 
+    def checkpoint_path(self, job_id: str, phase: int) -> Path:
+        # Units finished by an unsaved run of the phase
+        return self.job_dir(job_id) / f"phase{phase}_checkpoint.jsonl"
+
+    def copy_job_outputs(self, source_job_id: str, job_id: str) -> None:
+        # Copy another job's results and rendered pages, hard-linking where
+        # possible; files are only ever replaced, never modified in place.
+        # Checkpoints of unfinished runs and temp files are left behind.
+        shutil.copytree(
+            self.job_dir(source_job_id),
+            self.job_dir(job_id),
+            ignore=shutil.ignore_patterns("*_checkpoint.jsonl", ".*", "*.tmp"),
+            copy_function=_link_or_copy,
+            dirs_exist_ok=True,
+        )
+
 
 # Singleton
 _storage: StorageService = None
@@ -87,6 +285,10 @@ def get_storage_service() -> StorageService:
 
         settings = get_settings()
         _storage = StorageService(
-            uploads_dir=settings.UPLOADS_DIR, outputs_dir=settings.OUTPUTS_DIR
+            uploads_dir=settings.UPLOADS_DIR,
+            outputs_dir=settings.OUTPUTS_DIR,
+            pretty_json=settings.STORAGE_PRETTY_JSON,
+            max_upload_bytes=settings.MAX_FILE_SIZE_MB * 1024 * 1024,
+            max_pdf_pages=settings.MAX_PDF_PAGES,
         )
     return _storage
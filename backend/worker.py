@@ -0,0 +1,72 @@
+# backend/worker.py
+"""
+Standalone job worker.
+
+Claims queued phase runs from the shared database and executes them, so
+extraction can scale out over several machines:
+
+    python -m backend.worker --workers 4
+
+Every worker process needs the same DATABASE_URL and storage directory as
+the API. Set JOB_RUN_IN_API=False to leave all runs to standalone workers.
+Live progress (SSE) is only available for runs executed by the API process
+itself; status polling works for all of them.
+"""
+
+import argparse
+import asyncio
+import signal
+
+from backend.config import get_settings
+from backend.core.processors.rasterizer import get_raster_engine
+from backend.database import init_db
+from backend.services.job_runner import JobRunner
+from backend.services.llm_client import close_llm_client
+from backend.services.storage import get_storage_service
+
+
+async def run_worker(workers: int) -> None:
+    """Drain the job queue until SIGINT/SIGTERM, then hand back unfinished runs."""
+    settings = get_settings()
+    get_storage_service()
+    init_db()
+
+    runner = JobRunner(
+        workers=workers,
+        poll_interval=settings.JOB_POLL_INTERVAL_S,
+        lease_seconds=settings.JOB_LEASE_S,
+        heartbeat_interval=settings.JOB_HEARTBEAT_S,
+        retry_delay=settings.JOB_RETRY_DELAY_S,
+        max_starts_per_minute=settings.JOB_MAX_STARTS_PER_MINUTE,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    runner.start()
+    print(f"Worker {runner.worker_id} started with {workers} slots")
+    try:
+        await stop.wait()
+    finally:
+        print(f"Worker {runner.worker_id} stopping")
+        await runner.stop()
+        get_raster_engine().shutdown()
+        await close_llm_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run extraction jobs from the queue")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=get_settings().JOB_WORKERS,
+        help="Phase runs executed at once by this process",
+    )
+    args = parser.parse_args()
+    asyncio.run(run_worker(args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+// Extraction runs in the background: the /extract endpoints answer 202 with
+// the job_id, and the result is fetched once the job status says it's done.
+
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// Live page/category results of a running phase (server-sent events).
+// onProgress gets { completed, total } and, for results, the result itself.
+function watchPhase(jobId, phase, onProgress) {
+  const apiBase = (window.APP_CONFIG?.API_BASE || "").replace(/\/$/, "");
+  const source = new EventSource(
+    `${apiBase}/api/jobs/${encodeURIComponent(jobId)}/phases/${phase}/events`
+  );
+  const handle = (event) => onProgress(JSON.parse(event.data));
+  source.addEventListener("progress", handle);
+  source.addEventListener("result", handle);
+  source.addEventListener("status", (event) => {
+    const { status } = JSON.parse(event.data);
+    if (["success", "partial", "failed"].includes(status)) source.close();
+  });
+  return source;
+}
+
+async function waitForPhase(
+  jobId,
+  phase,
+  { intervalMs = JOB_POLL_INTERVAL_MS, onProgress = null } = {}
+) {
+  const apiBase = (window.APP_CONFIG?.API_BASE || "").replace(/\/$/, "");
+  const id = encodeURIComponent(jobId);
+  const source = onProgress && window.EventSource ? watchPhase(jobId, phase, onProgress) : null;
+
+  try {
+    await pollPhase(apiBase, id, phase, intervalMs);
+  } finally {
+    source?.close();
+  }
+
+  const response = await fetch(`${apiBase}/api/phase${phase}/${id}`);
+  if (!response.ok) throw new Error(`Could not load phase ${phase} result`);
+  return response.json(); // { job_id, data }
+}
+
+async function pollPhase(apiBase, id, phase, intervalMs) {
+  while (true) {
+    const response = await fetch(`${apiBase}/api/jobs/${id}/status`);
+    if (!response.ok) throw new Error(`Status check failed (${response.status})`);
+
+    const job = await response.json();
+    const phaseStatus = job.phases?.[phase];
+    if (phaseStatus?.status === "success") return;
+    if (phaseStatus?.status === "partial") {
+      // Saved; the failed categories carry an "error" and can be re-extracted
+      console.warn(`Phase ${phase} partially failed: ${phaseStatus.error}`);
+      return;
+    }
+    if (phaseStatus?.status === "failed") {
+      throw new Error(phaseStatus.error || `Phase ${phase} failed`);
+    }
+
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
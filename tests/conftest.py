@@ -0,0 +1,38 @@
+# tests/conftest.py
+# Point the app at a throwaway SQLite database before backend.config loads
+
+import os
+import tempfile
+from pathlib import Path
+
+_tmp = Path(tempfile.mkdtemp(prefix="menuextraction-tests-"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp / 'test.db'}")
+os.environ.setdefault("UPLOADS_DIR", str(_tmp / "uploads"))
+os.environ.setdefault("OUTPUTS_DIR", str(_tmp / "outputs"))
+os.environ.setdefault("JOB_RUN_IN_API", "false")
+
+import pytest
+
+from backend.database import Restaurant, init_db
+from backend.database.db import SessionLocal, engine
+from backend.database.models import Base
+
+
+@pytest.fixture
+def db():
+    # Fresh tables for every test
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def job(db):
+    restaurant = Restaurant(job_id="job1", name="Test Diner", phase=0, status="created")
+    db.add(restaurant)
+    db.commit()
+    return restaurant
@@ -0,0 +1,36 @@
+# tests/test_checkpoint.py
+# Background writes of the per-run checkpoint log
+
+import asyncio
+
+from backend.services.checkpoint import CheckpointLog
+
+
+def test_appends_on_the_loop_are_written_in_order(tmp_path):
+    log = CheckpointLog(tmp_path / "phase2_checkpoint.jsonl")
+
+    async def run():
+        for n in range(50):
+            log.append(1, f"key{n}", {"n": n})
+        await log.flush()
+
+    asyncio.run(run())
+    done = log.load()
+    assert [done[(1, f"key{n}")]["n"] for n in range(50)] == list(range(50))
+
+
+def test_clear_waits_for_pending_writes(tmp_path):
+    log = CheckpointLog(tmp_path / "phase2_checkpoint.jsonl")
+
+    async def run():
+        log.append(1, "key", {})
+        await log.clear()
+
+    asyncio.run(run())
+    assert not log.path.exists()
+
+
+def test_append_without_a_loop_writes_immediately(tmp_path):
+    log = CheckpointLog(tmp_path / "phase1_checkpoint.jsonl")
+    log.append(2, "key", {"page_number": 2})
+    assert log.load() == {(2, "key"): {"page_number": 2}}
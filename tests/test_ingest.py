@@ -0,0 +1,48 @@
+# tests/test_ingest.py
+# Bulk ingestion keeps the jobs it created when a later file fails
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.routes import ingest
+from backend.main import app
+
+
+def _pdf() -> bytes:
+    doc = fitz.open()
+    doc.new_page()
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+@pytest.fixture
+def client(db):
+    return TestClient(app)
+
+
+def test_failing_file_is_skipped_and_earlier_jobs_are_kept(client, monkeypatch):
+    queued = []
+
+    def enqueue_phase(db, job_id, phase, **kwargs):
+        if queued:
+            raise RuntimeError("queue unavailable")
+        queued.append(job_id)
+        return "queued"
+
+    monkeypatch.setattr(ingest, "enqueue_phase", enqueue_phase)
+    files = [
+        ("files", ("first.pdf", _pdf(), "application/pdf")),
+        ("files", ("second.pdf", _pdf(), "application/pdf")),
+    ]
+
+    r = client.post("/api/ingest", files=files, data={"reuse_duplicates": "false"})
+
+    assert r.status_code == 202
+    body = r.json()
+    assert [j["job_id"] for j in body["jobs"]] == queued
+    assert body["skipped"] == [
+        {"filename": "second.pdf", "reason": "Ingestion failed: queue unavailable"}
+    ]
@@ -0,0 +1,171 @@
+# tests/test_job_queue.py
+# Claims, leases and takeovers of the durable job queue (SQLite)
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from backend.database import JobQueue
+from backend.database.db import SessionLocal
+from backend.services import job_queue, job_runner, phase_store, progress
+from backend.services.job_queue import CLAIMED, DONE, FAILED, PENDING, LeaseLostError
+
+
+def _enqueue(db, job, max_attempts=2):
+    entry = job_queue.enqueue(db, job.job_id, 1, max_attempts=max_attempts)
+    db.commit()
+    return entry.id
+
+
+def _status(entry_id):
+    session = SessionLocal()
+    try:
+        return session.get(JobQueue, entry_id)
+    finally:
+        session.close()
+
+
+def _claim(worker_id, lease_seconds=60.0):
+    session = SessionLocal()
+    try:
+        entry = job_queue.claim(session, worker_id, lease_seconds)
+        return entry.id if entry else None
+    finally:
+        session.close()
+
+
+def _expire(lease_seconds=0.05):
+    time.sleep(lease_seconds * 2)
+
+
+def test_claim_hides_entry_until_lease_expires(db, job):
+    entry_id = _enqueue(db, job)
+
+    assert _claim("w1", lease_seconds=0.05) == entry_id
+    assert _claim("w2") is None
+
+    _expire()
+    assert _claim("w2") == entry_id
+    entry = _status(entry_id)
+    assert entry.claimed_by == "w2"
+    assert entry.attempts == 2
+
+
+def test_workers_race_for_expired_lease(db, job):
+    entry_id = _enqueue(db, job)
+    assert _claim("w0", lease_seconds=0.05) == entry_id
+    _expire()
+
+    workers = [f"w{i}" for i in range(1, 9)]
+    start = threading.Barrier(len(workers))
+    won = {}
+
+    def race(worker_id):
+        start.wait()
+        won[worker_id] = _claim(worker_id)
+
+    threads = [threading.Thread(target=race, args=(w,)) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    winners = [w for w, claimed in won.items() if claimed == entry_id]
+    assert len(winners) == 1
+    entry = _status(entry_id)
+    assert entry.claimed_by == winners[0]
+    assert entry.attempts == 2
+
+
+def test_previous_owner_cannot_finish_taken_over_entry(db, job):
+    entry_id = _enqueue(db, job)
+    _claim("old", lease_seconds=0.05)
+    _expire()
+    _claim("new")
+
+    assert not job_queue.heartbeat(db, entry_id, "old", 60.0)
+    with pytest.raises(LeaseLostError):
+        job_queue.complete(db, entry_id, "old")
+    with pytest.raises(LeaseLostError):
+        job_queue.fail(db, entry_id, "old", "boom", retry_delay=0)
+
+    # The new owner's claim is untouched
+    entry = _status(entry_id)
+    assert (entry.status, entry.claimed_by, entry.last_error) == (CLAIMED, "new", None)
+
+    job_queue.complete(db, entry_id, "new")
+    assert _status(entry_id).status == DONE
+
+
+def test_fail_retries_until_out_of_attempts(db, job):
+    entry_id = _enqueue(db, job, max_attempts=2)
+
+    _claim("w1")
+    assert job_queue.fail(db, entry_id, "w1", "first", retry_delay=0) is True
+    assert _status(entry_id).status == PENDING
+
+    _claim("w1")
+    assert job_queue.fail(db, entry_id, "w1", "second", retry_delay=0) is False
+    entry = _status(entry_id)
+    assert (entry.status, entry.last_error) == (FAILED, "second")
+
+
+def test_runner_drops_result_when_lease_was_taken_over(db, job, monkeypatch):
+    entry_id = _enqueue(db, job)
+    runner = job_runner.JobRunner(workers=0, lease_seconds=60.0)
+    session = SessionLocal()
+    entry = job_queue.claim(session, runner.worker_id, 60.0)
+    session.close()
+
+    saved = []
+
+    def build_run(*args, **kwargs):
+        async def _run():
+            # Another worker takes the run over while this one is still busy
+            session = SessionLocal()
+            session.query(JobQueue).filter(JobQueue.id == entry_id).update(
+                {"claimed_by": "other"}
+            )
+            session.commit()
+            session.close()
+            return {"pages": []}
+
+        return _run
+
+    monkeypatch.setattr(job_runner, "build_run", build_run)
+    monkeypatch.setattr(
+        phase_store, "save_phase_result", lambda *args: saved.append(args)
+    )
+
+    asyncio.run(runner._execute(entry))
+
+    assert saved == []
+    entry = _status(entry_id)
+    assert (entry.status, entry.claimed_by) == (CLAIMED, "other")
+
+
+def test_enqueue_leaves_channels_to_the_workers(db, job):
+    # JOB_RUN_IN_API is off, so nothing in this process would close it
+    job_runner.enqueue_phase(db, job.job_id, 2)
+
+    assert job_queue.active_entry(db, job.job_id, 2) is not None
+    assert progress.get_channel(job.job_id, 2) is None
+
+
+def test_pacing_waits_before_the_claim(db, job):
+    entry_id = _enqueue(db, job)
+    runner = job_runner.JobRunner(workers=0, lease_seconds=0.1, max_starts_per_minute=600)
+
+    async def _claim():
+        runner._starting = asyncio.Lock()
+        runner._next_start = time.monotonic() + 0.3  # longer than the lease
+        return await runner._claim()
+
+    entry = asyncio.run(_claim())
+
+    assert entry.id == entry_id
+    # The lease starts after the wait, so it hasn't run out yet
+    assert _status(entry_id).available_at > datetime.utcnow()
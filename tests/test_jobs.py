@@ -0,0 +1,51 @@
+# tests/test_jobs.py
+# Deleting jobs with foreign keys enforced, as MySQL and PostgreSQL do
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.database import JobQueue, Restaurant
+from backend.database.db import engine
+from backend.main import app
+from backend.services import job_queue, phase_store
+from backend.services.storage import get_storage_service
+
+
+def _foreign_keys_on(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+@pytest.fixture
+def client(db, job):
+    event.listen(engine, "connect", _foreign_keys_on)
+    engine.dispose()  # reconnect with the pragma
+    try:
+        yield TestClient(app)
+    finally:
+        event.remove(engine, "connect", _foreign_keys_on)
+        engine.dispose()
+
+
+def test_delete_removes_finished_queue_entries(client, db, job):
+    phase_store.save_phase_result(
+        db, get_storage_service(), job.job_id, 1, {"pages": [{"page_number": 1, "categories": []}]}
+    )
+    entry = job_queue.enqueue(db, job.job_id, 1)
+    entry.status = job_queue.DONE
+    db.commit()
+
+    assert client.delete("/api/jobs/job1").status_code == 200
+    db.expire_all()
+    assert db.query(Restaurant).count() == 0
+    assert db.query(JobQueue).count() == 0
+
+
+def test_delete_refuses_job_with_active_run(client, db, job):
+    job_queue.enqueue(db, job.job_id, 1)
+    db.commit()
+
+    assert client.delete("/api/jobs/job1").status_code == 409
+    db.expire_all()
+    assert db.query(Restaurant).count() == 1
+    assert db.query(JobQueue).count() == 1
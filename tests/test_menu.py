@@ -0,0 +1,104 @@
+# tests/test_menu.py
+# Item-level menu endpoints and their write-through to the phase documents
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.database import MenuOption, PhaseData, Restaurant
+from backend.main import app
+from backend.services import phase_store
+from backend.services.storage import get_storage_service
+
+PHASE2 = {
+    "restaurant_name": "Test Diner",
+    "pages": [
+        {
+            "page_number": 1,
+            "categories": [
+                {
+                    "name_raw": "Pizza",
+                    "category_items": [
+                        {"items": [{"name_raw": "Margherita", "base_price": {"amount": 9.0}}]}
+                    ],
+                    "subcategory_items": [
+                        {"name_raw": "White", "items": [{"name_raw": "Bianca"}]}
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+@pytest.fixture
+def client(db, job):
+    phase_store.save_phase_result(db, get_storage_service(), job.job_id, 2, PHASE2)
+    return TestClient(app)
+
+
+def test_items_are_addressed_by_position(client):
+    items = client.get("/api/menu/job1/items").json()
+    assert [(i["item_index"], i["name_raw"], i["subcategory_name_raw"]) for i in items] == [
+        (0, "Margherita", None),
+        (1, "Bianca", "White"),
+    ]
+
+    item = client.get("/api/menu/job1/items/1/0/1").json()
+    assert item["name_raw"] == "Bianca"
+    assert client.get("/api/menu/job1/items/1/0/2").status_code == 404
+
+
+def test_item_edit_reaches_the_phase_document(client, db):
+    r = client.patch(
+        "/api/menu/job1/items/1/0/0", json={"name_raw": "Margherita DOP", "base_price": 11.5}
+    )
+    assert r.status_code == 200
+    assert (r.json()["name_raw"], r.json()["base_price"]) == ("Margherita DOP", 11.5)
+
+    storage = get_storage_service()
+    document = storage.load_json(storage.phase2_path("job1"))
+    item = document["pages"][0]["categories"][0]["category_items"][0]["items"][0]
+    assert item["name_raw"] == "Margherita DOP"
+    assert item["base_price"] == {"amount": 11.5}
+
+    db.expire_all()
+    phase_data = db.query(PhaseData).filter(PhaseData.job_id == "job1", PhaseData.phase == 2).one()
+    assert phase_data.json == document
+    assert db.query(Restaurant).filter(Restaurant.job_id == "job1").one().json == document
+
+    # A later save of the phase keeps the edit, and the same key finds it
+    phase_store.save_phase_result(db, storage, "job1", 2, document)
+    assert client.get("/api/menu/job1/items/1/0/0").json()["name_raw"] == "Margherita DOP"
+
+
+def test_phase1_save_keeps_phase2_rows(client, db):
+    phase1 = {"pages": [{"page_number": 1, "data": {"categories": [{"name_raw": "Pizzas"}]}}]}
+    phase_store.save_phase_result(db, get_storage_service(), "job1", 1, phase1)
+
+    categories = client.get("/api/menu/job1/categories").json()
+    assert [c["name_raw"] for c in categories] == ["Pizza"]
+    assert len(client.get("/api/menu/job1/items").json()) == 2
+    db.expire_all()
+    assert db.query(Restaurant.item_count).filter(Restaurant.job_id == "job1").scalar() == 2
+
+
+def test_options_of_removed_categories_are_deleted(client, db):
+    storage = get_storage_service()
+    phase3 = {
+        "pages": [
+            {"page_number": 1, "categories": [{"name_raw": "Pizza", "base_options": [{"name_raw": "Thin"}]}]}
+        ]
+    }
+    phase_store.save_phase_result(db, storage, "job1", 3, phase3)
+    assert db.query(MenuOption).count() == 1
+
+    phase_store.save_phase_result(
+        db, storage, "job1", 2, {"pages": [{"page_number": 1, "categories": []}]}
+    )
+    assert db.query(MenuOption).count() == 0
+
+
+def test_item_name_cannot_be_cleared(client):
+    r = client.patch("/api/menu/job1/items/1/0/0", json={"name_raw": None})
+    assert r.status_code == 422
+    assert client.get("/api/menu/job1/items/1/0/0").json()["name_raw"] == "Margherita"
@@ -0,0 +1,140 @@
+# tests/test_migrations.py
+# Upgrading a database created before columns were added to existing tables
+
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    inspect,
+)
+from sqlalchemy.orm import Session
+
+from backend.database import MenuItem, PhaseData, Restaurant
+from backend.database.migrations import upgrade
+from backend.database.models import Base
+
+
+def _legacy_engine(tmp_path):
+    # restaurants as the first release created it
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    legacy = MetaData()
+    restaurants = Table(
+        "restaurants",
+        legacy,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("job_id", String(32), unique=True, nullable=False, index=True),
+        Column("name", String(255), nullable=True),
+        Column("phase", Integer, nullable=False),
+        Column("json", JSON, nullable=True),
+        Column("status", String(50), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+        Index("idx_job_status", "job_id", "status"),
+    )
+    legacy.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            restaurants.insert(),
+            [
+                {
+                    "job_id": "old1",
+                    "name": "Old Diner",
+                    "phase": 1,
+                    "json": {"phase1": {"pages": []}},
+                    "status": "phase1_complete",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            ],
+        )
+    return engine
+
+
+def test_upgrade_adds_missing_columns_to_existing_tables(tmp_path):
+    engine = _legacy_engine(tmp_path)
+    Base.metadata.create_all(engine)
+
+    applied = upgrade(engine)
+
+    assert applied[:2] == ["restaurant_pdf_sha256", "restaurant_counters"]
+    columns = {c["name"] for c in inspect(engine).get_columns("restaurants")}
+    assert {"pdf_sha256", "page_count", "category_count", "item_count"} <= columns
+    indexes = {i["name"] for i in inspect(engine).get_indexes("restaurants")}
+    assert {"ix_restaurants_pdf_sha256", "ix_restaurants_created_at"} <= indexes
+
+    with Session(engine) as db:
+        job = db.query(Restaurant).filter(Restaurant.job_id == "old1").one()
+        assert (job.name, job.pdf_sha256) == ("Old Diner", None)
+
+
+def test_upgrade_is_idempotent(tmp_path):
+    engine = _legacy_engine(tmp_path)
+    Base.metadata.create_all(engine)
+    upgrade(engine)
+
+    assert upgrade(engine) == []
+
+
+def test_fresh_database_needs_no_upgrade(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    Base.metadata.create_all(engine)
+
+    assert upgrade(engine) == []
+
+
+PHASE1 = {
+    "pages": [
+        {"page_number": 1, "data": {"categories": [{"name_raw": "Pizza"}]}},
+        {"page_number": 2, "data": {"categories": [{"name_raw": "Drinks"}]}},
+    ]
+}
+PHASE2 = {
+    "pages": [
+        {
+            "page_number": 1,
+            "categories": [
+                {
+                    "name_raw": "Pizza",
+                    "category_items": [{"items": [{"name_raw": "Margherita"}, {"name_raw": "Diavola"}]}],
+                }
+            ],
+        },
+        {
+            "page_number": 2,
+            "categories": [
+                {"name_raw": "Drinks", "category_items": [{"items": [{"name_raw": "Cola"}]}]}
+            ],
+        },
+    ]
+}
+
+
+def test_upgrade_backfills_counters_of_existing_jobs(tmp_path):
+    engine = _legacy_engine(tmp_path)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.query(Restaurant.__table__).filter_by(job_id="old1").update({"phase": 2})
+        db.add_all(
+            [
+                PhaseData(job_id="old1", phase=1, json=PHASE1),
+                PhaseData(job_id="old1", phase=2, json=PHASE2),
+            ]
+        )
+        db.commit()
+
+    assert "backfill_menu" in upgrade(engine)
+
+    with Session(engine) as db:
+        job = db.query(Restaurant).filter(Restaurant.job_id == "old1").one()
+        assert (job.page_count, job.category_count, job.item_count) == (2, 2, 3)
+        assert db.query(MenuItem).filter(MenuItem.job_id == "old1").count() == 3
+    assert upgrade(engine) == []
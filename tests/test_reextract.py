@@ -0,0 +1,47 @@
+# tests/test_reextract.py
+# Locating categories for single-category re-extraction
+
+import asyncio
+
+import pytest
+
+from backend.core.extraction.reextract import (
+    CategoryNotFound,
+    CategoryReextractor,
+    EarlierPhaseFailed,
+    find_category,
+)
+
+PHASE1 = {
+    "pages": [
+        {"page_number": 1, "data": {"categories": [{"name_raw": "Pizza"}, {"name_raw": "Pasta"}]}},
+    ]
+}
+PHASE2 = {"pages": [{"page_number": 1, "categories": [{"name_raw": "Pizza"}]}]}
+
+
+def test_find_category_in_either_layout():
+    assert find_category(PHASE1, 1, "Pasta") == 1
+    assert find_category(PHASE2, 1, "Pizza") == 0
+
+
+@pytest.mark.parametrize("page_number, name", [(2, "Pizza"), (1, "Salads")])
+def test_missing_page_or_category_is_not_found(page_number, name):
+    with pytest.raises(CategoryNotFound):
+        find_category(PHASE1, page_number, name)
+
+
+def test_malformed_document_is_not_reported_as_not_found():
+    with pytest.raises(KeyError) as e:
+        find_category({"restaurant_name": "x"}, 1, "Pizza")
+    assert not isinstance(e.value, CategoryNotFound)
+
+
+def test_category_failed_in_earlier_phase_is_refused():
+    failed = {"pages": [{"page_number": 1, "categories": [{"name_raw": "Pizza", "error": "boom"}]}]}
+    reextractor = CategoryReextractor.__new__(CategoryReextractor)
+
+    with pytest.raises(EarlierPhaseFailed):
+        asyncio.run(
+            reextractor.reextract(3, "Diner", "menu.pdf", 1, "Pizza", {2: failed, 3: PHASE2})
+        )
@@ -0,0 +1,79 @@
+# tests/test_runner.py
+# Progress events and per-category results of the phase runner
+
+import asyncio
+
+from backend.core.extraction.batching import batch_units
+from backend.core.extraction.reuse import ReusePlan
+from backend.core.extraction.runner import PhaseRunner, WorkUnit, single_page
+from backend.services.progress import ProgressChannel, set_progress_channel
+
+
+def _events(channel, event):
+    return [m["data"] for m in channel.events if m["event"] == event]
+
+
+def test_events_name_the_category_not_the_pending_position():
+    plan = ReusePlan()
+    # Categories 0 and 2 are kept, so 1 and 3 are the ones extracted
+    plan.add_page(1, ["a", "b", "c", "d"], fixed={0: {}, 2: {}})
+
+    async def ok(img):
+        return {"name_raw": "B"}
+
+    async def boom(img):
+        raise TimeoutError("slow")
+
+    units = [
+        WorkUnit(page_number=1, index=0, run=ok),
+        WorkUnit(page_number=1, index=1, run=boom),
+    ]
+    channel = ProgressChannel("job1", 2)
+
+    async def run():
+        set_progress_channel(channel)
+        return await PhaseRunner(2).run(
+            single_page(1, "img"),
+            units,
+            return_exceptions=True,
+            report_index=plan.index,
+        )
+
+    results = asyncio.run(run())
+
+    assert results[1][0] == {"name_raw": "B"}
+    assert [e["index"] for e in _events(channel, "result")] == [1]
+    assert [e["index"] for e in _events(channel, "failure")] == [3]
+
+
+def test_batch_failure_only_fails_its_own_categories():
+    entries = [{"name_raw": n} for n in ("A", "B", "C")]
+
+    async def run_many(img, batch):
+        return []  # wrong count: the batch is split
+
+    async def run_one(img, entry):
+        if entry["name_raw"] == "B":
+            raise RuntimeError("refused")
+        return entry
+
+    units = batch_units(1, entries, 3, run_many, run_one, return_exceptions=True)
+    channel = ProgressChannel("job1", 2)
+    recorded = []
+
+    async def run():
+        set_progress_channel(channel)
+        return await PhaseRunner(2).run(
+            single_page(1, "img"),
+            units,
+            on_result=lambda page, index, result: recorded.append(index),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())[1]
+
+    assert results[0] == entries[0] and results[2] == entries[2]
+    assert isinstance(results[1], RuntimeError)
+    assert recorded == [0, 2]
+    assert [e["index"] for e in _events(channel, "result")] == [0, 2]
+    assert [e["index"] for e in _events(channel, "failure")] == [1]
@@ -0,0 +1,57 @@
+# tests/test_upload_limit.py
+# Request body cap of the upload endpoints
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from backend.api.middleware import UploadSizeLimitMiddleware
+
+LIMIT = 64 * 1024
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, limits={"/upload": LIMIT})
+
+    @app.post("/upload")
+    async def upload(pdf: UploadFile = File(...)):
+        return {"size": len(await pdf.read())}
+
+    @app.post("/other")
+    async def other(pdf: UploadFile = File(...)):
+        return {"size": len(await pdf.read())}
+
+    return TestClient(app)
+
+
+def test_small_upload_passes():
+    r = _client().post("/upload", files={"pdf": ("a.pdf", b"%PDF-" + b"x" * 100)})
+    assert r.status_code == 200
+    assert r.json() == {"size": 105}
+
+
+def test_declared_size_over_limit_is_rejected():
+    r = _client().post("/upload", files={"pdf": ("a.pdf", b"x" * (LIMIT + 1))})
+    assert r.status_code == 413
+
+
+def test_streamed_body_is_cut_off_at_the_limit():
+    boundary = "b0undary"
+
+    def body():
+        yield f'--{boundary}\r\nContent-Disposition: form-data; name="pdf"; filename="a.pdf"\r\n\r\n'.encode()
+        for _ in range(100):
+            yield b"x" * 4096
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    r = _client().post(
+        "/upload",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    assert r.status_code == 413
+
+
+def test_other_paths_are_not_limited():
+    r = _client().post("/other", files={"pdf": ("a.pdf", b"x" * (LIMIT + 1))})
+    assert r.status_code == 200